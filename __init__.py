@@ -15,7 +15,7 @@ login_manager.login_message_category = 'warning'
 # 创建Bcrypt实例
 bcrypt = Bcrypt()
 
-def create_app():
+def create_app(config_overrides=None):
     # 创建Flask应用实例，指定模板和静态文件夹路径
     import os
     app = Flask(__name__, 
@@ -26,11 +26,93 @@ def create_app():
     # 配置应用
     app.config.from_object('config.Config')
     
+    # 覆盖部分配置（基准测试等脚本使用独立的数据库）
+    if config_overrides:
+        app.config.update(config_overrides)
+    
+    # 初始化日志：队列化写入，避免日志I/O阻塞请求线程
+    from app.logs import init_logging
+    init_logging(app)
+    
+    # 整理数据库连接配置，初始化后为SQLite连接设置 WAL 等参数
+    from app.storage import configure_storage, init_storage
+    configure_storage(app.config)
+    
     # 初始化扩展
     db.init_app(app)
+    init_storage(app, db)
     login_manager.init_app(app)
     bcrypt.init_app(app)
     
+    # 初始化密码哈希线程池，限制同时进行的 bcrypt 计算
+    from app.passwords import PasswordHasher
+    if not 4 <= app.config['BCRYPT_LOG_ROUNDS'] <= 31:
+        raise ValueError(f"不支持的bcrypt工作因子: {app.config['BCRYPT_LOG_ROUNDS']}，可选范围: 4-31")
+    app.extensions['password_hasher'] = PasswordHasher.from_config(app.config)
+    
+    # 初始化搜索响应调试采样（默认关闭）
+    from app.debug_capture import DebugCapture
+    app.extensions['debug_capture'] = DebugCapture.from_config(app.config)
+    
+    # 初始化搜索结果缓存，所有入口共享
+    from app.cache import create_cache
+    app.extensions['news_cache'] = create_cache(app.config)
+    
+    # 初始化列表总条数缓存，翻页时不重复执行 COUNT
+    from app.cache import MemoryCache
+    app.extensions['count_cache'] = MemoryCache(ttl=app.config['PAGINATION_COUNT_TTL']) \
+        if app.config['PAGINATION_COUNT_TTL'] > 0 else None
+    
+    # 初始化登录用户缓存，已登录的请求不再逐次查询用户和角色
+    app.extensions['principal_cache'] = MemoryCache(
+        ttl=app.config['PRINCIPAL_CACHE_TTL'], maxsize=app.config['PRINCIPAL_CACHE_SIZE'], copy_values=False
+    ) if app.config['PRINCIPAL_CACHE_TTL'] > 0 else None
+    
+    # 初始化系统设置快照，按版本号失效，所有模板可通过 system_settings 读取设置
+    from app.settings import SettingsCache, template_settings
+    app.extensions['settings_cache'] = SettingsCache()
+    app.context_processor(template_settings)
+    
+    # 初始化相同搜索请求的合并器
+    from app.singleflight import SingleFlight
+    app.extensions['singleflight'] = SingleFlight() if app.config['SCRAPER_COALESCE'] else None
+    
+    # 初始化深度采集站点提取规则库
+    from app.rules import ExtractionRuleStore
+    app.extensions['extraction_rules'] = ExtractionRuleStore(
+        app, max_failures=app.config['DEEP_COLLECT_RULE_MAX_FAILURES']
+    ) if app.config['DEEP_COLLECT_LEARN_RULES'] else None
+    
+    # 初始化进程级抓取器池，复用长连接
+    from app.pool import ScraperPool
+    from app.scraper import BaiduNewsScraper
+    app.extensions['scraper_pool'] = ScraperPool(
+        lambda: BaiduNewsScraper.from_config(
+            app.config,
+            debug_capture=app.extensions['debug_capture'],
+            cache=app.extensions['news_cache'],
+            singleflight=app.extensions['singleflight'],
+            rule_store=app.extensions['extraction_rules']
+        ),
+        size=app.config['SCRAPER_POOL_SIZE'],
+        timeout=app.config['SCRAPER_POOL_TIMEOUT']
+    )
+    
+    # 初始化新闻URL去重索引和近似重复聚类索引
+    from app.dedup import UrlDedupIndex, StoryIndex
+    app.extensions['url_index'] = UrlDedupIndex.from_config(app)
+    app.extensions['story_index'] = StoryIndex.from_config(app)
+    
+    # 创建采集任务执行器，worker 模式下由独立进程执行任务。
+    # 执行器由服务入口（run.py）启动，迁移、初始化等脚本创建应用时不会认领任务
+    from app.tasks import TaskExecutor, TASK_EXECUTORS
+    if app.config['TASK_EXECUTOR'] not in TASK_EXECUTORS:
+        raise ValueError(f"不支持的任务执行方式: {app.config['TASK_EXECUTOR']}，可选值: {', '.join(TASK_EXECUTORS)}")
+    app.extensions['task_executor'] = TaskExecutor.from_config(app) \
+        if app.config['TASK_EXECUTOR'] == 'thread' else None
+    if app.extensions['task_executor'] is not None and app.config['TASK_EXECUTOR_AUTOSTART']:
+        app.extensions['task_executor'].start()
+    
     # 注册蓝图
     from app.routes import main_bp
     app.register_blueprint(main_bp)
@@ -49,5 +131,5 @@ def create_app():
 # 用户加载回调函数
 @login_manager.user_loader
 def load_user(user_id):
-    from app.models import User
-    return User.query.get(int(user_id))
\ No newline at end of file
+    from app.principals import load_principal
+    return load_principal(int(user_id))
\ No newline at end of file
@@ -1,8 +1,12 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, current_app
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, current_app, abort
 from flask_login import login_required, current_user
 from app import db
-from app.models import User, Role, SystemSetting, ScrapingTask, DataCollection
+from app.models import User, Role, SystemSetting, ScrapingTask, DataCollection, MonitoredKeyword
 from app.routes import admin_required
+from app.pagination import keyset_paginate, cached_count
+from app.rollups import dashboard_summary, news_counts
+from app.settings import SETTING_DEFAULTS
+from app.principals import invalidate_principals
 
 # 创建admin蓝图
 admin_bp = Blueprint('admin', __name__)
@@ -10,9 +14,15 @@ admin_bp = Blueprint('admin', __name__)
 @admin_bp.route('/admin')
 @admin_required
 def admin_dashboard():
-    # 统计信息
-    total_users = User.query.count()
-    total_roles = Role.query.count()
+    # 统计信息，用户和角色数使用缓存的总数
+    total_users = cached_count('users::', User.query)
+    total_roles = cached_count('roles', Role.query)
+    
+    # 新闻和任务概况只读取按天汇总表，不扫描采集结果
+    days = current_app.config['DASHBOARD_DAYS']
+    summary = dashboard_summary(days)
+    daily_news = news_counts(days, 'day')
+    top_keywords = news_counts(days, 'keyword', limit=10)
     
     # 最近用户
     recent_users = User.query.order_by(User.id.desc()).limit(5).all()
@@ -20,13 +30,17 @@ def admin_dashboard():
     return render_template('admin/dashboard.html', 
                           total_users=total_users, 
                           total_roles=total_roles, 
+                          summary=summary,
+                          days=days,
+                          daily_news=daily_news,
+                          top_keywords=top_keywords,
                           recent_users=recent_users)
 
 @admin_bp.route('/admin/users')
 @admin_required
 def users():
-    # 获取当前页码
-    page = request.args.get('page', 1, type=int)
+    # 分页游标，为空时显示第一页
+    cursor = request.args.get('cursor') or None
     
     # 搜索和筛选
     search = request.args.get('search', '')
@@ -41,17 +55,23 @@ def users():
     if role_id:
         query = query.filter_by(role_id=role_id)
     
-    # 分页查询
-    users = query.order_by(User.id.desc()).paginate(page=page, per_page=10)
+    # 键集分页，总数为缓存的近似值
+    try:
+        pagination = keyset_paginate(query, User.id, cursor, per_page=10)
+    except ValueError:
+        abort(400)
+    total_users = cached_count(f'users:{search}:{role_id}', query)
     
     # 获取所有角色
     roles = Role.query.all()
     
     return render_template('admin/users.html', 
-                          users=users.items, 
+                          users=pagination.items, 
                           roles=roles, 
-                          total_users=users.total, 
-                          current_page=users.page)
+                          total_users=total_users, 
+                          pagination=pagination,
+                          search=search,
+                          role_id=role_id)
 
 @admin_bp.route('/admin/roles')
 @admin_required
@@ -122,6 +142,8 @@ def edit_role(id):
     
     try:
         db.session.commit()
+        # 缓存的登录用户带有角色，角色修改后全部失效
+        invalidate_principals()
         flash('角色更新成功！', 'success')
     except Exception as e:
         db.session.rollback()
@@ -157,15 +179,8 @@ def delete_role(id):
 @admin_bp.route('/admin/settings', methods=['GET', 'POST'])
 @admin_required
 def settings():
-    # 获取所有系统设置
-    settings = SystemSetting.query.all()
-    
-    # 设置字典，用于前端展示
-    settings_dict = {
-        'app_name': SystemSetting.get('app_name', '政企智能舆情分析平台'),
-        'logo_url': SystemSetting.get('logo_url', ''),
-        'description': SystemSetting.get('description', '')
-    }
+    # 设置字典，用于前端展示，读取进程内的设置快照
+    settings_dict = {key: SystemSetting.get(key, default) for key, default in SETTING_DEFAULTS.items()}
     
     if request.method == 'POST':
         # 保存系统设置
@@ -207,6 +222,9 @@ def scraping_tasks():
     # 搜索关键词
     keyword = request.args.get('keyword', '')
     
+    # 页码范围（可选，如 1-5），指定后并发抓取多页
+    pages = request.args.get('pages', '')
+    
     # 结果列表
     collections = []
     total_collections = 0
@@ -216,11 +234,25 @@ def scraping_tasks():
     if keyword:
         try:
             # 导入爬虫模块
-            from app.scraper import BaiduNewsScraper
+            from app.scraper import parse_pages
+            from app.services import checkout_scraper, use_cache_requested
             
             # 执行爬虫任务
-            scraper = BaiduNewsScraper()
-            news_list = scraper.fetch_news(keyword, page)
+            page_results = None
+            with checkout_scraper() as scraper:
+                if pages:
+                    result = scraper.fetch_pages(keyword, parse_pages(pages, current_app.config['SCRAPER_MAX_PAGES']),
+                                                 use_cache=use_cache_requested())
+                    news_list = result['news']
+                    page_results = result['pages']
+                else:
+                    news_list = scraper.fetch_news(keyword, page, use_cache_requested())
+            
+            # 部分页抓取失败时提示，但仍展示成功页的结果
+            if page_results:
+                failed_pages = [str(r['page']) for r in page_results if r['error']]
+                if failed_pages:
+                    flash(f'第{",".join(failed_pages)}页抓取失败', 'warning')
             
             # 处理结果
             collections = []
@@ -242,20 +274,185 @@ def scraping_tasks():
             search_result = {
                 'keyword': keyword,
                 'page': page,
+                'pages': page_results,
                 'total_results': total_collections
             }
             
         except Exception as e:
             flash(f'搜索失败：{str(e)}', 'error')
     
+    # 后台采集任务，按ID倒序键集分页
+    try:
+        task_pagination = keyset_paginate(ScrapingTask.query, ScrapingTask.id,
+                                          request.args.get('task_cursor') or None, per_page=20)
+    except ValueError:
+        abort(400)
+    task_pagination.total = cached_count('scraping_tasks', ScrapingTask.query)
+    
     return render_template('admin/scraping_tasks.html', 
                           collections=collections, 
                           total_collections=total_collections,
                           current_page=page,
                           keyword=keyword,
-                          search_result=search_result)
+                          search_result=search_result,
+                          tasks=task_pagination.items,
+                          task_pagination=task_pagination)
+
+@admin_bp.route('/admin/scraping/task/add', methods=['GET', 'POST'])
+@admin_required
+def add_scraping_task():
+    if request.method == 'GET':
+        return render_template('admin/add_scraping_task.html')
+    
+    keyword = request.form.get('keyword', '').strip()
+    page = request.form.get('page', 1, type=int)
+    
+    if not keyword or len(keyword) > 50:
+        flash('请输入1-50个字符的搜索关键词！', 'error')
+        return redirect(url_for('admin.add_scraping_task'))
+    if not page or page < 1 or page > current_app.config['SCRAPER_MAX_PAGES']:
+        flash(f'页码必须在1-{current_app.config["SCRAPER_MAX_PAGES"]}之间！', 'error')
+        return redirect(url_for('admin.add_scraping_task'))
+    
+    # 只创建待执行任务，由任务执行器在后台抓取，不阻塞当前请求
+    task = ScrapingTask(keyword=keyword, page=page, status='pending', created_by=current_user.id)
+    db.session.add(task)
+    db.session.commit()
+    
+    executor = current_app.extensions.get('task_executor')
+    if executor is not None:
+        executor.submit(task.id)
+    
+    flash('采集任务已创建，正在后台执行！', 'success')
+    return redirect(url_for('admin.scraping_results', task_id=task.id))
+
+@admin_bp.route('/admin/scraping/task/<int:task_id>')
+@admin_required
+def scraping_results(task_id):
+    task = ScrapingTask.query.get_or_404(task_id)
+    
+    # 按ID键集分页，总数使用写入时累计的 total_count，不执行 COUNT
+    try:
+        pagination = keyset_paginate(DataCollection.query.filter_by(task_id=task_id), DataCollection.id,
+                                     request.args.get('cursor') or None, per_page=15, descending=False)
+    except ValueError:
+        abort(400)
+    
+    return render_template('admin/scraping_results.html',
+                          task=task,
+                          collections=pagination.items,
+                          total_collections=task.total_count or 0,
+                          pagination=pagination)
 
+@admin_bp.route('/admin/monitors')
+@admin_required
+def monitors():
+    monitors = MonitoredKeyword.query.order_by(MonitoredKeyword.id.desc()).all()
+    return render_template('admin/monitors.html', monitors=monitors,
+                          default_interval=current_app.config['MONITOR_DEFAULT_INTERVAL'],
+                          default_max_pages=current_app.config['MONITOR_MAX_PAGES'])
 
+@admin_bp.route('/admin/monitor/add', methods=['POST'])
+@admin_required
+def add_monitor():
+    keyword = request.form.get('keyword', '').strip()
+    interval_minutes = request.form.get('interval_minutes', current_app.config['MONITOR_DEFAULT_INTERVAL'], type=int)
+    max_pages = request.form.get('max_pages', current_app.config['MONITOR_MAX_PAGES'], type=int)
+    
+    if not keyword or len(keyword) > 50:
+        flash('请输入1-50个字符的监控关键词！', 'error')
+        return redirect(url_for('admin.monitors'))
+    if not interval_minutes or interval_minutes < 1:
+        flash('抓取间隔至少为1分钟！', 'error')
+        return redirect(url_for('admin.monitors'))
+    if not max_pages or max_pages < 1 or max_pages > current_app.config['SCRAPER_MAX_PAGES']:
+        flash(f'最多翻页数必须在1-{current_app.config["SCRAPER_MAX_PAGES"]}之间！', 'error')
+        return redirect(url_for('admin.monitors'))
+    
+    # 检查关键词是否已在监控
+    if MonitoredKeyword.query.filter_by(keyword=keyword).first():
+        flash('该关键词已在监控中！', 'error')
+        return redirect(url_for('admin.monitors'))
+    
+    monitor = MonitoredKeyword(keyword=keyword, interval_minutes=interval_minutes, max_pages=max_pages,
+                               created_by=current_user.id)
+    
+    try:
+        db.session.add(monitor)
+        db.session.commit()
+        flash('关键词监控添加成功！', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash('关键词监控添加失败，请稍后重试！', 'error')
+        return redirect(url_for('admin.monitors'))
+    
+    # 新监控立即执行第一轮
+    executor = current_app.extensions.get('task_executor')
+    if executor is not None:
+        executor.submit()
+    
+    return redirect(url_for('admin.monitors'))
+
+@admin_bp.route('/admin/monitor/toggle/<int:id>', methods=['POST'])
+@admin_required
+def toggle_monitor(id):
+    monitor = MonitoredKeyword.query.get_or_404(id)
+    monitor.is_active = not monitor.is_active
+    
+    try:
+        db.session.commit()
+        flash('关键词监控已启用！' if monitor.is_active else '关键词监控已暂停！', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash('关键词监控更新失败，请稍后重试！', 'error')
+    
+    return redirect(url_for('admin.monitors'))
+
+@admin_bp.route('/admin/monitor/run/<int:id>', methods=['POST'])
+@admin_required
+def run_monitor_now(id):
+    monitor = MonitoredKeyword.query.get_or_404(id)
+    
+    # 将下次执行时间提前到当前，由任务执行器认领
+    from datetime import datetime
+    monitor.next_run_at = datetime.utcnow()
+    db.session.commit()
+    
+    executor = current_app.extensions.get('task_executor')
+    if executor is not None:
+        executor.submit()
+    
+    flash('关键词监控已加入执行队列！', 'success')
+    return redirect(url_for('admin.monitors'))
+
+@admin_bp.route('/admin/monitor/delete/<int:id>')
+@admin_required
+def delete_monitor(id):
+    monitor = MonitoredKeyword.query.get_or_404(id)
+    
+    try:
+        db.session.delete(monitor)
+        db.session.commit()
+        flash('关键词监控删除成功！', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash('关键词监控删除失败，请稍后重试！', 'error')
+    
+    return redirect(url_for('admin.monitors'))
+
+@admin_bp.route('/admin/scraping/task/<int:task_id>/deep-collect', methods=['POST'])
+@admin_required
+def deep_collect_task(task_id):
+    # 批量深度采集任务下尚未深度采集的新闻，只标记为待执行，由任务执行器在后台采集，不阻塞当前请求
+    task = ScrapingTask.query.get_or_404(task_id)
+    task.deep_collect_status = 'pending'
+    db.session.commit()
+    
+    executor = current_app.extensions.get('task_executor')
+    if executor is not None:
+        executor.submit(task_id)
+    
+    return jsonify({'success': True, 'data': {'task_id': task_id, 'deep_collect_status': 'pending'}}), 202
 
 @admin_bp.route('/admin/user/add', methods=['POST'])
 @admin_required
@@ -281,7 +478,11 @@ def add_user():
     
     # 创建新用户
     user = User(username=username, email=email, role_id=role_id)
-    user.set_password(password)
+    try:
+        user.set_password(password)
+    except RuntimeError:
+        flash('服务器繁忙，请稍后重试！', 'error')
+        return redirect(url_for('admin.users'))
     
     try:
         db.session.add(user)
@@ -334,10 +535,16 @@ def edit_user(id):
     user.role_id = role_id
     
     if password:
-        user.set_password(password)
+        try:
+            user.set_password(password)
+        except RuntimeError:
+            db.session.rollback()
+            flash('服务器繁忙，请稍后重试！', 'error')
+            return redirect(url_for('admin.users'))
     
     try:
         db.session.commit()
+        invalidate_principals(id)
         flash('用户更新成功！', 'success')
     except Exception as e:
         db.session.rollback()
@@ -358,6 +565,7 @@ def delete_user(id):
     try:
         db.session.delete(user)
         db.session.commit()
+        invalidate_principals(id)
         flash('用户删除成功！', 'success')
     except Exception as e:
         db.session.rollback()
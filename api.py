@@ -1,6 +1,12 @@
-from flask import Blueprint, render_template, request, jsonify, current_app
+from flask import Blueprint, render_template, request, jsonify, current_app, Response, stream_with_context
 from flask_login import login_required
-from app.scraper import BaiduNewsScraper
+from app.scraper import parse_pages
+from app.services import checkout_scraper, use_cache_requested, cache_status_header
+from app.routes import admin_required
+from app.search import search_news
+from app.rollups import news_counts, task_success_rates
+from app.export import stream_export, STREAM_FORMATS
+import json
 import logging
 
 # 创建蓝图
@@ -17,9 +23,12 @@ def scrape_api():
     参数：
         keyword: 搜索关键字
         page: 页码（可选，默认为1）
+        pages: 页码范围（可选，如 1-5 或 1,3,5），指定后并发抓取多页
+        nocache: 为1时绕过搜索缓存重新抓取（可选）
+        limit: 只返回前若干条（可选），未命中缓存时流式抓取并提前结束下载
         
     返回：
-        JSON格式的新闻数据列表
+        JSON格式的新闻数据列表，X-Cache 响应头标明缓存命中情况
     """
     try:
         # 获取请求参数
@@ -33,11 +42,36 @@ def scrape_api():
         if page < 1:
             page = 1
         
-        # 创建抓取器实例
-        scraper = BaiduNewsScraper()
+        limit = request.args.get('limit', type=int)
         
-        # 抓取新闻
-        news_list = scraper.fetch_news(keyword, page)
+        # 指定页码范围时并发抓取多页
+        page_list = None
+        pages = request.args.get('pages')
+        if pages:
+            try:
+                page_list = parse_pages(pages, current_app.config['SCRAPER_MAX_PAGES'])
+            except ValueError as e:
+                return jsonify({'error': f'页码范围无效: {e}'}), 400
+        
+        # 从抓取器池借出抓取器，复用已建立的连接
+        with checkout_scraper() as scraper:
+            if page_list:
+                result = scraper.fetch_pages(keyword, page_list, use_cache=use_cache_requested())
+            elif limit:
+                news_list, cache_status = scraper.fetch_first_news(keyword, page, limit, use_cache_requested())
+            else:
+                news_list, cache_status = scraper.fetch_news_cached(keyword, page, use_cache_requested())
+        
+        if page_list:
+            return jsonify({
+                'success': True,
+                'data': {
+                    'keyword': keyword,
+                    'pages': result['pages'],
+                    'count': len(result['news']),
+                    'news': result['news']
+                }
+            }), 200, {'X-Cache': cache_status_header([r['cache'] for r in result['pages']])}
         
         # 返回结果
         return jsonify({
@@ -48,15 +82,171 @@ def scrape_api():
                 'count': len(news_list),
                 'news': news_list
             }
-        }), 200
+        }), 200, {'X-Cache': cache_status}
         
     except Exception as e:
-        logger.error(f'API抓取错误: {e}')
+        logger.error('API抓取错误: %s', e)
         return jsonify({
             'success': False,
             'error': f'抓取失败: {str(e)}'
         }), 500
 
+@api_bp.route('/api/scrape/stream', methods=['GET'])
+def scrape_stream_api():
+    """
+    API端点：流式抓取百度新闻数据
+    
+    每解析出一条新闻立即以一行JSON（NDJSON）返回，不经过缓存
+    
+    参数：
+        keyword: 搜索关键字
+        page: 页码（可选，默认为1）
+        limit: 最多返回的条数（可选），取满后停止下载
+        
+    返回：
+        application/x-ndjson 格式的新闻流
+    """
+    keyword = request.args.get('keyword', '')
+    page = max(request.args.get('page', 1, type=int), 1)
+    limit = request.args.get('limit', type=int)
+    
+    if not keyword:
+        return jsonify({'error': '关键字不能为空'}), 400
+    
+    def generate():
+        try:
+            with checkout_scraper() as scraper:
+                for news in scraper.iter_news(keyword, page, limit):
+                    yield json.dumps(news, ensure_ascii=False) + '\n'
+        except Exception as e:
+            logger.error('流式抓取错误: %s', e)
+            yield json.dumps({'error': f'抓取失败: {str(e)}'}, ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@api_bp.route('/api/scrape/metrics', methods=['GET'])
+@admin_required
+def scrape_metrics():
+    """
+    API端点：搜索请求合并统计
+    
+    返回：
+        JSON格式的统计数据，saved_calls 为合并节省的上游请求数
+    """
+    singleflight = current_app.extensions.get('singleflight')
+    if singleflight is None:
+        return jsonify({'success': True, 'data': {'enabled': False}}), 200
+    
+    return jsonify({
+        'success': True,
+        'data': dict(singleflight.metrics(), enabled=True)
+    }), 200
+
+@api_bp.route('/api/news/search', methods=['GET'])
+@login_required
+def search_news_api():
+    """
+    API端点：检索已采集的新闻
+    
+    参数：
+        q: 检索词，空格分隔的各项都必须出现
+        cursor: 上一页返回的 next_cursor（可选）
+        limit: 每页条数（可选）
+        
+    返回：
+        JSON格式的结果列表，按相关度排序，title_highlight 和 snippet 中的检索词用 <mark> 标出
+    """
+    limit = request.args.get('limit', current_app.config['SEARCH_PAGE_SIZE'], type=int)
+    limit = min(max(limit, 1), current_app.config['SEARCH_MAX_PAGE_SIZE'])
+    
+    try:
+        result = search_news(request.args.get('q', ''), request.args.get('cursor') or None, limit,
+                             current_app.config['SEARCH_SNIPPET_CHARS'])
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'count': len(result['items']),
+            'items': result['items'],
+            'next_cursor': result['next_cursor']
+        }
+    }), 200
+
+def _stats_days():
+    """图表统计的天数，限制在 1 到 STATS_MAX_DAYS 之间"""
+    days = request.args.get('days', current_app.config['STATS_DEFAULT_DAYS'], type=int)
+    return min(max(days, 1), current_app.config['STATS_MAX_DAYS'])
+
+@api_bp.route('/api/stats/news', methods=['GET'])
+@admin_required
+def news_stats():
+    """
+    API端点：新闻数量统计（读取按天汇总表）
+    
+    参数：
+        days: 统计最近的天数（可选）
+        dimension: 分组维度，day、keyword 或 source（可选，默认 day）
+        limit: keyword、source 维度最多返回的分组数（可选，默认20）
+        
+    返回：
+        JSON格式的 (分组值, 条数) 列表
+    """
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    try:
+        rows = news_counts(_stats_days(), request.args.get('dimension', 'day'), limit)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'data': [{'key': key, 'count': count} for key, count in rows]
+    }), 200
+
+@api_bp.route('/api/stats/tasks', methods=['GET'])
+@admin_required
+def task_stats():
+    """
+    API端点：每天的采集任务成功率（读取按天汇总表）
+    
+    参数：
+        days: 统计最近的天数（可选）
+        
+    返回：
+        JSON格式的列表，包含 day、completed、failed、success_rate
+    """
+    return jsonify({'success': True, 'data': task_success_rates(_stats_days())}), 200
+
+@api_bp.route('/api/news/export', methods=['GET'])
+@admin_required
+def export_news_api():
+    """
+    API端点：流式导出采集结果及深度采集正文
+    
+    分批从数据库游标读取并逐块返回，内存占用与导出行数无关
+    
+    参数：
+        task_id: 采集任务ID（可选，不指定时导出全部）
+        format: ndjson 或 csv（可选，默认 ndjson）；Parquet 文件请使用 python -m app.export_news
+        
+    返回：
+        附件形式的 NDJSON 或 CSV 数据流
+    """
+    fmt = request.args.get('format', 'ndjson')
+    task_id = request.args.get('task_id', type=int)
+    if fmt not in STREAM_FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f"不支持的导出格式: {fmt}，可选值: {', '.join(STREAM_FORMATS)}"
+        }), 400
+    
+    mimetype, extension = STREAM_FORMATS[fmt]
+    filename = f'news_task{task_id}.{extension}' if task_id else f'news_all.{extension}'
+    chunks = stream_export(fmt, task_id, current_app.config['EXPORT_BATCH_SIZE'])
+    return Response(stream_with_context(chunks), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
 @api_bp.route('/scrape', methods=['GET', 'POST'])
 @login_required
 def scrape_page():
@@ -76,14 +266,12 @@ def scrape_page():
             if not keyword:
                 error = '请输入搜索关键字'
             else:
-                # 创建抓取器实例
-                scraper = BaiduNewsScraper()
-                
-                # 抓取新闻
-                news_list = scraper.fetch_news(keyword, page)
+                # 从抓取器池借出抓取器并抓取新闻
+                with checkout_scraper() as scraper:
+                    news_list = scraper.fetch_news(keyword, page)
                 
         except Exception as e:
-            logger.error(f'页面抓取错误: {e}')
+            logger.error('页面抓取错误: %s', e)
             error = f'抓取失败: {str(e)}'
     
     return render_template('scrape.html', 
@@ -2,6 +2,10 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_user, logout_user, login_required, current_user
 from app import db
 from app.models import User
+import logging
+
+# 配置日志
+logger = logging.getLogger(__name__)
 
 # 创建认证蓝图
 auth_bp = Blueprint('auth', __name__)
@@ -19,8 +23,25 @@ def login():
         # 查找用户
         user = User.query.filter_by(username=username).first()
         
-        # 验证用户和密码
-        if user and user.check_password(password):
+        # 验证用户和密码，密码哈希繁忙时提示稍后重试
+        try:
+            valid = user is not None and user.check_password(password)
+        except RuntimeError as e:
+            logger.warning('登录密码校验被拒绝: %s', e)
+            flash('登录人数较多，请稍后重试！', 'error')
+            return render_template('login.html'), 503
+        
+        if valid:
+            # 工作因子与配置不同时用当前配置重新哈希，失败不影响登录
+            if user.password_needs_rehash():
+                try:
+                    user.set_password(password)
+                    db.session.commit()
+                    logger.info('用户%s的密码已按新的工作因子重新哈希', user.id)
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning('用户%s的密码重新哈希失败: %s', user.id, e)
+            
             # 登录用户
             login_user(user, remember=remember)
             flash('登录成功！', 'success')
@@ -69,7 +90,12 @@ def register():
         
         # 创建新用户
         new_user = User(username=username, email=email)
-        new_user.set_password(password)
+        try:
+            new_user.set_password(password)
+        except RuntimeError as e:
+            logger.warning('注册密码哈希被拒绝: %s', e)
+            flash('注册人数较多，请稍后重试！', 'error')
+            return redirect(url_for('auth.register'))
         
         try:
             db.session.add(new_user)
@@ -0,0 +1,114 @@
+"""
+密码哈希和登录吞吐量基准测试：对比不同 bcrypt 工作因子下的哈希速度和集中登录时的表现
+
+每个工作因子先在单线程中测量每秒可完成的哈希次数，再用多个并发客户端反复登录，
+统计每秒成功登录数、因哈希线程池繁忙被拒绝的次数和登录耗时。
+
+用法（在包的上级目录执行）：
+    python -m app.benchmarks.bench_bcrypt
+    python -m app.benchmarks.bench_bcrypt --costs 10 12 --clients 16 --workers 2 --seconds 5
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+import logging
+from app import create_app, db, bcrypt
+from app.models import Role, User
+
+PASSWORD = 'bench-password'
+
+def hash_rate(cost, seconds):
+    """单线程中每秒可完成的 bcrypt 校验次数"""
+    password_hash = bcrypt.generate_password_hash(PASSWORD, cost)
+    count = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        bcrypt.check_password_hash(password_hash, PASSWORD)
+        count += 1
+    return count / (time.perf_counter() - started)
+
+def make_app(cost, path, args):
+    """创建使用指定工作因子的应用和基准测试用户"""
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + path,
+        'TASK_EXECUTOR': 'off',
+        'LOG_FILE': '',
+        'LOG_TO_STDOUT': False,
+        'BCRYPT_LOG_ROUNDS': cost,
+        'PASSWORD_HASH_WORKERS': args.workers,
+        'PASSWORD_HASH_MAX_PENDING': args.max_pending,
+        'PASSWORD_HASH_TIMEOUT': args.timeout
+    })
+    with app.app_context():
+        db.create_all()
+        role = Role(name='user')
+        db.session.add(role)
+        db.session.commit()
+        user = User(username='bench', email='bench@example.com', role_id=role.id)
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+    return app
+
+def client(app, stop, counters, latencies):
+    """反复提交登录表单，每次使用新的客户端（不带登录状态）"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = app.test_client().post('/login', data={'username': 'bench', 'password': PASSWORD})
+        latencies.append(time.perf_counter() - started)
+        if response.status_code == 302:
+            counters['ok'] += 1
+        elif response.status_code == 503:
+            counters['rejected'] += 1
+        else:
+            counters['errors'] += 1
+
+def run_logins(cost, directory, args):
+    """并发登录指定时长，返回统计结果"""
+    app = make_app(cost, os.path.join(directory, f'cost{cost}.db'), args)
+    thread_counters = [{'ok': 0, 'rejected': 0, 'errors': 0} for _ in range(args.clients)]
+    thread_latencies = [[] for _ in range(args.clients)]
+    stop = threading.Event()
+    threads = [threading.Thread(target=client, args=(app, stop, thread_counters[i], thread_latencies[i]))
+               for i in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    
+    hasher = app.extensions['password_hasher']
+    if hasher is not None:
+        hasher.shutdown()
+    counters = {key: sum(counter[key] for counter in thread_counters) for key in thread_counters[0]}
+    latencies = sorted(latency for latencies in thread_latencies for latency in latencies)
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0
+    return counters, p95
+
+def main():
+    parser = argparse.ArgumentParser(description='密码哈希和登录吞吐量基准测试')
+    parser.add_argument('--costs', type=int, nargs='+', default=[4, 8, 10, 12], help='要对比的 bcrypt 工作因子')
+    parser.add_argument('--clients', type=int, default=8, help='并发登录的客户端数')
+    parser.add_argument('--workers', type=int, default=2, help='密码哈希线程数，0 为在请求线程中直接哈希')
+    parser.add_argument('--max-pending', type=int, default=16, help='排队等待哈希的最大请求数')
+    parser.add_argument('--timeout', type=float, default=5, help='排队已满时的最长等待秒数')
+    parser.add_argument('--seconds', type=float, default=3, help='每个工作因子的登录测试时长（秒）')
+    args = parser.parse_args()
+    
+    logging.disable(logging.WARNING)
+    directory = tempfile.mkdtemp(prefix='bench_bcrypt_')
+    try:
+        for cost in args.costs:
+            rate = hash_rate(cost, min(args.seconds, 2))
+            counters, p95 = run_logins(cost, directory, args)
+            print(f'cost={cost:<2}  单线程哈希 {rate:8.1f}/秒  并发登录 {counters["ok"] / args.seconds:8.1f}/秒  '
+                  f'繁忙拒绝 {counters["rejected"]}  其他错误 {counters["errors"]}  p95 {p95:8.1f}ms')
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
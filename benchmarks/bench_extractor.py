@@ -0,0 +1,111 @@
+"""
+正文提取基准测试：对比固定选择器链与单次遍历文本密度提取的速度和结果一致性
+
+用法（在包的上级目录执行）：
+    python -m app.benchmarks.bench_extractor
+    python -m app.benchmarks.bench_extractor --html-dir ./pages --repeat 5
+"""
+import argparse
+import os
+import random
+import time
+import logging
+from difflib import SequenceMatcher
+from app.scraper import BaiduNewsScraper
+from app.extractor import extract_article
+
+SENTENCES = [
+    '市政府召开专题会议，研究部署近期重点工作任务。',
+    '会议强调，要坚持以人民为中心的发展思想，切实解决群众急难愁盼问题。',
+    '据统计，今年前三季度全市地区生产总值同比增长百分之五点六。',
+    '相关负责人表示，下一步将继续加大政策支持力度，推动项目尽快落地见效。',
+    '记者从有关部门获悉，该项目总投资约二十亿元，预计明年底建成投用。',
+    '专家认为，数字经济正在成为拉动区域经济增长的重要引擎。',
+]
+
+# 常见新闻页模板：正文容器的写法各不相同
+TEMPLATES = [
+    '<div class="article-content">{body}</div>',
+    '<div id="content">{body}</div>',
+    '<article>{body}</article>',
+    '<div class="news-content"><div class="inner">{body}</div></div>',
+    '<div class="wrap"><div class="left">{body}</div></div>',
+    '<table><tr><td class="detail">{body}</td></tr></table>',
+]
+
+PAGE = '''<html><head><title>新闻标题{n}</title><meta name="author" content="记者{n}"></head><body>
+<div class="nav">{nav}</div>
+<div class="header"><h1>新闻标题{n}</h1><span class="pub-time">2024年5月{day}日 10:{minute:02d}</span></div>
+{article}
+<div class="related"><ul>{related}</ul></div>
+<div class="comment"><p>网友评论：{comment}</p></div>
+<div class="footer"><p>版权所有 本网站所刊登的各种新闻、信息和各种专题专栏资料均为版权所有，未经协议授权禁止下载使用</p></div>
+<script>var data = "<p>脚本中的文字不应被提取</p>";</script>
+</body></html>'''
+
+def build_corpus(count, seed=42):
+    """生成随机的新闻详情页样本"""
+    rng = random.Random(seed)
+    pages = []
+    for n in range(count):
+        paragraphs = ''.join(
+            '<p>{}</p>'.format(''.join(rng.choice(SENTENCES) for _ in range(rng.randint(2, 5))))
+            for _ in range(rng.randint(4, 15))
+        )
+        pages.append(PAGE.format(
+            n=n,
+            day=rng.randint(1, 28),
+            minute=rng.randint(0, 59),
+            nav=''.join(f'<a href="/c{i}">栏目{i}</a>' for i in range(20)),
+            article=rng.choice(TEMPLATES).format(body=paragraphs),
+            related=''.join(f'<li><a href="/n{i}">相关新闻标题{i}，点击查看详情</a></li>' for i in range(10)),
+            comment=rng.choice(SENTENCES) * 2
+        ))
+    return pages
+
+def load_pages(directory):
+    """读取目录中保存的真实详情页"""
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(('.html', '.htm')):
+            with open(os.path.join(directory, name), encoding='utf-8', errors='ignore') as f:
+                pages.append(f.read())
+    return pages
+
+def timed(fn, pages, repeat):
+    """返回每页平均耗时（毫秒）和最后一轮的结果"""
+    results = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [fn(page) for page in pages]
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(pages)) * 1000, results
+
+def main():
+    parser = argparse.ArgumentParser(description='正文提取基准测试')
+    parser.add_argument('--html-dir', help='真实详情页目录，不指定时使用生成的样本')
+    parser.add_argument('--pages', type=int, default=200, help='生成的样本页数')
+    parser.add_argument('--repeat', type=int, default=3, help='重复轮数')
+    args = parser.parse_args()
+    
+    logging.disable(logging.CRITICAL)
+    pages = load_pages(args.html_dir) if args.html_dir else build_corpus(args.pages)
+    scraper = BaiduNewsScraper()
+    
+    selector_ms, selector_results = timed(lambda page: scraper._extract_content_selectors(page)[0], pages, args.repeat)
+    density_ms, density_results = timed(lambda page: extract_article(page)['content'], pages, args.repeat)
+    
+    exact = sum(1 for a, b in zip(selector_results, density_results) if a == b)
+    similarity = [SequenceMatcher(None, a, b).ratio() for a, b in zip(selector_results, density_results)]
+    
+    print(f'样本页数: {len(pages)}，重复轮数: {args.repeat}')
+    print(f'{"提取方式":<12}{"每页耗时(ms)":>14}')
+    print(f'{"selectors":<12}{selector_ms:>14.3f}')
+    print(f'{"density":<12}{density_ms:>14.3f}')
+    print(f'加速比: {selector_ms / density_ms:.2f}x')
+    print(f'结果完全一致: {exact}/{len(pages)} ({exact / len(pages):.1%})')
+    print(f'平均文本相似度: {sum(similarity) / len(similarity):.3f}，'
+          f'相似度≥0.9: {sum(1 for s in similarity if s >= 0.9)}/{len(pages)}')
+
+if __name__ == '__main__':
+    main()
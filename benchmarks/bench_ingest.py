@@ -0,0 +1,122 @@
+"""
+采集结果写入基准测试：对比逐条 add + commit、单事务 add_all 与批量写入管道的吞吐量
+
+每种方式使用独立的临时SQLite数据库，写入相同的新闻（含一定比例的重复URL）。
+--storage 选择调优后的数据库文件（默认）、SQLite默认参数的文件或内存数据库。
+
+用法（在包的上级目录执行）：
+    python -m app.benchmarks.bench_ingest
+    python -m app.benchmarks.bench_ingest --rows 20000 --batch-size 1000 --duplicates 0.2
+    python -m app.benchmarks.bench_ingest --storage memory
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+import logging
+from app import create_app, db
+from app.models import Role, User, ScrapingTask, DataCollection
+from app.ingest import ingest_news
+from app.benchmarks.bench_storage import STORAGE_VARIANTS, storage_config
+
+SOURCES = ['人民网', '新华网', '央视新闻', '澎湃新闻', '四川日报', '凉山日报', '百家号']
+
+PLACES = ['西昌市', '凉山州', '成都市', '攀枝花', '会理市', '冕宁县', '德昌县', '盐源县']
+EVENTS = ['召开经济工作会议', '发布暴雨预警', '举办火把节活动', '新建学校投入使用', '开展安全生产检查',
+          '公布一季度统计数据', '启动乡村振兴项目', '举行招商引资签约仪式', '通报环境整治进展', '开通新公交线路']
+
+def build_news(count, duplicates, seed=42):
+    """生成随机新闻，duplicates 为重复URL（带跟踪参数的同一新闻）的比例"""
+    rng = random.Random(seed)
+    news_list = []
+    for n in range(count):
+        if news_list and rng.random() < duplicates:
+            original = rng.choice(news_list)
+            news_list.append(dict(original, url=original['url'] + '&wfr=spider&for=pc'))
+            continue
+        news_list.append({
+            'title': f'{rng.choice(PLACES)}{rng.choice(EVENTS)}，{rng.choice(PLACES)}{rng.choice(EVENTS)}（第{n}期）',
+            'url': f'https://baijiahao.baidu.com/s?id={rng.randint(10 ** 17, 10 ** 18)}',
+            'source': rng.choice(SOURCES),
+            'image_url': ''
+        })
+    return news_list
+
+def make_app(storage, path):
+    """在临时数据库上创建应用和基准测试用户"""
+    app = create_app(storage_config(storage, path))
+    with app.app_context():
+        db.create_all()
+        role = Role(name='admin')
+        db.session.add(role)
+        db.session.commit()
+        user = User(username='bench', email='bench@example.com', role_id=role.id, password_hash='-')
+        db.session.add(user)
+        db.session.commit()
+    return app
+
+def new_task():
+    task = ScrapingTask(keyword='基准测试', created_by=1)
+    db.session.add(task)
+    db.session.commit()
+    return task.id
+
+def naive_per_row(news_list, batch_size):
+    """逐条查重、add 并 commit"""
+    task_id = new_task()
+    for news in news_list:
+        if DataCollection.query.filter_by(url=news['url']).first():
+            continue
+        db.session.add(DataCollection(task_id=task_id, title=news['title'], source=news['source'],
+                                      image_url=news['image_url'], url=news['url']))
+        db.session.commit()
+
+def orm_add_all(news_list, batch_size):
+    """每批 add_all 后提交一次"""
+    task_id = new_task()
+    for start in range(0, len(news_list), batch_size):
+        db.session.add_all([
+            DataCollection(task_id=task_id, title=news['title'], source=news['source'],
+                           image_url=news['image_url'], url=news['url'])
+            for news in news_list[start:start + batch_size]
+        ])
+        db.session.commit()
+
+def bulk_ingest(news_list, batch_size):
+    """批量写入管道：规范化、布隆过滤器查重、executemany、聚类"""
+    ingest_news(new_task(), iter(news_list), batch_size=batch_size)
+
+def main():
+    parser = argparse.ArgumentParser(description='采集结果写入基准测试')
+    parser.add_argument('--rows', type=int, default=5000, help='新闻条数')
+    parser.add_argument('--batch-size', type=int, default=500, help='每批条数')
+    parser.add_argument('--duplicates', type=float, default=0.1, help='重复URL比例')
+    parser.add_argument('--storage', choices=list(STORAGE_VARIANTS), default='tuned', help='存储方式')
+    parser.add_argument('--skip-naive', action='store_true', help='不运行逐条提交（数据量大时很慢）')
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    news_list = build_news(args.rows, args.duplicates)
+    
+    methods = [('逐条 add + commit', naive_per_row), ('add_all 每批提交', orm_add_all), ('批量写入管道', bulk_ingest)]
+    if args.skip_naive:
+        methods = methods[1:]
+    
+    print(f'新闻 {args.rows} 条，重复比例 {args.duplicates}，每批 {args.batch_size} 条，存储方式 {args.storage}')
+    directory = tempfile.mkdtemp(prefix='bench_ingest_')
+    try:
+        for name, fn in methods:
+            app = make_app(args.storage, os.path.join(directory, f'{fn.__name__}.db'))
+            with app.app_context():
+                start = time.perf_counter()
+                fn(news_list, args.batch_size)
+                elapsed = time.perf_counter() - start
+                stored = DataCollection.query.count()
+            print(f'{name:<16} {elapsed:8.2f}s  {args.rows / elapsed:10.0f} 条/秒  保存 {stored} 条')
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
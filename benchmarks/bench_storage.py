@@ -0,0 +1,152 @@
+"""
+数据库并发读写基准测试：对比SQLite默认参数与 WAL 等调优参数下的并发吞吐量和锁等待
+
+多个写线程模拟采集任务分批写入新闻，多个读线程模拟结果列表分页和计数查询，
+统计固定时长内的读写次数和 "database is locked" 错误数。
+
+用法（在包的上级目录执行）：
+    python -m app.benchmarks.bench_storage
+    python -m app.benchmarks.bench_storage --writers 4 --readers 8 --seconds 10
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+import logging
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from app.models import Role, User, ScrapingTask, DataCollection
+
+# 存储方式：tuned 为应用默认配置；untuned 为SQLite默认参数（调优前的行为）；memory 为内存数据库
+STORAGE_VARIANTS = {
+    'tuned': {},
+    'untuned': {
+        'SQLITE_JOURNAL_MODE': 'DELETE',
+        'SQLITE_SYNCHRONOUS': 'FULL',
+        'SQLITE_MMAP_SIZE': 0,
+        'SQLITE_CACHE_SIZE': -2000
+    },
+    'memory': {'SQLALCHEMY_DATABASE_URI': 'sqlite://'}
+}
+
+def storage_config(variant, path):
+    """
+    生成基准测试使用的数据库配置
+    
+    Args:
+        variant (str): STORAGE_VARIANTS 中的存储方式
+        path (str): 数据库文件路径，内存数据库忽略
+    
+    Returns:
+        dict: 传给 create_app 的配置
+    """
+    if variant not in STORAGE_VARIANTS:
+        raise ValueError(f"不支持的存储方式: {variant}，可选值: {', '.join(STORAGE_VARIANTS)}")
+    config = {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + path,
+        'TASK_EXECUTOR': 'off',
+        'LOG_FILE': '',
+        'URL_RESOLVE_REDIRECTS': False
+    }
+    config.update(STORAGE_VARIANTS[variant])
+    return config
+
+def make_app(variant, path):
+    """在指定存储方式的数据库上创建应用和基准测试用户"""
+    app = create_app(storage_config(variant, path))
+    with app.app_context():
+        db.create_all()
+        role = Role(name='admin')
+        db.session.add(role)
+        db.session.commit()
+        db.session.add(User(username='bench', email='bench@example.com', role_id=role.id, password_hash='-'))
+        db.session.commit()
+    return app
+
+def writer(app, stop, counters, batch_size, worker_id):
+    """每个事务创建一个任务并写入一批新闻"""
+    with app.app_context():
+        n = 0
+        while not stop.is_set():
+            try:
+                task = ScrapingTask(keyword=f'写线程{worker_id}', created_by=1, status='running')
+                db.session.add(task)
+                db.session.flush()
+                db.session.add_all([
+                    DataCollection(task_id=task.id, title=f'新闻{worker_id}-{n}-{i}', source='基准测试',
+                                   url=f'https://example.com/{worker_id}/{n}/{i}', url_hash=f'{worker_id}-{n}-{i}')
+                    for i in range(batch_size)
+                ])
+                task.total_count = batch_size
+                task.status = 'completed'
+                db.session.commit()
+                counters['writes'] += 1
+            except OperationalError as e:
+                db.session.rollback()
+                counters['locked' if 'locked' in str(e) else 'errors'] += 1
+            n += 1
+
+def reader(app, stop, counters):
+    """读取最新任务的结果第一页并统计任务数"""
+    with app.app_context():
+        while not stop.is_set():
+            try:
+                task_id = db.session.query(db.func.max(ScrapingTask.id)).scalar()
+                DataCollection.query.filter_by(task_id=task_id).order_by(DataCollection.id.desc()).limit(15).all()
+                ScrapingTask.query.filter_by(status='completed').count()
+                db.session.rollback()
+                counters['reads'] += 1
+            except OperationalError as e:
+                db.session.rollback()
+                counters['locked' if 'locked' in str(e) else 'errors'] += 1
+
+def run(variant, directory, args):
+    """运行一种存储方式，返回统计结果"""
+    app = make_app(variant, os.path.join(directory, f'{variant}.db'))
+    with app.app_context():
+        journal_mode = db.session.execute(text('PRAGMA journal_mode')).scalar()
+    
+    # 内存数据库的所有会话共用一个连接，不能并发使用，只运行一个写线程
+    writers, readers = (1, 0) if variant == 'memory' else (args.writers, args.readers)
+    # 每个线程单独计数，结束后汇总
+    thread_counters = [{'writes': 0, 'reads': 0, 'locked': 0, 'errors': 0} for _ in range(writers + readers)]
+    stop = threading.Event()
+    threads = [threading.Thread(target=writer, args=(app, stop, thread_counters[i], args.batch_size, i))
+               for i in range(writers)]
+    threads += [threading.Thread(target=reader, args=(app, stop, thread_counters[writers + i])) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    
+    counters = {key: sum(counter[key] for counter in thread_counters) for key in thread_counters[0]}
+    return journal_mode, writers, readers, counters
+
+def main():
+    parser = argparse.ArgumentParser(description='数据库并发读写基准测试')
+    parser.add_argument('--storage', choices=list(STORAGE_VARIANTS), action='append',
+                        help='存储方式，可重复指定，默认全部运行')
+    parser.add_argument('--writers', type=int, default=4, help='写线程数')
+    parser.add_argument('--readers', type=int, default=4, help='读线程数')
+    parser.add_argument('--batch-size', type=int, default=20, help='每个写事务的新闻条数')
+    parser.add_argument('--seconds', type=float, default=5, help='每种存储方式的运行时长（秒）')
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    directory = tempfile.mkdtemp(prefix='bench_storage_')
+    try:
+        for variant in args.storage or list(STORAGE_VARIANTS):
+            journal_mode, writers, readers, counters = run(variant, directory, args)
+            print(f'{variant:<8} journal_mode={journal_mode:<7} 写线程 {writers} 读线程 {readers}  '
+                  f'写事务 {counters["writes"] / args.seconds:8.0f}/秒  读 {counters["reads"] / args.seconds:8.0f}/秒  '
+                  f'锁定错误 {counters["locked"]}  其他错误 {counters["errors"]}')
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+常用查询的执行计划检查：确认结果列表、任务认领、状态统计等查询使用了对应的索引
+
+默认在临时SQLite数据库上执行全部迁移后检查，同时检查迁移得到的表结构是否包含
+模型中定义的全部列和索引；也可以用 --database 检查已有的数据库。
+有查询未使用预期索引或表结构不一致时以状态码1退出。
+
+用法（在包的上级目录执行）：
+    python -m app.benchmarks.explain_queries
+    python -m app.benchmarks.explain_queries --database sqlite:///app/app.db
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import logging
+from datetime import datetime, timedelta
+import sqlalchemy as sa
+from app import create_app, db
+from app.migrations import upgrade
+from app.models import ScrapingTask, DataCollection, DeepCollection, MonitoredKeyword, NewsDailyStat, TaskDailyStat
+
+def hot_queries():
+    """
+    需要检查的查询
+    
+    Returns:
+        list: (说明, 查询语句, 预期使用的索引名) 元组列表
+    """
+    now = datetime.utcnow()
+    return [
+        ('任务结果列表', sa.select(DataCollection).where(DataCollection.task_id == 1)
+         .order_by(DataCollection.id).limit(15), 'ix_data_collection_task_id_id'),
+        ('待深度采集记录', sa.select(DataCollection.id, DataCollection.url, DataCollection.cluster_id)
+         .where(DataCollection.task_id == 1, DataCollection.is_deep_collected.is_(False)),
+         'ix_data_collection_task_id_id'),
+        ('URL去重确认', sa.select(DataCollection.url_hash).where(DataCollection.url_hash.in_(['a', 'b'])),
+         'ix_data_collection_url_hash'),
+        ('按采集时间统计', sa.select(sa.func.count()).select_from(DataCollection)
+         .where(DataCollection.collected_at >= now - timedelta(days=1)), 'ix_data_collection_collected_at'),
+        ('聚类已有正文', sa.select(DataCollection.cluster_id, DeepCollection.content)
+         .join(DeepCollection, DeepCollection.data_collection_id == DataCollection.id)
+         .where(DataCollection.cluster_id.in_([1, 2])), 'ix_data_collection_cluster_id'),
+        ('深度采集正文关联', sa.select(DeepCollection).where(DeepCollection.data_collection_id == 1),
+         'ix_deep_collection_data_collection_id'),
+        ('认领待执行任务', sa.select(ScrapingTask.id).where(ScrapingTask.status == 'pending')
+         .order_by(ScrapingTask.id).limit(2), 'ix_scraping_task_status_id'),
+        ('按状态统计任务', sa.select(sa.func.count()).select_from(ScrapingTask)
+         .where(ScrapingTask.status == 'completed'), 'ix_scraping_task_status_id'),
+        ('用户的采集任务', sa.select(ScrapingTask).where(ScrapingTask.created_by == 1)
+         .order_by(ScrapingTask.id.desc()).limit(20), 'ix_scraping_task_created_by_id'),
+        ('认领到期监控', sa.select(MonitoredKeyword.id).where(
+            MonitoredKeyword.is_active.is_(True), MonitoredKeyword.next_run_at <= now)
+         .order_by(MonitoredKeyword.next_run_at).limit(2), 'ix_monitored_keyword_active_next_run'),
+        ('新闻按天汇总', sa.select(NewsDailyStat.day, sa.func.sum(NewsDailyStat.item_count))
+         .where(NewsDailyStat.day >= now.date() - timedelta(days=6)).group_by(NewsDailyStat.day),
+         'ux_news_daily_stat_day_keyword_source'),
+        ('任务按天汇总', sa.select(TaskDailyStat.day, TaskDailyStat.status, sa.func.sum(TaskDailyStat.task_count))
+         .where(TaskDailyStat.day >= now.date() - timedelta(days=6)).group_by(TaskDailyStat.day, TaskDailyStat.status),
+         'ux_task_daily_stat_day_keyword_status'),
+    ]
+
+def query_plan(connection, statement):
+    """SQLite的 EXPLAIN QUERY PLAN 结果，每行为一个步骤的说明"""
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={'render_postcompile': True})
+    rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), tuple(
+        compiled.params[name] for name in compiled.positiontup))
+    return [row[-1] for row in rows]
+
+def check_schema(connection):
+    """
+    对比数据库与模型定义的列和索引
+    
+    Returns:
+        list: 缺少的列和索引说明
+    """
+    inspector = sa.inspect(connection)
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            missing.append(f'表 {table.name}')
+            continue
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        missing.extend(f'列 {table.name}.{column.name}' for column in table.columns if column.name not in columns)
+        indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        missing.extend(f'索引 {index.name}' for index in table.indexes if index.name not in indexes)
+    return missing
+
+def main():
+    parser = argparse.ArgumentParser(description='常用查询的执行计划检查')
+    parser.add_argument('--database', help='要检查的SQLite数据库，默认在临时数据库上执行全部迁移')
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    directory = None
+    if args.database:
+        uri = args.database
+    else:
+        directory = tempfile.mkdtemp(prefix='explain_queries_')
+        uri = 'sqlite:///' + os.path.join(directory, 'explain.db')
+    
+    failures = 0
+    try:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': uri, 'TASK_EXECUTOR': 'off', 'LOG_FILE': ''})
+        with app.app_context():
+            if db.engine.dialect.name != 'sqlite':
+                raise ValueError(f'不支持的数据库: {db.engine.dialect.name}，执行计划检查只支持SQLite')
+            if directory:
+                upgrade(db.engine)
+            
+            with db.engine.connect() as connection:
+                for description in check_schema(connection):
+                    print(f'缺少 {description}')
+                    failures += 1
+                
+                for name, statement, index_name in hot_queries():
+                    plan = query_plan(connection, statement)
+                    ok = any(index_name in step for step in plan)
+                    failures += not ok
+                    print(f"{'OK  ' if ok else 'FAIL'} {name:<10} 预期 {index_name}")
+                    for step in plan:
+                        print(f'       {step}')
+    finally:
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
+    
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
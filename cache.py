@@ -0,0 +1,163 @@
+import copy
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# 缓存后端：memory 为进程内缓存；sqlite 为多进程共享的文件缓存；none 为关闭
+CACHE_BACKENDS = ('memory', 'sqlite', 'none')
+
+class MemoryCache:
+    """
+    进程内的TTL + LRU缓存，线程安全
+    
+    默认写入和读取时都复制值，调用方修改读到的结果（排序、补充字段等）不会影响
+    缓存中的条目，与 SQLiteCache 每次读取都重新解码的行为一致。
+    """
+    
+    def __init__(self, ttl=300, maxsize=1000, copy_values=True):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.copy_values = copy_values  # 缓存对象本身（如只读的ORM对象）时设为False
+        self._data = OrderedDict()  # key -> (过期时间, 值)，按最近访问顺序排列
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """
+        读取缓存
+        
+        Args:
+            key (str): 缓存键
+        
+        Returns:
+            缓存的值，未命中或已过期时返回None
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        return copy.deepcopy(value) if self.copy_values else value
+    
+    def set(self, key, value):
+        """写入缓存，超过容量时淘汰最久未访问的条目"""
+        if self.copy_values:
+            value = copy.deepcopy(value)
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def delete(self, key):
+        """删除一个缓存条目"""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+class SQLiteCache:
+    """
+    基于SQLite文件的TTL + LRU缓存
+    
+    多个Web进程指向同一文件即可共享缓存，值以JSON格式保存
+    """
+    
+    def __init__(self, path, ttl=300, maxsize=1000):
+        self.path = path
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._local = threading.local()
+        self._execute('''
+            CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        self._execute('CREATE INDEX IF NOT EXISTS ix_search_cache_accessed_at ON search_cache (accessed_at)')
+    
+    def _connection(self):
+        """每个线程使用独立连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+    
+    def _execute(self, sql, params=()):
+        return self._connection().execute(sql, params)
+    
+    def get(self, key):
+        """
+        读取缓存
+        
+        Args:
+            key (str): 缓存键
+        
+        Returns:
+            缓存的值，未命中或已过期时返回None
+        """
+        now = time.time()
+        row = self._execute('SELECT value, expires_at FROM search_cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] < now:
+            self._execute('DELETE FROM search_cache WHERE key = ?', (key,))
+            return None
+        self._execute('UPDATE search_cache SET accessed_at = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+    
+    def set(self, key, value):
+        """写入缓存，超过容量时淘汰最久未访问的条目"""
+        now = time.time()
+        self._execute(
+            'INSERT OR REPLACE INTO search_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+            (key, json.dumps(value, ensure_ascii=False), now + self.ttl, now)
+        )
+        self._execute('''
+            DELETE FROM search_cache WHERE key IN (
+                SELECT key FROM search_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )
+        ''', (self.maxsize,))
+    
+    def delete(self, key):
+        """删除一个缓存条目"""
+        self._execute('DELETE FROM search_cache WHERE key = ?', (key,))
+    
+    def clear(self):
+        """清空缓存"""
+        self._execute('DELETE FROM search_cache')
+
+def create_cache(config):
+    """
+    根据应用配置创建搜索结果缓存
+    
+    Args:
+        config (dict): Flask应用配置
+    
+    Returns:
+        MemoryCache/SQLiteCache: 缓存实例，配置为关闭时返回None
+    """
+    backend = config.get('SEARCH_CACHE_BACKEND', 'memory')
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f'不支持的缓存后端: {backend}')
+    
+    ttl = config.get('SEARCH_CACHE_TTL', 300)
+    maxsize = config.get('SEARCH_CACHE_MAXSIZE', 1000)
+    if backend == 'none' or ttl <= 0:
+        return None
+    if backend == 'sqlite':
+        return SQLiteCache(config['SEARCH_CACHE_PATH'], ttl=ttl, maxsize=maxsize)
+    return MemoryCache(ttl=ttl, maxsize=maxsize)
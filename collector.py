@@ -0,0 +1,152 @@
+import logging
+from flask import current_app
+from sqlalchemy import update
+from app import db
+from app.models import DataCollection, DeepCollection
+from app.services import checkout_scraper
+from app.ingest import save_deep_collections
+from app.simhash import simhash, to_unsigned
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 同一聚类新闻的深度采集方式：share 共享已采集的正文，skip 只标记为已采集，fetch 分别采集
+DUPLICATE_MODES = ('share', 'skip', 'fetch')
+
+def deep_collect_task(task_id, batch_size=None):
+    """
+    批量深度采集任务下尚未深度采集的新闻
+    
+    Args:
+        task_id (int): 采集任务ID
+        batch_size (int): 每批写入数据库的条数，默认使用应用配置
+    
+    Returns:
+        dict: 统计信息，见 deep_collect_rows
+    """
+    pending = db.session.query(DataCollection.id, DataCollection.url, DataCollection.cluster_id).filter_by(
+        task_id=task_id, is_deep_collected=False).all()
+    return deep_collect_rows(pending, batch_size)
+
+def deep_collect_rows(rows, batch_size=None):
+    """
+    并发深度采集给定的新闻记录，并分批写入深度采集结果
+    
+    同一URL只请求一次。DEEP_COLLECT_DUPLICATES 为 share 或 skip 时同一聚类也只请求
+    一次，聚类中已有正文时不再请求，其余成员共享正文（share）或只标记为已采集（skip）。
+    采集失败的记录不会标记为已深度采集，下次执行时会重新尝试
+    
+    Args:
+        rows (iterable): (DataCollection.id, url, cluster_id) 元组列表
+        batch_size (int): 每批写入数据库的条数，默认使用应用配置
+    
+    Returns:
+        dict: collected 为请求并写入正文的条数，shared 为共享聚类正文的条数，
+              skipped 为按聚类跳过的条数，failed 为失败条数
+    """
+    batch_size = batch_size or current_app.config['DEEP_COLLECT_BATCH_SIZE']
+    duplicates = current_app.config['DEEP_COLLECT_DUPLICATES']
+    if duplicates not in DUPLICATE_MODES:
+        raise ValueError(f'不支持的重复新闻处理方式: {duplicates}，可选值: {", ".join(DUPLICATE_MODES)}')
+    story_index = current_app.extensions['story_index']
+    
+    # 按请求分组：同一URL的记录为一组；合并聚类时同一聚类的记录为一组
+    groups = {}
+    for collection_id, url, cluster_id in rows:
+        key = ('cluster', cluster_id) if duplicates != 'fetch' and cluster_id else ('url', url)
+        group = groups.setdefault(key, {'url': url, 'cluster_id': cluster_id, 'ids': []})
+        group['ids'].append(collection_id)
+    
+    stats = {'collected': 0, 'shared': 0, 'skipped': 0, 'failed': 0}
+    if not groups:
+        return stats
+    
+    batch = []
+    
+    def add_duplicates(collection_ids, content, fingerprint):
+        """聚类中的重复新闻按配置共享正文或只标记为已采集"""
+        for collection_id in collection_ids:
+            if duplicates == 'skip':
+                batch.append((collection_id, None, None))
+                stats['skipped'] += 1
+            else:
+                batch.append((collection_id, content, fingerprint))
+                stats['shared'] += 1
+    
+    # 聚类中已有深度采集正文的，不再请求
+    if duplicates != 'fetch':
+        existing = _cluster_contents([key[1] for key in groups if key[0] == 'cluster'])
+        for cluster_id, (content, fingerprint) in existing.items():
+            add_duplicates(groups.pop(('cluster', cluster_id))['ids'], content, fingerprint)
+    
+    keys_by_url = {}
+    for key, group in groups.items():
+        keys_by_url.setdefault(group['url'], []).append(key)
+    
+    with checkout_scraper() as scraper:
+        for result in scraper.deep_collect_many(list(keys_by_url)):
+            for key in keys_by_url[result['url']]:
+                group = groups[key]
+                collection_ids = group['ids']
+                if result['error']:
+                    stats['failed'] += len(collection_ids)
+                    continue
+                
+                # 正文与其他聚类近似重复时并入该聚类
+                fingerprint = simhash(result['content'])
+                if fingerprint is not None:
+                    cluster_id = story_index.assign_content(collection_ids[0], fingerprint, group['cluster_id'])
+                    if cluster_id != group['cluster_id']:
+                        db.session.execute(
+                            update(DataCollection)
+                            .where(DataCollection.id.in_(collection_ids))
+                            .values(cluster_id=cluster_id)
+                        )
+                
+                # 同一URL的记录都写入正文；同一聚类的其余记录按重复处理
+                if key[0] == 'url':
+                    batch.extend((collection_id, result['content'], fingerprint) for collection_id in collection_ids)
+                    stats['collected'] += len(collection_ids)
+                else:
+                    batch.append((collection_ids[0], result['content'], fingerprint))
+                    stats['collected'] += 1
+                    add_duplicates(collection_ids[1:], result['content'], fingerprint)
+            
+            if len(batch) >= batch_size:
+                save_deep_collections(batch)
+                batch.clear()
+    
+    if batch:
+        save_deep_collections(batch)
+    
+    # 写回本批次累计的站点规则命中次数
+    rule_store = current_app.extensions.get('extraction_rules')
+    if rule_store is not None:
+        rule_store.flush()
+    
+    logger.info('批量深度采集完成，采集%s条，共享%s条，跳过%s条，失败%s条',
+                stats['collected'], stats['shared'], stats['skipped'], stats['failed'])
+    return stats
+
+def _cluster_contents(cluster_ids):
+    """
+    查询聚类中已有的深度采集正文
+    
+    Args:
+        cluster_ids (list): 聚类ID列表
+    
+    Returns:
+        dict: 聚类ID -> (正文, 无符号指纹)
+    """
+    if not cluster_ids:
+        return {}
+    
+    rows = db.session.query(DataCollection.cluster_id, DeepCollection.content, DeepCollection.simhash).join(
+        DeepCollection, DeepCollection.data_collection_id == DataCollection.id).filter(
+        DataCollection.cluster_id.in_(cluster_ids), DeepCollection.content.isnot(None)).all()
+    
+    contents = {}
+    for cluster_id, content, fingerprint in rows:
+        if cluster_id not in contents:
+            contents[cluster_id] = (content, to_unsigned(fingerprint) if fingerprint is not None else None)
+    return contents
@@ -0,0 +1,166 @@
+import os
+import re
+import time
+import queue
+import random
+import logging
+import threading
+from collections import deque
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+class DebugCapture:
+    """
+    搜索响应调试采样器
+    
+    按采样率或仅在解析结果为空时保存响应HTML，由后台线程异步写入
+    环形目录，超过文件数或总大小上限时删除最早的文件
+    """
+    
+    # off: 关闭；sample: 按比例采样；empty: 仅保存解析结果为空的响应
+    MODES = ('off', 'sample', 'empty')
+    
+    def __init__(self, directory, mode='off', sample_rate=0.0, max_files=200,
+                 max_bytes=50 * 1024 * 1024, queue_size=100):
+        if mode not in self.MODES:
+            raise ValueError(f'不支持的调试采样模式: {mode}')
+        self.directory = directory
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._files = deque()  # 环形目录中的文件，按写入先后排列：(路径, 大小)
+        self._total_bytes = 0
+        self._sequence = 0  # 同一毫秒内的写入序号，避免文件名冲突
+        self._worker = None
+        self._disabled = False  # 目录无法使用时关闭采样，不再重复尝试
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config):
+        """
+        根据应用配置创建调试采样器
+        
+        Args:
+            config (dict): Flask应用配置
+        
+        Returns:
+            DebugCapture: 采样器实例，配置为关闭时返回None
+        """
+        mode = config.get('SCRAPER_DEBUG_CAPTURE', 'off')
+        if mode == 'off':
+            return None
+        return cls(
+            config['SCRAPER_DEBUG_DIR'],
+            mode=mode,
+            sample_rate=config.get('SCRAPER_DEBUG_SAMPLE_RATE', 0.0),
+            max_files=config.get('SCRAPER_DEBUG_MAX_FILES', 200),
+            max_bytes=config.get('SCRAPER_DEBUG_MAX_BYTES', 50 * 1024 * 1024)
+        )
+    
+    def should_capture(self, item_count):
+        """判断本次响应是否需要保存"""
+        if self.mode == 'empty':
+            return item_count == 0
+        if self.mode == 'sample':
+            return random.random() < self.sample_rate
+        return False
+    
+    def capture(self, keyword, page, html_content, item_count):
+        """
+        按配置采样保存响应内容，写入在后台线程中完成，不阻塞调用方
+        
+        Args:
+            keyword (str): 搜索关键字
+            page (int): 页码
+            html_content (str): 响应HTML
+            item_count (int): 解析出的新闻条数
+        
+        Returns:
+            bool: 是否已加入写入队列
+        """
+        if self._disabled or not self.should_capture(item_count):
+            return False
+        
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((keyword, page, time.time(), html_content))
+        except queue.Full:
+            # 写入跟不上时直接丢弃，调试采样不能影响抓取
+            logger.warning('调试采样队列已满，丢弃本次响应')
+            return False
+        return True
+    
+    def _ensure_worker(self):
+        """首次使用时启动后台写入线程，目录的创建和扫描在后台线程中完成"""
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='debug-capture', daemon=True)
+                self._worker.start()
+    
+    def _load_existing(self):
+        """加载目录中已有的采样文件，保证重启后仍受容量上限约束"""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith('.html') and os.path.isfile(path):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, path, stat.st_size))
+        
+        for _, path, size in sorted(entries):
+            self._files.append((path, size))
+            self._total_bytes += size
+    
+    def _run(self):
+        """后台写入循环"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._load_existing()
+        except OSError as e:
+            self._disabled = True
+            logger.error('调试采样目录 %s 不可用，已关闭调试采样: %s', self.directory, e)
+            return
+        
+        while True:
+            keyword, page, timestamp, html_content = self._queue.get()
+            try:
+                self._write(keyword, page, timestamp, html_content)
+            except Exception as e:
+                logger.error('保存调试响应失败: %s', e)
+            finally:
+                self._queue.task_done()
+    
+    def _write(self, keyword, page, timestamp, html_content):
+        """写入单个采样文件并清理超出上限的旧文件"""
+        self._sequence += 1
+        filename = '{}-{:03d}_{}_p{}_{}.html'.format(
+            time.strftime('%Y%m%d-%H%M%S', time.localtime(timestamp)),
+            int(timestamp * 1000) % 1000,
+            _safe_name(keyword),
+            page,
+            self._sequence
+        )
+        path = os.path.join(self.directory, filename)
+        data = html_content.encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(data)
+        
+        self._files.append((path, len(data)))
+        self._total_bytes += len(data)
+        
+        while self._files and (len(self._files) > self.max_files or self._total_bytes > self.max_bytes):
+            old_path, old_size = self._files.popleft()
+            self._total_bytes -= old_size
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:
+                pass
+
+def _safe_name(keyword):
+    """将关键字转换为可用作文件名的形式，保留中文字符"""
+    name = re.sub(r'[^\w\-]+', '_', keyword, flags=re.UNICODE).strip('_')
+    return name[:50] or 'empty'
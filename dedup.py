@@ -0,0 +1,186 @@
+import logging
+import threading
+from contextlib import nullcontext
+from flask import current_app, has_app_context
+from app import db
+from app.bloom import BloomFilter
+from app.models import DataCollection, DeepCollection
+from app.simhash import SimHashIndex, simhash, normalize_title, to_unsigned
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+def _app_context(app):
+    """
+    加载索引使用的应用上下文
+    
+    已在该应用的上下文中时沿用当前会话：新建的上下文退出时会归还连接，
+    内存数据库所有会话共用一个连接，归还时的回滚会撤销调用方尚未提交的写入
+    """
+    if has_app_context() and current_app._get_current_object() is app:
+        return nullcontext()
+    return app.app_context()
+
+class UrlDedupIndex:
+    """
+    已采集新闻的URL去重索引
+    
+    内存中的布隆过滤器保存所有已保存新闻的 url_hash，判断为不存在的哈希一定是
+    新新闻，无需访问数据库；只有判断为可能存在的哈希才查询数据库确认。
+    首次使用时从数据库加载，之后由写入路径调用 add() 维护。
+    """
+    
+    def __init__(self, app, capacity=1000000, error_rate=0.001):
+        self.app = app
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._bloom = None
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, app):
+        """根据应用配置创建去重索引"""
+        return cls(
+            app,
+            capacity=app.config['URL_BLOOM_CAPACITY'],
+            error_rate=app.config['URL_BLOOM_ERROR_RATE']
+        )
+    
+    def _load(self):
+        """首次使用时加载数据库中全部 url_hash"""
+        if self._bloom is not None:
+            return self._bloom
+        with self._lock:
+            if self._bloom is None:
+                bloom = BloomFilter(self.capacity, self.error_rate)
+                with _app_context(self.app):
+                    rows = db.session.query(DataCollection.url_hash).filter(
+                        DataCollection.url_hash.isnot(None)).yield_per(10000)
+                    for (value,) in rows:
+                        bloom.add(value)
+                self._bloom = bloom
+                logger.info('URL去重索引加载完成，共%s条', len(bloom))
+        return self._bloom
+    
+    def filter_new(self, hashes):
+        """
+        筛选尚未保存的URL哈希
+        
+        Args:
+            hashes (iterable): url_hash 列表
+        
+        Returns:
+            set: 其中尚未保存的哈希
+        """
+        bloom = self._load()
+        hashes = set(hashes)
+        maybe_stored = [value for value in hashes if value in bloom]
+        if not maybe_stored:
+            return hashes
+        
+        # 布隆过滤器可能误判，可能已存在的哈希由数据库确认
+        stored = {value for (value,) in db.session.query(DataCollection.url_hash).filter(
+            DataCollection.url_hash.in_(maybe_stored)).all()}
+        return hashes - stored
+    
+    def add(self, hashes):
+        """记录新保存的URL哈希"""
+        bloom = self._load()
+        for value in hashes:
+            bloom.add(value)
+
+class StoryIndex:
+    """
+    新闻聚类索引
+    
+    用标题和正文的 SimHash 指纹把转载的同一新闻归入同一聚类（cluster_id 为聚类
+    中首条新闻的ID），深度采集时同一聚类只需请求一次。指纹索引在内存中，
+    首次使用时从数据库加载最近的 maxsize 条记录。
+    """
+    
+    def __init__(self, app, title_distance=6, content_distance=3, maxsize=200000):
+        self.app = app
+        self.maxsize = maxsize
+        self.titles = SimHashIndex(max_distance=title_distance, maxsize=maxsize)
+        self.contents = SimHashIndex(max_distance=content_distance, maxsize=maxsize)
+        self._loaded = False
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, app):
+        """根据应用配置创建聚类索引"""
+        return cls(
+            app,
+            title_distance=app.config['SIMHASH_TITLE_DISTANCE'],
+            content_distance=app.config['SIMHASH_CONTENT_DISTANCE'],
+            maxsize=app.config['SIMHASH_INDEX_MAXSIZE']
+        )
+    
+    def _load(self):
+        """首次使用时加载最近的标题和正文指纹"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            with _app_context(self.app):
+                # 只加载各聚类的首条新闻，与写入时只索引差异较大的标题一致
+                rows = db.session.query(DataCollection.id, DataCollection.simhash, DataCollection.cluster_id).filter(
+                    DataCollection.simhash.isnot(None),
+                    db.or_(DataCollection.cluster_id == DataCollection.id, DataCollection.cluster_id.is_(None))
+                ).order_by(DataCollection.id.desc()).limit(self.maxsize).all()
+                for collection_id, value, cluster_id in reversed(rows):
+                    self.titles.add(collection_id, to_unsigned(value), cluster_id or collection_id)
+                
+                rows = db.session.query(DeepCollection.data_collection_id, DeepCollection.simhash,
+                                        DataCollection.cluster_id).join(DataCollection).filter(
+                    DeepCollection.simhash.isnot(None)).order_by(DeepCollection.id.desc()).limit(self.maxsize).all()
+                for collection_id, value, cluster_id in reversed(rows):
+                    self.contents.add(collection_id, to_unsigned(value), cluster_id or collection_id)
+            self._loaded = True
+            logger.info('新闻聚类索引加载完成，标题%s条，正文%s条', len(self.titles), len(self.contents))
+    
+    def assign_rows(self, rows):
+        """
+        计算新保存新闻的标题指纹并归入聚类
+        
+        Args:
+            rows (list): (DataCollection ID, 标题) 元组列表，按保存顺序
+        
+        Returns:
+            list: (DataCollection ID, 无符号指纹, 聚类ID) 元组列表，标题为空时指纹为None
+        """
+        self._load()
+        clusters = []
+        for collection_id, title in rows:
+            fingerprint = simhash(normalize_title(title), ngram=2)
+            if fingerprint is None:
+                clusters.append((collection_id, None, collection_id))
+                continue
+            match = self.titles.nearest(fingerprint)
+            cluster_id = match[2] if match else collection_id
+            # 与聚类中已有标题几乎相同的不再加入索引，避免热门新闻的桶越来越大
+            if match is None or match[1] > self.titles.max_distance // 2:
+                self.titles.add(collection_id, fingerprint, cluster_id)
+            clusters.append((collection_id, fingerprint, cluster_id))
+        return clusters
+    
+    def assign_content(self, collection_id, fingerprint, cluster_id):
+        """
+        按正文指纹确定新闻所属聚类，正文与其他聚类近似重复时并入该聚类
+        
+        Args:
+            collection_id (int): DataCollection ID
+            fingerprint (int): 正文的64位指纹
+            cluster_id (int): 按标题得到的聚类ID
+        
+        Returns:
+            int: 最终的聚类ID
+        """
+        self._load()
+        cluster_id = cluster_id or collection_id
+        match = self.contents.nearest(fingerprint)
+        if match:
+            cluster_id = match[2]
+        self.contents.add(collection_id, fingerprint, cluster_id)
+        return cluster_id
@@ -0,0 +1,211 @@
+import csv
+import json
+import logging
+from datetime import datetime
+from sqlalchemy import select
+from app import db
+from app.models import ScrapingTask, DataCollection, DeepCollection
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 导出格式：ndjson、csv 可流式返回；parquet 为列式文件，需要安装 pyarrow
+EXPORT_FORMATS = ('ndjson', 'csv', 'parquet')
+
+# 流式导出的格式及其 MIME 类型、文件扩展名，text/* 类型由 Flask 自动加上 charset=utf-8
+STREAM_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv')
+}
+
+# 导出的列，按顺序
+EXPORT_COLUMNS = [
+    ('id', DataCollection.id),
+    ('task_id', DataCollection.task_id),
+    ('keyword', ScrapingTask.keyword),
+    ('title', DataCollection.title),
+    ('url', DataCollection.url),
+    ('source', DataCollection.source),
+    ('image_url', DataCollection.image_url),
+    ('cluster_id', DataCollection.cluster_id),
+    ('collected_at', DataCollection.collected_at),
+    ('is_deep_collected', DataCollection.is_deep_collected),
+    ('content', DeepCollection.content),
+    ('deep_collected_at', DeepCollection.created_at)
+]
+EXPORT_FIELDS = [name for name, _ in EXPORT_COLUMNS]
+
+def iter_rows(task_id=None, batch_size=1000):
+    """
+    按ID顺序逐行读取采集结果及其深度采集正文
+    
+    查询使用 yield_per 分批从数据库游标读取（PostgreSQL、MySQL 为服务端游标），
+    任何时候内存中只有一批记录，且不创建ORM对象。
+    
+    Args:
+        task_id (int): 采集任务ID，为None时导出全部
+        batch_size (int): 每批读取的行数
+    
+    Yields:
+        dict: 字段名到值的映射，字段见 EXPORT_FIELDS
+    """
+    statement = (
+        select(*(column for _, column in EXPORT_COLUMNS))
+        .join(ScrapingTask, ScrapingTask.id == DataCollection.task_id)
+        .outerjoin(DeepCollection, DeepCollection.data_collection_id == DataCollection.id)
+        .order_by(DataCollection.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if task_id is not None:
+        statement = statement.where(DataCollection.task_id == task_id)
+    
+    result = db.session.execute(statement)
+    try:
+        for row in result:
+            yield dict(zip(EXPORT_FIELDS, row))
+    finally:
+        result.close()
+
+def _plain(value):
+    """转换为JSON、CSV可以表示的值"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+# CSV单元格以这些字符开头时会被 Excel 等当作公式执行
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+def _csv_cell(value):
+    """转换为CSV单元格，可能被当作公式的文本前加单引号"""
+    if value is None:
+        return ''
+    value = _plain(value)
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def iter_ndjson(rows, chunk_rows=200):
+    """
+    生成NDJSON文本，每行一条记录
+    
+    Args:
+        rows (iterable): iter_rows 的结果
+        chunk_rows (int): 每次生成的行数，避免逐行产生过小的响应块
+    
+    Yields:
+        str: 若干行NDJSON
+    """
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({key: _plain(value) for key, value in row.items()}, ensure_ascii=False) + '\n')
+        if len(lines) >= chunk_rows:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+class _LineBuffer:
+    """csv.writer 的输出目标，收集写入的文本"""
+    
+    def __init__(self):
+        self.parts = []
+    
+    def write(self, value):
+        self.parts.append(value)
+    
+    def take(self):
+        text = ''.join(self.parts)
+        self.parts = []
+        return text
+
+def iter_csv(rows, chunk_rows=200):
+    """
+    生成CSV文本，首行为表头，开头带 BOM 以便 Excel 识别 UTF-8
+    
+    Args:
+        rows (iterable): iter_rows 的结果
+        chunk_rows (int): 每次生成的行数
+    
+    Yields:
+        str: 若干行CSV
+    """
+    buffer = _LineBuffer()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(EXPORT_FIELDS)
+    count = 0
+    for row in rows:
+        writer.writerow([_csv_cell(value) for value in row.values()])
+        count += 1
+        if count % chunk_rows == 0:
+            yield buffer.take()
+    yield buffer.take()
+
+def stream_export(fmt, task_id=None, batch_size=1000):
+    """
+    流式导出采集结果
+    
+    Args:
+        fmt (str): ndjson 或 csv
+        task_id (int): 采集任务ID，为None时导出全部
+        batch_size (int): 每批从数据库读取的行数
+    
+    Returns:
+        generator: 依次生成导出文本的片段
+    """
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"不支持的流式导出格式: {fmt}，可选值: {', '.join(STREAM_FORMATS)}")
+    rows = iter_rows(task_id, batch_size)
+    return iter_ndjson(rows) if fmt == 'ndjson' else iter_csv(rows)
+
+def write_parquet(path, task_id=None, batch_size=1000):
+    """
+    把采集结果写入Parquet文件，每批记录写为一个行组
+    
+    Args:
+        path (str): 输出文件路径
+        task_id (int): 采集任务ID，为None时导出全部
+        batch_size (int): 每批读取和写入的行数
+    
+    Returns:
+        int: 导出的行数
+    
+    Raises:
+        RuntimeError: 未安装 pyarrow
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError('导出Parquet需要安装 pyarrow：pip install pyarrow') from e
+    
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('task_id', pa.int64()),
+        ('keyword', pa.string()),
+        ('title', pa.string()),
+        ('url', pa.string()),
+        ('source', pa.string()),
+        ('image_url', pa.string()),
+        ('cluster_id', pa.int64()),
+        ('collected_at', pa.timestamp('us')),
+        ('is_deep_collected', pa.bool_()),
+        ('content', pa.string()),
+        ('deep_collected_at', pa.timestamp('us'))
+    ])
+    
+    count = 0
+    batch = []
+    with pq.ParquetWriter(path, schema) as writer:
+        for row in iter_rows(task_id, batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch or count == 0:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    
+    logger.info('已导出%s条采集结果到 %s', count, path)
+    return count
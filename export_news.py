@@ -0,0 +1,43 @@
+"""
+导出采集结果及深度采集正文
+
+分批从数据库游标读取并写入，内存占用与导出行数无关。
+
+用法（在包的上级目录执行）：
+    python -m app.export_news --format csv --output news.csv
+    python -m app.export_news --task-id 3 --format ndjson > task3.ndjson
+    python -m app.export_news --format parquet --output news.parquet
+"""
+import argparse
+import sys
+from app import create_app
+from app.export import EXPORT_FORMATS, stream_export, write_parquet
+
+def main():
+    parser = argparse.ArgumentParser(description='导出采集结果')
+    parser.add_argument('--task-id', type=int, help='采集任务ID，默认导出全部')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='ndjson', help='导出格式')
+    parser.add_argument('--output', default='-', help='输出文件，默认输出到标准输出（parquet 必须指定）')
+    parser.add_argument('--batch-size', type=int, help='每批读取的行数，默认使用 EXPORT_BATCH_SIZE')
+    args = parser.parse_args()
+    
+    app = create_app({'TASK_EXECUTOR': 'off', 'LOG_TO_STDOUT': False})
+    with app.app_context():
+        batch_size = args.batch_size or app.config['EXPORT_BATCH_SIZE']
+        if args.format == 'parquet':
+            if args.output == '-':
+                parser.error('parquet 格式需要用 --output 指定输出文件')
+            count = write_parquet(args.output, args.task_id, batch_size)
+            print(f'已导出 {count} 条采集结果到 {args.output}', file=sys.stderr)
+            return
+        
+        output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+        try:
+            for chunk in stream_export(args.format, args.task_id, batch_size):
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+import re
+from lxml import etree, html as lxml_html
+
+# 不参与正文统计的标签
+SKIP_TAGS = {'script', 'style', 'noscript', 'iframe', 'template', 'svg', 'head'}
+
+# 可作为正文容器的候选标签
+CANDIDATE_TAGS = {'div', 'article', 'section', 'main', 'td'}
+
+# 段落标签，其文本按文本密度和链接密度计分并向上累加到候选容器
+PARAGRAPH_TAGS = {'p', 'pre', 'blockquote'}
+
+# 计分的最短段落长度
+MIN_PARAGRAPH_LENGTH = 20
+
+# 容器 class/id 命中时的权重修正
+POSITIVE_HINT = re.compile(r'article|content|main|body|text|detail|post|news', re.I)
+NEGATIVE_HINT = re.compile(r'comment|footer|nav|sidebar|side|menu|related|recommend|share|copyright|banner|ad[-_]', re.I)
+
+# 发布时间和作者的识别规则
+DATE_HINT = re.compile(r'time|date|pub', re.I)
+AUTHOR_HINT = re.compile(r'author|editor|byline', re.I)
+DATE_PATTERN = re.compile(
+    r'(\d{4})[-/年.](\d{1,2})[-/月.](\d{1,2})日?(?:[\sT]*(\d{1,2}):(\d{2})(?::(\d{2}))?)?'
+)
+META_TIME_KEYS = ('article:published_time', 'og:published_time', 'pubdate', 'publishdate',
+                  'publish_time', 'PubDate', 'ptime')
+META_AUTHOR_KEYS = ('author', 'article:author', 'og:author')
+
+class _Frame:
+    """遍历时每个元素的统计信息"""
+    
+    __slots__ = ('element', 'text_len', 'link_len', 'tags', 'skip', 'hint')
+    
+    def __init__(self, element, skip, hint):
+        self.element = element
+        self.text_len = 0  # 元素内可见文本长度（不含空白）
+        self.link_len = 0  # 其中位于链接内的文本长度
+        self.tags = 0  # 后代元素数
+        self.skip = skip
+        self.hint = hint
+
+def _text_len(text):
+    return len(text.strip()) if text else 0
+
+def _normalize_date(match):
+    """将匹配到的日期统一为 YYYY-MM-DD[ HH:MM[:SS]] 格式"""
+    year, month, day, hour, minute, second = match.groups()
+    value = f'{year}-{int(month):02d}-{int(day):02d}'
+    if hour:
+        value += f' {int(hour):02d}:{minute}'
+        if second:
+            value += f':{second}'
+    return value
+
+def extract_article(html_content):
+    """
+    单次遍历DOM提取新闻正文和元数据
+    
+    遍历过程中统计每个元素的文本长度、链接文本长度和后代元素数，段落按
+    (1 - 链接密度) 加权后累加到父容器（全额）和祖父容器（半额），最后选取
+    得分最高的容器作为正文；同时识别 meta 标签和带 time/date/author 标记的
+    元素中的发布时间与作者。
+    
+    Args:
+        html_content (str): 详情页HTML
+    
+    Returns:
+        dict: content 为正文（段落以换行分隔），title 为标题，
+              publish_time 为发布时间，author 为作者，未识别的字段为空字符串
+    """
+    result = {'content': '', 'title': '', 'publish_time': '', 'author': ''}
+    if not html_content or not html_content.strip():
+        return result
+    
+    root = lxml_html.document_fromstring(html_content)
+    
+    scores = {}
+    paragraphs = []  # 文档顺序的 (段落元素, 段落文本)
+    stack = []
+    best_dense = (0.0, None)  # 无段落页面的兜底：文本密度最高的容器
+    
+    for event, element in etree.iterwalk(root, events=('start', 'end')):
+        tag = element.tag if isinstance(element.tag, str) else ''
+        
+        if event == 'start':
+            parent_skip = stack[-1].skip if stack else False
+            skip = parent_skip or tag in SKIP_TAGS
+            hint = 0.0
+            if tag == 'meta':
+                _collect_meta_tag(element, result)
+            elif tag == 'title':
+                if not result['title']:
+                    result['title'] = (element.text or '').strip()
+            elif not skip:
+                marker = f"{element.get('class', '')} {element.get('id', '')}"
+                if marker.strip():
+                    if POSITIVE_HINT.search(marker):
+                        hint += 0.25
+                    if NEGATIVE_HINT.search(marker):
+                        hint -= 0.5
+                _collect_metadata(element, tag, marker, result)
+            stack.append(_Frame(element, skip, hint))
+            continue
+        
+        frame = stack.pop()
+        if not frame.skip:
+            frame.text_len += _text_len(element.text)
+            if tag == 'a':
+                frame.link_len = frame.text_len
+            
+            if tag in PARAGRAPH_TAGS and frame.text_len:
+                text = ''.join(t.strip() for t in element.itertext() if t)
+                paragraphs.append((element, text))
+                if frame.text_len >= MIN_PARAGRAPH_LENGTH:
+                    contribution = frame.text_len * (1 - frame.link_len / frame.text_len)
+                    parent = element.getparent()
+                    if parent is not None:
+                        scores[parent] = scores.get(parent, 0.0) + contribution
+                        grandparent = parent.getparent()
+                        if grandparent is not None:
+                            scores[grandparent] = scores.get(grandparent, 0.0) + contribution / 2
+            
+            if tag in CANDIDATE_TAGS and frame.text_len:
+                link_density = frame.link_len / frame.text_len
+                density = frame.text_len / (frame.tags + 1) * (1 - link_density)
+                if frame.text_len >= 200 and density > best_dense[0]:
+                    best_dense = (density, element)
+                if element in scores:
+                    scores[element] *= (1 - link_density) * (1 + frame.hint)
+        
+        if stack:
+            parent_frame = stack[-1]
+            parent_frame.tags += frame.tags + 1
+            if not frame.skip:
+                parent_frame.text_len += frame.text_len
+                parent_frame.link_len += frame.link_len
+            if not parent_frame.skip:
+                parent_frame.text_len += _text_len(element.tail)
+    
+    candidates = [(score, element) for element, score in scores.items()
+                  if isinstance(element.tag, str) and element.tag in CANDIDATE_TAGS]
+    if candidates:
+        best = max(candidates, key=lambda item: item[0])[1]
+        result['content'] = '\n'.join(
+            text for element, text in paragraphs
+            if text and best in element.iterancestors()
+        )
+    elif best_dense[1] is not None:
+        result['content'] = ''.join(t.strip() for t in best_dense[1].itertext() if t)[:1000]
+    
+    return result
+
+def _collect_meta_tag(element, result):
+    """从 meta 标签中识别发布时间和作者"""
+    key = element.get('property') or element.get('name') or element.get('itemprop') or ''
+    value = (element.get('content') or '').strip()
+    if not value:
+        return
+    if not result['publish_time'] and key in META_TIME_KEYS:
+        match = DATE_PATTERN.search(value)
+        result['publish_time'] = _normalize_date(match) if match else value
+    elif not result['author'] and key in META_AUTHOR_KEYS:
+        result['author'] = value[:50]
+    elif not result['title'] and key == 'og:title':
+        result['title'] = value
+
+def _collect_metadata(element, tag, marker, result):
+    """从正文区域的 time 标签和带 time/date/author 标记的元素中识别元数据"""
+    if not result['publish_time']:
+        if tag == 'time' and element.get('datetime'):
+            match = DATE_PATTERN.search(element.get('datetime'))
+            if match:
+                result['publish_time'] = _normalize_date(match)
+                return
+        if marker.strip() and DATE_HINT.search(marker):
+            match = DATE_PATTERN.search(''.join(element.itertext())[:100])
+            if match:
+                result['publish_time'] = _normalize_date(match)
+    if not result['author'] and marker.strip() and AUTHOR_HINT.search(marker):
+        text = ''.join(t.strip() for t in element.itertext() if t)
+        if 0 < len(text) <= 50:
+            result['author'] = re.sub(r'^(作者|编辑|责任编辑|来源)[:：]\s*', '', text)
@@ -0,0 +1,205 @@
+import logging
+from itertools import islice
+from flask import current_app
+from sqlalchemy import insert, update, bindparam
+from app import db
+from app.models import ScrapingTask, DataCollection, DeepCollection
+from app.simhash import to_signed
+from app.urls import canonicalize_url, url_hash
+from app.rollups import record_news
+from app.search import sync_search_index
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+def prepare_news(news_list, session=None):
+    """
+    规范化新闻URL并计算去重哈希，去掉批次内的重复新闻和缺少标题或URL的新闻
+    
+    Args:
+        news_list (iterable): 新闻列表
+        session (requests.Session): 用于解析百度跳转链接的会话，为None或配置关闭时不解析
+    
+    Returns:
+        list: 新闻列表，url 替换为规范化URL并附带 url_hash；已处理过的新闻不会重复处理
+    """
+    if not current_app.config['URL_RESOLVE_REDIRECTS']:
+        session = None
+    timeout = current_app.config['URL_RESOLVE_TIMEOUT']
+    
+    prepared = []
+    seen = set()
+    for news in news_list:
+        if not news.get('title') or not news.get('url'):
+            continue
+        if 'url_hash' not in news:
+            url = canonicalize_url(news['url'], session, timeout)
+            news = dict(news, url=url, url_hash=url_hash(url))
+        if news['url_hash'] in seen:
+            continue
+        seen.add(news['url_hash'])
+        prepared.append(news)
+    return prepared
+
+def _insert_ignore(model):
+    """构造跳过唯一键冲突的批量插入语句"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        return dialect_insert(model.__table__).on_conflict_do_nothing()
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        return dialect_insert(model.__table__).on_conflict_do_nothing()
+    if dialect in ('mysql', 'mariadb'):
+        return insert(model.__table__).prefix_with('IGNORE')
+    return insert(model.__table__)
+
+def _insert_rows(statement, task_id, rows):
+    """
+    执行跳过冲突的批量插入，只返回本条语句实际写入的记录
+    
+    去重索引是在其他进程写入之前加载的（如租约回收后重新执行的任务），
+    已存在的新闻可能通过过滤后被唯一索引跳过，不能计入本批写入
+    
+    Args:
+        statement (Insert): _insert_ignore 构造的插入语句
+        task_id (int): 采集任务ID
+        rows (list): 待插入的记录
+    
+    Returns:
+        list: (ID, 标题, 来源) 元组列表，按ID排序
+    """
+    columns = (DataCollection.__table__.c.id, DataCollection.__table__.c.title, DataCollection.__table__.c.source)
+    if db.engine.dialect.insert_executemany_returning:
+        # SQLite 3.35+、PostgreSQL 支持 RETURNING，冲突跳过的记录不会返回
+        return sorted(tuple(row) for row in db.session.execute(statement.returning(*columns), rows))
+    
+    # 不支持 RETURNING 时先记下本批中已存在的哈希，插入后排除
+    hashes = [row['url_hash'] for row in rows]
+    existing = {value for (value,) in db.session.query(DataCollection.url_hash).filter(DataCollection.url_hash.in_(hashes))}
+    db.session.execute(statement, rows)
+    return db.session.query(*columns).filter(
+        DataCollection.task_id == task_id,
+        DataCollection.url_hash.in_([value for value in hashes if value not in existing])
+    ).order_by(DataCollection.id).all()
+
+def _sync_search_index():
+    """把新写入的采集结果加入全文索引，失败时留待下次同步，不影响写入"""
+    try:
+        sync_search_index()
+    except Exception as e:
+        logger.warning('同步全文索引失败: %s', e)
+
+def ingest_news(task_id, news_iter, batch_size=None, session=None):
+    """
+    批量保存采集到的新闻
+    
+    按批处理新闻：规范化URL，经去重索引过滤已保存的新闻，用一条 executemany
+    插入语句写入（与其他执行器并发写入相同新闻时由唯一索引跳过冲突），
+    归入新闻聚类，并在同一事务中累加任务的 total_count 和按天汇总的新闻数量，每批提交一次，
+    提交后同步全文索引。
+    
+    Args:
+        task_id (int): 采集任务ID
+        news_iter (iterable): 新闻列表或迭代器
+        batch_size (int): 每批条数，默认使用应用配置
+        session (requests.Session): 用于解析百度跳转链接的会话
+    
+    Returns:
+        dict: received 为收到的条数，inserted 为新保存的条数，duplicates 为重复跳过的条数，
+        invalid 为缺少标题或URL而丢弃的条数
+    """
+    batch_size = batch_size or current_app.config['INGEST_BATCH_SIZE']
+    url_index = current_app.extensions['url_index']
+    story_index = current_app.extensions['story_index']
+    statement = _insert_ignore(DataCollection)
+    collections = DataCollection.__table__
+    keyword = db.session.query(ScrapingTask.keyword).filter_by(id=task_id).scalar()
+    
+    stats = {'received': 0, 'inserted': 0, 'duplicates': 0, 'invalid': 0}
+    news_iter = iter(news_iter)
+    while True:
+        chunk = list(islice(news_iter, batch_size))
+        if not chunk:
+            break
+        stats['received'] += len(chunk)
+        valid = [news for news in chunk if news.get('title') and news.get('url')]
+        stats['invalid'] += len(chunk) - len(valid)
+        
+        news_list = prepare_news(valid, session)
+        new_hashes = url_index.filter_new(news['url_hash'] for news in news_list)
+        rows = [
+            {
+                'task_id': task_id,
+                'title': news['title'][:200],
+                'image_url': (news.get('image_url') or '')[:255],
+                'source': (news.get('source') or '')[:100],
+                'url': news['url'][:255],
+                'url_hash': news['url_hash'],
+                'is_deep_collected': False,
+                'saved_to_db': False
+            }
+            for news in news_list if news['url_hash'] in new_hashes
+        ]
+        if not rows:
+            stats['duplicates'] += len(valid)
+            continue
+        
+        try:
+            inserted = _insert_rows(statement, task_id, rows)
+            
+            clusters = story_index.assign_rows([(collection_id, title) for collection_id, title, _ in inserted])
+            if clusters:
+                db.session.execute(
+                    collections.update().where(collections.c.id == bindparam('collection_id')).values(
+                        simhash=bindparam('fingerprint'), cluster_id=bindparam('cluster')),
+                    [{'collection_id': collection_id, 'fingerprint': to_signed(fingerprint) if fingerprint is not None else None,
+                      'cluster': cluster_id} for collection_id, fingerprint, cluster_id in clusters]
+                )
+            
+            db.session.execute(
+                update(ScrapingTask).where(ScrapingTask.id == task_id).values(
+                    total_count=db.func.coalesce(ScrapingTask.total_count, 0) + len(inserted))
+            )
+            record_news(keyword, [source for _, _, source in inserted])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        url_index.add(row['url_hash'] for row in rows)
+        _sync_search_index()
+        stats['inserted'] += len(inserted)
+        stats['duplicates'] += len(valid) - len(inserted)
+    
+    logger.info('任务%s保存新闻完成，收到%s条，新增%s条，重复%s条，无效%s条',
+                task_id, stats['received'], stats['inserted'], stats['duplicates'], stats['invalid'])
+    if stats['invalid']:
+        logger.warning('任务%s有%s条新闻缺少标题或URL，已丢弃', task_id, stats['invalid'])
+    return stats
+
+def save_deep_collections(batch):
+    """
+    在一个事务中批量写入深度采集结果并更新采集状态
+    
+    Args:
+        batch (list): (DataCollection.id, 正文, 无符号指纹) 元组列表，正文为None的记录只标记为已采集
+    """
+    try:
+        rows = [
+            {'data_collection_id': collection_id, 'content': content,
+             'simhash': to_signed(fingerprint) if fingerprint is not None else None}
+            for collection_id, content, fingerprint in batch if content is not None
+        ]
+        if rows:
+            db.session.execute(insert(DeepCollection.__table__), rows)
+        db.session.execute(
+            update(DataCollection)
+            .where(DataCollection.id.in_([collection_id for collection_id, _, _ in batch]))
+            .values(is_deep_collected=True)
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    _sync_search_index()
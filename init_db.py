@@ -1,11 +1,12 @@
 from app import create_app, db
+from app.migrations import upgrade
 from app.models import Role, User
 
 app = create_app()
 
 with app.app_context():
-    # 创建数据库表
-    db.create_all()
+    # 执行数据库迁移，创建或更新表结构
+    upgrade(db.engine)
     
     # 创建角色
     if not Role.query.first():
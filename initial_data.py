@@ -1,4 +1,5 @@
 from app import create_app, db
+from app.migrations import upgrade
 from app.models import Role, User
 
 # 创建应用实例
@@ -6,8 +7,8 @@ app = create_app()
 
 # 应用上下文
 with app.app_context():
-    # 创建数据库表
-    db.create_all()
+    # 执行数据库迁移，创建或更新表结构
+    upgrade(db.engine)
     
     # 创建角色
     print('创建默认角色...')
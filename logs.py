@@ -0,0 +1,93 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# 日志格式：json 为结构化日志，text 为原有的文本格式
+LOG_FORMATS = ('json', 'text')
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# LogRecord 的标准属性，其余属性视为通过 extra 传入的结构化字段
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+# 当前进程的后台写日志线程
+_listener = None
+
+class JsonFormatter(logging.Formatter):
+    """将日志记录格式化为单行JSON"""
+    
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+def init_logging(app):
+    """
+    配置进程日志：业务线程只把日志记录放入队列，由后台线程写入
+    按大小轮转的日志文件和标准输出
+    
+    Args:
+        app (Flask): 应用实例，读取 LOG_* 配置
+    
+    Returns:
+        QueueListener: 后台写日志线程
+    """
+    global _listener
+    
+    config = app.config
+    log_format = config.get('LOG_FORMAT', 'json')
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f'不支持的日志格式: {log_format}，可选值: {", ".join(LOG_FORMATS)}')
+    
+    handlers = []
+    if config.get('LOG_FILE'):
+        file_handler = RotatingFileHandler(
+            config['LOG_FILE'],
+            maxBytes=config.get('LOG_MAX_BYTES', 10 * 1024 * 1024),
+            backupCount=config.get('LOG_BACKUP_COUNT', 5),
+            encoding='utf-8'
+        )
+        file_handler.setFormatter(JsonFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT))
+        handlers.append(file_handler)
+    if config.get('LOG_TO_STDOUT', True):
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(stream_handler)
+    
+    # 重复创建应用时先停止之前的后台线程，避免重复输出
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+    
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, QueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(config.get('LOG_LEVEL', 'INFO').upper())
+    
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+@atexit.register
+def _stop_listener():
+    """进程退出前写完队列中剩余的日志"""
+    if _listener is not None:
+        _listener.stop()
@@ -1,9 +1,12 @@
 from app import create_app, db
+from app.migrations import upgrade
 
 # 创建应用实例
 app = create_app()
 
 with app.app_context():
-    # 创建所有表
-    db.create_all()
-    print('数据库初始化完成！')
\ No newline at end of file
+    # 执行尚未执行的数据库迁移
+    applied = upgrade(db.engine)
+    for name in applied:
+        print(f'已执行迁移: {name}')
+    print('数据库初始化完成！' if applied else '数据库已是最新版本！')
\ No newline at end of file
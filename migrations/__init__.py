@@ -0,0 +1,90 @@
+"""
+数据库迁移
+
+每个迁移是本目录下名为 v<版本号>_<说明>.py 的模块，提供 upgrade(connection) 函数。
+已执行的版本记录在 schema_migrations 表中，upgrade() 按版本号依次执行尚未执行的迁移，
+每个迁移在独立的事务中完成。
+
+迁移中的建表、加列、建索引都会先检查是否已存在（见 ops 模块），
+因此也可以用于在迁移机制引入之前由 db.create_all() 创建的旧数据库。
+"""
+import importlib
+import logging
+import pkgutil
+import re
+from datetime import datetime
+import sqlalchemy as sa
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+MIGRATION_PATTERN = re.compile(r'^v(\d+)_\w+$')
+
+metadata = sa.MetaData()
+
+schema_migrations = sa.Table(
+    'schema_migrations', metadata,
+    sa.Column('version', sa.Integer, primary_key=True),
+    sa.Column('name', sa.String(100), nullable=False),
+    sa.Column('applied_at', sa.DateTime, nullable=False)
+)
+
+def load_migrations():
+    """
+    加载全部迁移模块
+    
+    Returns:
+        list: (版本号, 模块名, 模块) 元组列表，按版本号排序
+    """
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = MIGRATION_PATTERN.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f'{__name__}.{module_info.name}')
+        migrations.append((int(match.group(1)), module_info.name, module))
+    migrations.sort(key=lambda migration: migration[0])
+    
+    versions = [version for version, _, _ in migrations]
+    if len(set(versions)) != len(versions):
+        raise ValueError(f'迁移版本号重复: {versions}')
+    return migrations
+
+def applied_versions(connection):
+    """已执行的迁移版本号集合"""
+    if not sa.inspect(connection).has_table(schema_migrations.name):
+        return set()
+    return {version for (version,) in connection.execute(sa.select(schema_migrations.c.version))}
+
+def current_version(engine):
+    """数据库当前的迁移版本号，未执行过迁移时为0"""
+    with engine.connect() as connection:
+        return max(applied_versions(connection), default=0)
+
+def upgrade(engine, target=None):
+    """
+    执行尚未执行的迁移
+    
+    Args:
+        engine (Engine): 数据库引擎
+        target (int): 执行到的版本号，默认执行全部
+    
+    Returns:
+        list: 本次执行的迁移模块名
+    """
+    with engine.begin() as connection:
+        schema_migrations.create(connection, checkfirst=True)
+    
+    applied = []
+    for version, name, module in load_migrations():
+        if target is not None and version > target:
+            break
+        with engine.begin() as connection:
+            if version in applied_versions(connection):
+                continue
+            logger.info('执行数据库迁移 %s', name)
+            module.upgrade(connection)
+            connection.execute(schema_migrations.insert().values(
+                version=version, name=name, applied_at=datetime.utcnow()))
+        applied.append(name)
+    return applied
@@ -0,0 +1,71 @@
+"""
+迁移中使用的结构变更操作，均先检查是否已存在，重复执行不会报错
+"""
+import logging
+import sqlalchemy as sa
+from sqlalchemy.schema import CreateColumn
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+def has_column(connection, table_name, column_name):
+    """表中是否已有该列"""
+    return column_name in {column['name'] for column in sa.inspect(connection).get_columns(table_name)}
+
+def has_index(connection, table_name, index_name):
+    """表上是否已有该名称的索引"""
+    return index_name in {index['name'] for index in sa.inspect(connection).get_indexes(table_name)}
+
+def add_column(connection, table, column_name):
+    """
+    为已存在的表添加列
+    
+    Args:
+        connection (Connection): 数据库连接
+        table (Table): 迁移中定义的表，列定义从中读取
+        column_name (str): 列名，列必须允许为空或有常量默认值
+    
+    Returns:
+        bool: 是否添加了列
+    """
+    if has_column(connection, table.name, column_name):
+        return False
+    ddl = CreateColumn(table.c[column_name]).compile(dialect=connection.dialect)
+    connection.execute(sa.text(f'ALTER TABLE {connection.dialect.identifier_preparer.format_table(table)} ADD COLUMN {ddl}'))
+    logger.info('添加列 %s.%s', table.name, column_name)
+    return True
+
+def create_index(connection, index):
+    """
+    创建索引
+    
+    Args:
+        connection (Connection): 数据库连接
+        index (Index): 迁移中定义的索引
+    
+    Returns:
+        bool: 是否创建了索引
+    """
+    if has_index(connection, index.table.name, index.name):
+        return False
+    index.create(connection)
+    logger.info('创建索引 %s', index.name)
+    return True
+
+def ensure_table(connection, table):
+    """
+    使数据库中的表与迁移中的定义一致：表不存在时创建，
+    已存在时添加缺少的列和索引（不修改、不删除已有的列）
+    
+    Args:
+        connection (Connection): 数据库连接
+        table (Table): 迁移中定义的表
+    """
+    if not sa.inspect(connection).has_table(table.name):
+        table.create(connection)
+        logger.info('创建表 %s', table.name)
+        return
+    for column in table.columns:
+        add_column(connection, table, column.name)
+    for index in table.indexes:
+        create_index(connection, index)
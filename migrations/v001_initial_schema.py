@@ -0,0 +1,73 @@
+"""
+初始表结构：用户、角色、系统设置、采集任务、采集结果和深度采集结果
+"""
+import sqlalchemy as sa
+from app.migrations.ops import ensure_table
+
+metadata = sa.MetaData()
+
+role = sa.Table(
+    'role', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('name', sa.String(20), unique=True, nullable=False),
+    sa.Column('description', sa.String(100)),
+    sa.Column('created_at', sa.DateTime, server_default=sa.func.now())
+)
+
+user = sa.Table(
+    'user', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('username', sa.String(80), unique=True, nullable=False),
+    sa.Column('email', sa.String(120), unique=True, nullable=False),
+    sa.Column('password_hash', sa.String(128), nullable=False),
+    sa.Column('role_id', sa.Integer, sa.ForeignKey('role.id'), nullable=False),
+    sa.Column('created_at', sa.DateTime, server_default=sa.func.now()),
+    sa.Column('updated_at', sa.DateTime, server_default=sa.func.now())
+)
+
+system_setting = sa.Table(
+    'system_setting', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('key', sa.String(50), unique=True, nullable=False),
+    sa.Column('value', sa.String(255), nullable=False),
+    sa.Column('description', sa.String(200)),
+    sa.Column('updated_at', sa.DateTime)
+)
+
+scraping_task = sa.Table(
+    'scraping_task', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('keyword', sa.String(100), nullable=False),
+    sa.Column('page', sa.Integer),
+    sa.Column('status', sa.String(20)),
+    sa.Column('total_count', sa.Integer),
+    sa.Column('created_by', sa.Integer, sa.ForeignKey('user.id'), nullable=False),
+    sa.Column('created_at', sa.DateTime, server_default=sa.func.now()),
+    sa.Column('completed_at', sa.DateTime)
+)
+
+data_collection = sa.Table(
+    'data_collection', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('task_id', sa.Integer, sa.ForeignKey('scraping_task.id'), nullable=False),
+    sa.Column('title', sa.String(200), nullable=False),
+    sa.Column('image_url', sa.String(255)),
+    sa.Column('source', sa.String(100)),
+    sa.Column('url', sa.String(255), nullable=False),
+    sa.Column('is_deep_collected', sa.Boolean),
+    sa.Column('collected_at', sa.DateTime, server_default=sa.func.now()),
+    sa.Column('saved_to_db', sa.Boolean)
+)
+
+deep_collection = sa.Table(
+    'deep_collection', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('data_collection_id', sa.Integer, sa.ForeignKey('data_collection.id'), nullable=False),
+    sa.Column('content', sa.Text),
+    sa.Column('created_at', sa.DateTime, server_default=sa.func.now())
+)
+
+def upgrade(connection):
+    # 早期由 db.create_all() 创建的数据库缺少 deep_collection 表和采集状态列，在此补齐
+    for table in metadata.sorted_tables:
+        ensure_table(connection, table)
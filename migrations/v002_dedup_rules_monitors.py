@@ -0,0 +1,89 @@
+"""
+新闻去重与聚类列、站点提取规则表、关键词监控表
+
+已有的采集结果按URL补齐 url_hash，同一URL的多条记录只有最早的一条记录哈希
+"""
+import sqlalchemy as sa
+from app.migrations.ops import ensure_table, add_column, create_index
+from app.urls import canonicalize_url, url_hash
+
+metadata = sa.MetaData()
+
+# 外键引用的表，只用于解析外键，不会被创建或修改
+sa.Table('user', metadata, sa.Column('id', sa.Integer, primary_key=True))
+
+data_collection = sa.Table(
+    'data_collection', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('url', sa.String(255), nullable=False),
+    sa.Column('url_hash', sa.String(40)),
+    sa.Column('simhash', sa.BigInteger),
+    sa.Column('cluster_id', sa.Integer),
+    sa.Index('ix_data_collection_url_hash', 'url_hash', unique=True),
+    sa.Index('ix_data_collection_cluster_id', 'cluster_id')
+)
+
+deep_collection = sa.Table(
+    'deep_collection', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('simhash', sa.BigInteger)
+)
+
+extraction_rule = sa.Table(
+    'extraction_rule', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('host', sa.String(255), unique=True, nullable=False),
+    sa.Column('strategy', sa.String(50), nullable=False),
+    sa.Column('hit_count', sa.Integer),
+    sa.Column('failure_count', sa.Integer),
+    sa.Column('updated_at', sa.DateTime)
+)
+
+monitored_keyword = sa.Table(
+    'monitored_keyword', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('keyword', sa.String(100), unique=True, nullable=False),
+    sa.Column('interval_minutes', sa.Integer),
+    sa.Column('max_pages', sa.Integer),
+    sa.Column('is_active', sa.Boolean),
+    sa.Column('next_run_at', sa.DateTime),
+    sa.Column('last_run_at', sa.DateTime),
+    sa.Column('last_pages', sa.Integer),
+    sa.Column('last_new_count', sa.Integer),
+    sa.Column('created_by', sa.Integer, sa.ForeignKey('user.id'), nullable=False),
+    sa.Column('created_at', sa.DateTime, server_default=sa.func.now())
+)
+
+def backfill_url_hash(connection, batch_size=1000):
+    """为没有 url_hash 的采集结果计算哈希（不解析跳转链接）"""
+    seen = {value for (value,) in connection.execute(
+        sa.select(data_collection.c.url_hash).where(data_collection.c.url_hash.isnot(None)))}
+    rows = connection.execute(
+        sa.select(data_collection.c.id, data_collection.c.url)
+        .where(data_collection.c.url_hash.is_(None))
+        .order_by(data_collection.c.id)
+    ).all()
+
+    updates = []
+    for collection_id, url in rows:
+        value = url_hash(canonicalize_url(url))
+        if value in seen:
+            continue
+        seen.add(value)
+        updates.append({'collection_id': collection_id, 'value': value})
+
+    statement = data_collection.update().where(
+        data_collection.c.id == sa.bindparam('collection_id')).values(url_hash=sa.bindparam('value'))
+    for start in range(0, len(updates), batch_size):
+        connection.execute(statement, updates[start:start + batch_size])
+
+def upgrade(connection):
+    for column_name in ('url_hash', 'simhash', 'cluster_id'):
+        add_column(connection, data_collection, column_name)
+    backfill_url_hash(connection)
+    for index in data_collection.indexes:
+        create_index(connection, index)
+
+    add_column(connection, deep_collection, 'simhash')
+    ensure_table(connection, extraction_rule)
+    ensure_table(connection, monitored_keyword)
@@ -0,0 +1,52 @@
+"""
+常用查询的索引
+
+- data_collection (task_id, id)：任务结果列表按ID分页、查找任务中待深度采集的记录
+- data_collection (collected_at)：按采集时间统计
+- scraping_task (status, id)：执行器认领待执行任务、按状态统计
+- scraping_task (created_by, id)：用户的采集任务
+- deep_collection (data_collection_id)：采集结果关联深度采集正文
+- monitored_keyword (is_active, next_run_at)：认领到期的关键词监控
+"""
+import sqlalchemy as sa
+from app.migrations.ops import create_index
+
+metadata = sa.MetaData()
+
+data_collection = sa.Table(
+    'data_collection', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('task_id', sa.Integer),
+    sa.Column('collected_at', sa.DateTime),
+    sa.Index('ix_data_collection_task_id_id', 'task_id', 'id'),
+    sa.Index('ix_data_collection_collected_at', 'collected_at')
+)
+
+scraping_task = sa.Table(
+    'scraping_task', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('status', sa.String(20)),
+    sa.Column('created_by', sa.Integer),
+    sa.Index('ix_scraping_task_status_id', 'status', 'id'),
+    sa.Index('ix_scraping_task_created_by_id', 'created_by', 'id')
+)
+
+deep_collection = sa.Table(
+    'deep_collection', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('data_collection_id', sa.Integer),
+    sa.Index('ix_deep_collection_data_collection_id', 'data_collection_id')
+)
+
+monitored_keyword = sa.Table(
+    'monitored_keyword', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('is_active', sa.Boolean),
+    sa.Column('next_run_at', sa.DateTime),
+    sa.Index('ix_monitored_keyword_active_next_run', 'is_active', 'next_run_at')
+)
+
+def upgrade(connection):
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            create_index(connection, index)
@@ -0,0 +1,47 @@
+"""
+新闻全文索引（仅SQLite）
+
+news_fts 为 FTS5 表，rowid 为 data_collection.id，title 和 content 列保存
+cjk_bigrams() 切分后的标题和深度采集正文（见 app/search.py），由触发器与
+data_collection、deep_collection 保持同步。cjk_bigrams 由应用在每个连接上注册。
+"""
+import sqlalchemy as sa
+
+STATEMENTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(title, content, tokenize='unicode61')",
+    
+    """CREATE TRIGGER IF NOT EXISTS data_collection_fts_insert AFTER INSERT ON data_collection BEGIN
+        INSERT INTO news_fts(rowid, title, content) VALUES (new.id, cjk_bigrams(new.title), '');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS data_collection_fts_update AFTER UPDATE OF title ON data_collection BEGIN
+        UPDATE news_fts SET title = cjk_bigrams(new.title) WHERE rowid = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS data_collection_fts_delete AFTER DELETE ON data_collection BEGIN
+        DELETE FROM news_fts WHERE rowid = old.id;
+    END""",
+    
+    """CREATE TRIGGER IF NOT EXISTS deep_collection_fts_insert AFTER INSERT ON deep_collection BEGIN
+        UPDATE news_fts SET content = cjk_bigrams(new.content) WHERE rowid = new.data_collection_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS deep_collection_fts_update AFTER UPDATE OF content ON deep_collection BEGIN
+        UPDATE news_fts SET content = cjk_bigrams(new.content) WHERE rowid = new.data_collection_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS deep_collection_fts_delete AFTER DELETE ON deep_collection BEGIN
+        UPDATE news_fts SET content = '' WHERE rowid = old.data_collection_id;
+    END""",
+]
+
+BACKFILL = """
+    INSERT INTO news_fts(rowid, title, content)
+    SELECT dc.id, cjk_bigrams(dc.title), cjk_bigrams(
+        (SELECT content FROM deep_collection WHERE data_collection_id = dc.id ORDER BY id DESC LIMIT 1))
+    FROM data_collection dc
+    WHERE dc.id NOT IN (SELECT rowid FROM news_fts)
+"""
+
+def upgrade(connection):
+    if connection.dialect.name != 'sqlite':
+        return
+    for statement in STATEMENTS:
+        connection.execute(sa.text(statement))
+    connection.execute(sa.text(BACKFILL))
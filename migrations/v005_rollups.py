@@ -0,0 +1,52 @@
+"""
+仪表盘和监控图表使用的按天汇总表
+
+news_daily_stat、task_daily_stat 由写入管道和任务执行器增量更新（见 app/rollups.py），
+创建时按已有的采集结果和任务回填。
+"""
+import sqlalchemy as sa
+from app.migrations.ops import ensure_table
+
+metadata = sa.MetaData()
+
+news_daily_stat = sa.Table(
+    'news_daily_stat', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('day', sa.Date, nullable=False),
+    sa.Column('keyword', sa.String(100), nullable=False),
+    sa.Column('source', sa.String(100), nullable=False),
+    sa.Column('item_count', sa.Integer, nullable=False),
+    sa.Index('ux_news_daily_stat_day_keyword_source', 'day', 'keyword', 'source', unique=True)
+)
+
+task_daily_stat = sa.Table(
+    'task_daily_stat', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('day', sa.Date, nullable=False),
+    sa.Column('keyword', sa.String(100), nullable=False),
+    sa.Column('status', sa.String(20), nullable=False),
+    sa.Column('task_count', sa.Integer, nullable=False),
+    sa.Index('ux_task_daily_stat_day_keyword_status', 'day', 'keyword', 'status', unique=True)
+)
+
+BACKFILL_NEWS = """
+    INSERT INTO news_daily_stat (day, keyword, source, item_count)
+    SELECT date(dc.collected_at), COALESCE(st.keyword, ''), COALESCE(dc.source, ''), COUNT(*)
+    FROM data_collection dc JOIN scraping_task st ON st.id = dc.task_id
+    WHERE dc.collected_at IS NOT NULL
+    GROUP BY date(dc.collected_at), COALESCE(st.keyword, ''), COALESCE(dc.source, '')
+"""
+
+BACKFILL_TASKS = """
+    INSERT INTO task_daily_stat (day, keyword, status, task_count)
+    SELECT date(COALESCE(completed_at, created_at)), COALESCE(keyword, ''), status, COUNT(*)
+    FROM scraping_task
+    WHERE status IN ('completed', 'failed')
+    GROUP BY date(COALESCE(completed_at, created_at)), COALESCE(keyword, ''), status
+"""
+
+def upgrade(connection):
+    for table, backfill in ((news_daily_stat, BACKFILL_NEWS), (task_daily_stat, BACKFILL_TASKS)):
+        ensure_table(connection, table)
+        if connection.execute(sa.select(sa.func.count()).select_from(table)).scalar() == 0:
+            connection.execute(sa.text(backfill))
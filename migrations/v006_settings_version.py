@@ -0,0 +1,21 @@
+"""
+系统设置版本号表
+
+settings_version 只有一行，SystemSetting.set 修改设置时递增，各进程据此判断
+进程内的设置快照是否过期（见 app/settings.py）。
+"""
+import sqlalchemy as sa
+from app.migrations.ops import ensure_table
+
+metadata = sa.MetaData()
+
+settings_version = sa.Table(
+    'settings_version', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('version', sa.Integer, nullable=False)
+)
+
+def upgrade(connection):
+    ensure_table(connection, settings_version)
+    if connection.execute(sa.select(settings_version.c.id).where(settings_version.c.id == 1)).first() is None:
+        connection.execute(settings_version.insert().values(id=1, version=1))
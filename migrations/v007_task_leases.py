@@ -0,0 +1,23 @@
+"""
+采集任务的执行租约
+
+claimed_by、heartbeat_at 记录认领任务的执行器和最近一次续约时间，attempts 为
+已执行次数。执行器退出后遗留在 running 的任务在租约过期后被回收（见 app/tasks.py）。
+升级前已停留在 running 的任务没有续约时间，会在执行器首次检查时被回收。
+"""
+import sqlalchemy as sa
+from app.migrations.ops import add_column
+
+metadata = sa.MetaData()
+
+scraping_task = sa.Table(
+    'scraping_task', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('claimed_by', sa.String(100)),
+    sa.Column('heartbeat_at', sa.DateTime),
+    sa.Column('attempts', sa.Integer, server_default='0')
+)
+
+def upgrade(connection):
+    for name in ('claimed_by', 'heartbeat_at', 'attempts'):
+        add_column(connection, scraping_task, name)
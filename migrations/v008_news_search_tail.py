@@ -0,0 +1,14 @@
+"""
+重建新闻全文索引（仅SQLite）
+
+cjk_bigrams() 建立索引时为每段中文的最后一个字单独生成一个词，单字检索才能找到
+位于词语末尾的字（如"议"匹配"召开会议"），已有的索引内容需要按新的切分方式重建。
+"""
+import sqlalchemy as sa
+from app.migrations.v004_news_search import BACKFILL
+
+def upgrade(connection):
+    if connection.dialect.name != 'sqlite':
+        return
+    connection.execute(sa.text('DELETE FROM news_fts'))
+    connection.execute(sa.text(BACKFILL))
@@ -0,0 +1,51 @@
+"""
+全文索引改由应用维护（仅SQLite）
+
+v004 的触发器调用应用在连接上注册的 cjk_bigrams()，其他工具（sqlite3 命令行、
+备份恢复脚本等）的连接没有该函数，写入 data_collection、deep_collection 会失败。
+这里把触发器改为只在 news_fts_pending 中记录变化的 DataCollection ID，
+由应用切分后写入 news_fts（见 app/search.py 的 sync_search_index）。
+"""
+import sqlalchemy as sa
+
+# v004 中调用 cjk_bigrams() 的触发器，同名重建为只记录ID的版本
+TRIGGERS = (
+    'data_collection_fts_insert', 'data_collection_fts_update', 'data_collection_fts_delete',
+    'deep_collection_fts_insert', 'deep_collection_fts_update', 'deep_collection_fts_delete'
+)
+
+STATEMENTS = [
+    # id 递增，同步时只删除已处理的记录，处理期间新记录的变化不会丢失
+    """CREATE TABLE IF NOT EXISTS news_fts_pending (
+        id INTEGER PRIMARY KEY,
+        data_collection_id INTEGER NOT NULL
+    )""",
+    
+    """CREATE TRIGGER data_collection_fts_insert AFTER INSERT ON data_collection BEGIN
+        INSERT INTO news_fts_pending(data_collection_id) VALUES (new.id);
+    END""",
+    """CREATE TRIGGER data_collection_fts_update AFTER UPDATE OF title ON data_collection BEGIN
+        INSERT INTO news_fts_pending(data_collection_id) VALUES (new.id);
+    END""",
+    """CREATE TRIGGER data_collection_fts_delete AFTER DELETE ON data_collection BEGIN
+        INSERT INTO news_fts_pending(data_collection_id) VALUES (old.id);
+    END""",
+    
+    """CREATE TRIGGER deep_collection_fts_insert AFTER INSERT ON deep_collection BEGIN
+        INSERT INTO news_fts_pending(data_collection_id) VALUES (new.data_collection_id);
+    END""",
+    """CREATE TRIGGER deep_collection_fts_update AFTER UPDATE OF content ON deep_collection BEGIN
+        INSERT INTO news_fts_pending(data_collection_id) VALUES (new.data_collection_id);
+    END""",
+    """CREATE TRIGGER deep_collection_fts_delete AFTER DELETE ON deep_collection BEGIN
+        INSERT INTO news_fts_pending(data_collection_id) VALUES (old.data_collection_id);
+    END""",
+]
+
+def upgrade(connection):
+    if connection.dialect.name != 'sqlite':
+        return
+    for name in TRIGGERS:
+        connection.execute(sa.text(f'DROP TRIGGER IF EXISTS {name}'))
+    for statement in STATEMENTS:
+        connection.execute(sa.text(statement))
@@ -0,0 +1,22 @@
+"""
+批量深度采集排队
+
+deep_collect_status 记录采集任务的批量深度采集状态（pending、running、completed、failed），
+管理后台只把任务置为 pending，由任务执行器认领后在后台执行（见 app/tasks.py）。
+"""
+import sqlalchemy as sa
+from app.migrations.ops import add_column, create_index
+
+metadata = sa.MetaData()
+
+scraping_task = sa.Table(
+    'scraping_task', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('deep_collect_status', sa.String(20)),
+    sa.Index('ix_scraping_task_deep_collect_status_id', 'deep_collect_status', 'id')
+)
+
+def upgrade(connection):
+    add_column(connection, scraping_task, 'deep_collect_status')
+    for index in scraping_task.indexes:
+        create_index(connection, index)
@@ -1,6 +1,7 @@
-from app import db, bcrypt
+from app import db
 from datetime import datetime
 from flask_login import UserMixin
+from app.passwords import hash_password, verify_password, needs_rehash
 
 class Role(db.Model):
     # 角色表模型
@@ -28,13 +29,17 @@ class User(db.Model, UserMixin):
     def __repr__(self):
         return f'<User {self.username}>'
     
-    # 密码验证方法
+    # 密码验证方法，在密码哈希线程池中执行
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
     
-    # 设置密码方法
+    # 设置密码方法，使用配置的工作因子
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = hash_password(password)
+    
+    # 密码哈希的工作因子与当前配置不同时需要重新哈希
+    def password_needs_rehash(self):
+        return needs_rehash(self.password_hash)
     
     # 检查用户角色
     def is_admin(self):
@@ -49,11 +54,13 @@ class SystemSetting(db.Model):
 
     @classmethod
     def get(cls, key, default=None):
-        setting = cls.query.filter_by(key=key).first()
-        return setting.value if setting else default
+        # 从进程内的设置快照读取，不逐项查询数据库
+        from app.settings import current_settings
+        return current_settings().get(key, default)
 
     @classmethod
     def set(cls, key, value, description=None):
+        from app.settings import bump_settings_version
         setting = cls.query.filter_by(key=key).first()
         if setting:
             setting.value = value
@@ -62,8 +69,15 @@ class SystemSetting(db.Model):
         else:
             setting = cls(key=key, value=value, description=description)
             db.session.add(setting)
+        # 与设置在同一事务中递增版本号，各进程下一个请求即重新加载
+        bump_settings_version()
         db.session.commit()
 
+class SettingsVersion(db.Model):
+    """系统设置版本号，只有一行，SystemSetting.set 每次修改时递增"""
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
 class ScrapingTask(db.Model):
     """数据采集任务模型"""
     id = db.Column(db.Integer, primary_key=True)
@@ -74,6 +88,17 @@ class ScrapingTask(db.Model):
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
     completed_at = db.Column(db.DateTime)
+    claimed_by = db.Column(db.String(100))  # 认领任务的执行器（主机名:进程号）
+    heartbeat_at = db.Column(db.DateTime)  # 执行器最近一次续约的时间（UTC），超过租约时间未续约的任务会被回收
+    attempts = db.Column(db.Integer, default=0)  # 已认领执行的次数
+    deep_collect_status = db.Column(db.String(20))  # 批量深度采集状态：pending, running, completed, failed，未请求时为空
+    
+    # 索引定义，与 migrations/v003_query_indexes.py、v010_deep_collect_queue.py 一致
+    __table_args__ = (
+        db.Index('ix_scraping_task_status_id', 'status', 'id'),  # 认领待执行任务、按状态统计
+        db.Index('ix_scraping_task_created_by_id', 'created_by', 'id'),  # 用户的采集任务
+        db.Index('ix_scraping_task_deep_collect_status_id', 'deep_collect_status', 'id'),  # 认领待执行的批量深度采集
+    )
     
     # 关系定义
     creator = db.relationship('User', backref=db.backref('scraping_tasks', lazy=True))
@@ -85,8 +110,9 @@ class ScrapingTask(db.Model):
 class DeepCollection(db.Model):
     """深度采集结果模型"""
     id = db.Column(db.Integer, primary_key=True)
-    data_collection_id = db.Column(db.Integer, db.ForeignKey('data_collection.id'), nullable=False)
+    data_collection_id = db.Column(db.Integer, db.ForeignKey('data_collection.id'), nullable=False, index=True)
     content = db.Column(db.Text)  # 深度采集的详细内容
+    simhash = db.Column(db.BigInteger)  # 正文的SimHash指纹（有符号64位）
     created_at = db.Column(db.DateTime, server_default=db.func.now())  # 深度采集时间
     
     # 关系定义
@@ -103,9 +129,81 @@ class DataCollection(db.Model):
     image_url = db.Column(db.String(255))  # 封面图片URL
     source = db.Column(db.String(100))  # 新闻来源
     url = db.Column(db.String(255), nullable=False)  # 新闻原文URL
+    url_hash = db.Column(db.String(40), unique=True, index=True)  # 规范化URL的哈希，用于跨任务去重
+    simhash = db.Column(db.BigInteger)  # 标题的SimHash指纹（有符号64位）
+    cluster_id = db.Column(db.Integer, index=True)  # 所属新闻聚类，值为聚类中首条新闻的ID
     is_deep_collected = db.Column(db.Boolean, default=False)  # 是否已执行深度采集
-    collected_at = db.Column(db.DateTime, server_default=db.func.now())  # 采集时间
+    collected_at = db.Column(db.DateTime, server_default=db.func.now(), index=True)  # 采集时间
     saved_to_db = db.Column(db.Boolean, default=False)  # 是否已保存到数据库
     
+    # 任务结果列表按ID分页、查找任务中待深度采集的记录
+    __table_args__ = (
+        db.Index('ix_data_collection_task_id_id', 'task_id', 'id'),
+    )
+    
+    def __repr__(self):
+        return f'<DataCollection {self.title[:50]}>'
+
+class ExtractionRule(db.Model):
+    """深度采集站点提取规则模型"""
+    id = db.Column(db.Integer, primary_key=True)
+    host = db.Column(db.String(255), unique=True, nullable=False)  # 站点主机名
+    strategy = db.Column(db.String(50), nullable=False)  # 提取策略：选择器名称、paragraphs 或 density
+    hit_count = db.Column(db.Integer, default=0)  # 规则命中次数
+    failure_count = db.Column(db.Integer, default=0)  # 连续失效次数
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ExtractionRule {self.host} - {self.strategy}>'
+
+class MonitoredKeyword(db.Model):
+    """关键词监控模型，按间隔增量抓取关键词的最新新闻"""
+    id = db.Column(db.Integer, primary_key=True)
+    keyword = db.Column(db.String(100), unique=True, nullable=False)  # 监控关键词
+    interval_minutes = db.Column(db.Integer, default=30)  # 抓取间隔（分钟）
+    max_pages = db.Column(db.Integer, default=5)  # 每轮最多翻页数
+    is_active = db.Column(db.Boolean, default=True)  # 是否启用
+    next_run_at = db.Column(db.DateTime, default=datetime.utcnow)  # 下次执行时间
+    last_run_at = db.Column(db.DateTime)  # 上次执行时间
+    last_pages = db.Column(db.Integer, default=0)  # 上次抓取的页数
+    last_new_count = db.Column(db.Integer, default=0)  # 上次新增的条数
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    
+    # 认领到期的监控
+    __table_args__ = (
+        db.Index('ix_monitored_keyword_active_next_run', 'is_active', 'next_run_at'),
+    )
+    
+    def __repr__(self):
+        return f'<MonitoredKeyword {self.keyword}>'
+
+class NewsDailyStat(db.Model):
+    """新闻数量按天汇总：每天每个关键词、来源新增的条数，由写入管道增量更新"""
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)  # 采集日期（UTC）
+    keyword = db.Column(db.String(100), nullable=False, default='')  # 采集任务的关键词
+    source = db.Column(db.String(100), nullable=False, default='')  # 新闻来源，未知为空字符串
+    item_count = db.Column(db.Integer, nullable=False, default=0)  # 新增条数
+    
+    __table_args__ = (
+        db.Index('ux_news_daily_stat_day_keyword_source', 'day', 'keyword', 'source', unique=True),
+    )
+    
+    def __repr__(self):
+        return f'<NewsDailyStat {self.day} {self.keyword} {self.source}: {self.item_count}>'
+
+class TaskDailyStat(db.Model):
+    """采集任务结果按天汇总：每天每个关键词完成和失败的任务数"""
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)  # 任务结束日期（UTC）
+    keyword = db.Column(db.String(100), nullable=False, default='')  # 采集任务的关键词
+    status = db.Column(db.String(20), nullable=False)  # completed 或 failed
+    task_count = db.Column(db.Integer, nullable=False, default=0)  # 任务数
+    
+    __table_args__ = (
+        db.Index('ux_task_daily_stat_day_keyword_status', 'day', 'keyword', 'status', unique=True),
+    )
+    
     def __repr__(self):
-        return f'<DataCollection {self.title[:50]}>'
\ No newline at end of file
+        return f'<TaskDailyStat {self.day} {self.keyword} {self.status}: {self.task_count}>'
\ No newline at end of file
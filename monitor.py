@@ -0,0 +1,127 @@
+import logging
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import update
+from app import db
+from app.models import MonitoredKeyword, ScrapingTask
+from app.services import checkout_scraper
+from app.ingest import prepare_news, ingest_news
+from app.rollups import record_task_outcome
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+def claim_due_monitors(limit):
+    """
+    认领到期的关键词监控
+    
+    通过 UPDATE ... WHERE next_run_at <= 当前时间 原子地把下次执行时间推迟一个间隔，
+    多个执行器同时认领时每轮监控只会执行一次
+    
+    Args:
+        limit (int): 最多认领的监控数
+    
+    Returns:
+        list: 认领成功的监控ID
+    """
+    if limit <= 0:
+        return []
+    
+    now = datetime.utcnow()
+    candidates = db.session.query(MonitoredKeyword.id, MonitoredKeyword.next_run_at,
+                                  MonitoredKeyword.interval_minutes).filter(
+        MonitoredKeyword.is_active.is_(True),
+        MonitoredKeyword.next_run_at <= now
+    ).order_by(MonitoredKeyword.next_run_at).limit(limit).all()
+    
+    claimed = []
+    for monitor_id, next_run_at, interval_minutes in candidates:
+        result = db.session.execute(
+            update(MonitoredKeyword)
+            .where(MonitoredKeyword.id == monitor_id, MonitoredKeyword.next_run_at == next_run_at)
+            .values(next_run_at=now + timedelta(minutes=interval_minutes or 30))
+        )
+        if result.rowcount == 1:
+            claimed.append(monitor_id)
+    db.session.commit()
+    return claimed
+
+def run_monitor(monitor_id, claimed_by=None):
+    """
+    执行一轮关键词监控
+    
+    搜索结果按时间排序，从第1页开始翻页，某一页的新闻全部已保存过时停止，
+    只保存新出现的新闻，并按配置对其执行深度采集。每轮结果记录为一个采集任务。
+    
+    Args:
+        monitor_id (int): 关键词监控ID
+        claimed_by (str): 执行器标识，记录在本轮的采集任务上用于续约
+    
+    Returns:
+        dict: pages 为抓取的页数，new 为新增条数，task_id 为本轮的采集任务ID
+    """
+    monitor = db.session.get(MonitoredKeyword, monitor_id)
+    if monitor is None:
+        return None
+    
+    task = ScrapingTask(keyword=monitor.keyword, page=1, status='running', created_by=monitor.created_by,
+                        claimed_by=claimed_by, heartbeat_at=datetime.utcnow(), attempts=1)
+    db.session.add(task)
+    db.session.commit()
+    task_id = task.id
+    keyword = monitor.keyword
+    
+    pages = 0
+    fresh_news = []
+    seen = set()
+    try:
+        url_index = current_app.extensions['url_index']
+        with checkout_scraper() as scraper:
+            for page in range(1, (monitor.max_pages or 1) + 1):
+                # 监控需要最新结果，不读取搜索缓存
+                news_list = scraper.fetch_news(monitor.keyword, page, use_cache=False)
+                pages = page
+                if not news_list:
+                    break
+                
+                # 按规范化URL判断是否已保存，布隆过滤器判断为新的URL不访问数据库
+                news_list = [news for news in prepare_news(news_list, scraper.session) if news['url_hash'] not in seen]
+                new_hashes = url_index.filter_new(news['url_hash'] for news in news_list)
+                seen.update(news['url_hash'] for news in news_list)
+                
+                # 整页都是已保存的新闻，说明已追上上一轮的位置
+                page_fresh = [news for news in news_list if news['url_hash'] in new_hashes]
+                if not page_fresh:
+                    break
+                fresh_news.extend(page_fresh)
+            
+            stats = ingest_news(task_id, fresh_news, session=scraper.session)
+        
+        task.page = pages
+        task.status = 'completed'
+        task.completed_at = db.func.now()
+        monitor.last_run_at = datetime.utcnow()
+        monitor.last_pages = pages
+        monitor.last_new_count = stats['inserted']
+        record_task_outcome(monitor.keyword, 'completed')
+        db.session.commit()
+        logger.info('关键词监控"%s"完成，抓取%s页，新增%s条', monitor.keyword, pages, task.total_count)
+    except Exception as e:
+        db.session.rollback()
+        logger.error('关键词监控%s执行失败: %s', monitor_id, e, exc_info=True)
+        db.session.execute(
+            update(ScrapingTask).where(ScrapingTask.id == task_id).values(status='failed', completed_at=db.func.now())
+        )
+        record_task_outcome(keyword, 'failed')
+        db.session.commit()
+        return {'pages': pages, 'new': 0, 'task_id': task_id}
+    
+    # 新增的新闻排入深度采集，失败不影响本轮监控结果
+    if task.total_count and current_app.config['MONITOR_DEEP_COLLECT']:
+        from app import collector
+        try:
+            collector.deep_collect_task(task_id)
+        except Exception as e:
+            logger.error('关键词监控"%s"深度采集失败: %s', monitor.keyword, e, exc_info=True)
+    
+    return {'pages': pages, 'new': task.total_count, 'task_id': task_id}
@@ -0,0 +1,126 @@
+import base64
+import json
+from flask import current_app
+
+def encode_cursor(values):
+    """
+    把分页位置编码为不透明的游标字符串
+    
+    Args:
+        values (list): 可JSON序列化的分页位置
+    
+    Returns:
+        str: URL安全的游标
+    """
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, size, keyset=False):
+    """
+    解码 encode_cursor 生成的游标
+    
+    Args:
+        cursor (str): 游标字符串
+        size (int): 分页位置包含的值个数
+        keyset (bool): 是否为 keyset_paginate 的游标，是则要求形如 ['n'或'p', 整数]
+    
+    Returns:
+        list: 分页位置
+    
+    Raises:
+        ValueError: 游标无效
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f'无效的分页游标: {cursor}') from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError(f'无效的分页游标: {cursor}')
+    if keyset:
+        direction, last = values
+        # bool 是 int 的子类，需单独排除
+        if direction not in ('n', 'p') or not isinstance(last, int) or isinstance(last, bool):
+            raise ValueError(f'无效的分页游标: {cursor}')
+    return values
+
+class KeysetPage:
+    """键集分页的一页结果"""
+    
+    def __init__(self, items, next_cursor=None, prev_cursor=None, total=None):
+        self.items = items
+        self.next_cursor = next_cursor  # 下一页游标，没有下一页时为None
+        self.prev_cursor = prev_cursor  # 上一页游标，第一页为None
+        self.total = total  # 总条数，可能是缓存的近似值
+    
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+    
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+def keyset_paginate(query, column, cursor=None, per_page=20, descending=True):
+    """
+    按唯一列做键集分页
+    
+    用 WHERE column < 上一页最后一条的值 代替 OFFSET，配合该列上的索引，
+    翻到任何一页只读取 per_page + 1 行，不执行 COUNT。
+    
+    Args:
+        query (Query): 已加好筛选条件、未排序的查询
+        column (Column): 排序和分页依据的唯一列，一般为主键
+        cursor (str): 页面返回的 next_cursor 或 prev_cursor，为None时返回第一页
+        per_page (int): 每页条数
+        descending (bool): 是否按该列倒序排列
+    
+    Returns:
+        KeysetPage: 本页结果，total 为None
+    
+    Raises:
+        ValueError: 游标无效
+    """
+    direction, last = decode_cursor(cursor, 2, keyset=True) if cursor else ('n', None)
+    forward = direction == 'n'
+    
+    # 向前翻页时反向查询，取到后再恢复原来的顺序
+    reverse = descending if forward else not descending
+    if last is not None:
+        query = query.filter(column < last if reverse else column > last)
+    items = query.order_by(column.desc() if reverse else column.asc()).limit(per_page + 1).all()
+    has_more = len(items) > per_page
+    items = items[:per_page]
+    if not forward:
+        items.reverse()
+    if not items:
+        return KeysetPage(items)
+    
+    has_next = has_more if forward else True
+    has_prev = (last is not None) if forward else has_more
+    return KeysetPage(
+        items,
+        next_cursor=encode_cursor(['n', getattr(items[-1], column.key)]) if has_next else None,
+        prev_cursor=encode_cursor(['p', getattr(items[0], column.key)]) if has_prev else None
+    )
+
+def cached_count(key, query):
+    """
+    查询总条数，结果在进程内缓存 PAGINATION_COUNT_TTL 秒
+    
+    列表页的总数只用于显示，允许短时间内不准确，避免每次翻页都执行 COUNT
+    
+    Args:
+        key (str): 缓存键，需包含影响结果的筛选条件
+        query (Query): 计数的查询
+    
+    Returns:
+        int: 总条数
+    """
+    cache = current_app.extensions.get('count_cache')
+    if cache is None:
+        return query.order_by(None).count()
+    total = cache.get(key)
+    if total is None:
+        total = query.order_by(None).count()
+        cache.set(key, total)
+    return total
@@ -0,0 +1,125 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from app import bcrypt
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+class PasswordHasher:
+    """
+    密码哈希专用的有界线程池
+    
+    bcrypt 计算时释放GIL，但每次耗时与工作因子成指数关系。集中登录时所有请求线程
+    都可能卡在哈希上，因此哈希只在固定数量的线程中执行，同时执行和排队的调用总数
+    也有上限，超过上限的调用等待 timeout 秒后放弃，不占满请求线程。
+    """
+    
+    def __init__(self, max_workers=2, max_pending=16, timeout=5):
+        self.max_workers = max_workers
+        self.max_pending = max_pending  # 排队等待的最大调用数（不含正在执行的）
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._lock = threading.Lock()
+        self._calls = 0  # 完成的哈希调用数
+        self._rejected = 0  # 排队超时被拒绝的调用数
+        self._seconds = 0.0  # 哈希累计耗时
+    
+    @classmethod
+    def from_config(cls, config):
+        """根据应用配置创建，PASSWORD_HASH_WORKERS 为0时返回None（在请求线程中直接哈希）"""
+        if config['PASSWORD_HASH_WORKERS'] <= 0:
+            return None
+        return cls(
+            max_workers=config['PASSWORD_HASH_WORKERS'],
+            max_pending=config['PASSWORD_HASH_MAX_PENDING'],
+            timeout=config['PASSWORD_HASH_TIMEOUT']
+        )
+    
+    def run(self, fn, *args):
+        """
+        在哈希线程池中执行调用并等待结果
+        
+        Args:
+            fn (callable): 哈希函数
+            *args: 调用参数
+        
+        Returns:
+            调用结果
+        
+        Raises:
+            RuntimeError: 排队的调用已满且等待超时
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._rejected += 1
+            raise RuntimeError('密码校验繁忙，请稍后重试')
+        try:
+            started = time.perf_counter()
+            result = self._pool.submit(fn, *args).result()
+            with self._lock:
+                self._calls += 1
+                self._seconds += time.perf_counter() - started
+            return result
+        finally:
+            self._slots.release()
+    
+    def metrics(self):
+        """
+        哈希调用统计
+        
+        Returns:
+            dict: calls、rejected、avg_ms（平均耗时，含排队）
+        """
+        with self._lock:
+            return {
+                'calls': self._calls,
+                'rejected': self._rejected,
+                'avg_ms': round(self._seconds / self._calls * 1000, 2) if self._calls else 0.0
+            }
+    
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+def _run(fn, *args):
+    hasher = current_app.extensions.get('password_hasher')
+    if hasher is None:
+        return fn(*args)
+    return hasher.run(fn, *args)
+
+def hash_password(password):
+    """
+    用当前配置的工作因子（BCRYPT_LOG_ROUNDS）哈希密码
+    
+    Returns:
+        str: bcrypt 哈希
+    """
+    return _run(bcrypt.generate_password_hash, password).decode('utf-8')
+
+def verify_password(password_hash, password):
+    """
+    校验密码
+    
+    Returns:
+        bool: 密码是否正确
+    """
+    return _run(bcrypt.check_password_hash, password_hash, password)
+
+def password_cost(password_hash):
+    """
+    bcrypt 哈希的工作因子，格式为 $2b$12$...
+    
+    Returns:
+        int: 工作因子，无法识别时返回None
+    """
+    parts = (password_hash or '').split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+def needs_rehash(password_hash):
+    """哈希的工作因子与当前配置不同时需要重新哈希"""
+    return password_cost(password_hash) != current_app.config['BCRYPT_LOG_ROUNDS']
@@ -0,0 +1,75 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+class ScraperPool:
+    """
+    进程级抓取器池
+    
+    每个抓取器持有一个保持长连接的 requests.Session，请求结束后归还到池中，
+    后续请求和线程复用已建立的TCP/TLS连接。抓取器在首次需要时才创建，
+    总数不超过池大小。
+    """
+    
+    def __init__(self, factory, size=8, timeout=10):
+        self.factory = factory
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()  # 后进先出，优先复用最近使用、连接仍活跃的抓取器
+        self._created = 0
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def checkout(self, timeout=None):
+        """
+        借出一个抓取器，退出上下文时自动归还
+        
+        Args:
+            timeout (float): 池耗尽时的最长等待秒数，默认使用池配置
+        
+        Yields:
+            BaiduNewsScraper: 抓取器实例
+        """
+        scraper = self._acquire(self.timeout if timeout is None else timeout)
+        try:
+            yield scraper
+        finally:
+            self._idle.put(scraper)
+    
+    def _acquire(self, timeout):
+        """优先取空闲抓取器，未达上限时新建，否则等待其他请求归还"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        
+        if create:
+            try:
+                return self.factory()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise RuntimeError('抓取器池已耗尽，请稍后重试')
+    
+    def close(self):
+        """关闭池中空闲抓取器的会话"""
+        while True:
+            try:
+                scraper = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            scraper.session.close()
+            with self._lock:
+                self._created -= 1
@@ -0,0 +1,56 @@
+import logging
+from flask import current_app
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models import User
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+def load_principal(user_id):
+    """
+    按ID加载登录用户及其角色，结果在进程内缓存 PRINCIPAL_CACHE_TTL 秒
+    
+    未命中时用一次关联查询同时加载用户和角色，并从会话中移出，之后的请求直接
+    使用缓存的对象，current_user 和 is_admin() 不再查询数据库。缓存的对象是
+    只读的，需要修改用户时应重新查询。
+    
+    Args:
+        user_id (int): 用户ID
+    
+    Returns:
+        User: 用户，不存在时返回None
+    """
+    cache = current_app.extensions.get('principal_cache')
+    if cache is not None:
+        user = cache.get(user_id)
+        if user is not None:
+            return user
+    
+    user = db.session.query(User).options(joinedload(User.role)).filter(User.id == user_id).first()
+    if user is None or cache is None:
+        return user
+    
+    # 移出会话，避免提交时过期已加载的属性；角色对象同样移出
+    if user.role is not None:
+        db.session.expunge(user.role)
+    db.session.expunge(user)
+    cache.set(user_id, user)
+    return user
+
+def invalidate_principals(user_id=None):
+    """
+    使缓存的登录用户失效，修改、删除用户或修改角色后调用
+    
+    只作用于当前进程，其他进程的缓存在 PRINCIPAL_CACHE_TTL 秒内过期
+    
+    Args:
+        user_id (int): 用户ID，为None时清空全部（如修改角色后）
+    """
+    cache = current_app.extensions.get('principal_cache')
+    if cache is None:
+        return
+    if user_id is None:
+        cache.clear()
+    else:
+        cache.delete(user_id)
@@ -0,0 +1,12 @@
+from app import create_app, db
+from app.migrations import upgrade
+from app.rollups import rebuild_rollups
+
+# 创建应用实例
+app = create_app({'TASK_EXECUTOR': 'off'})
+
+with app.app_context():
+    # 确保汇总表已创建，再按明细数据重新计算
+    upgrade(db.engine)
+    stats = rebuild_rollups()
+    print(f"汇总表重建完成！新闻汇总 {stats['news']} 行，任务汇总 {stats['tasks']} 行")
@@ -0,0 +1,12 @@
+from app import create_app, db
+from app.migrations import upgrade
+from app.search import rebuild_search_index
+
+# 创建应用实例
+app = create_app({'TASK_EXECUTOR': 'off'})
+
+with app.app_context():
+    # 确保全文索引表已创建，再按采集结果重新建立索引
+    upgrade(db.engine)
+    total = rebuild_search_index()
+    print(f'全文索引重建完成！共索引新闻 {total} 条')
@@ -0,0 +1,210 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import insert, update, delete, select, literal
+from app import db
+from app.models import ScrapingTask, DataCollection, NewsDailyStat, TaskDailyStat
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 新闻数量统计可按这些维度分组
+NEWS_DIMENSIONS = ('day', 'keyword', 'source')
+
+# 计入任务成功率的任务状态
+TASK_OUTCOMES = ('completed', 'failed')
+
+def _utc_today():
+    return datetime.utcnow().date()
+
+def _increment(model, keys, counter, rows):
+    """
+    按唯一键累加计数，记录不存在时插入
+    
+    Args:
+        model (Model): 汇总表模型
+        keys (tuple): 唯一键列名
+        counter (str): 计数列名
+        rows (list): 字典列表，包含唯一键各列和本次增加的数量
+    """
+    if not rows:
+        return
+    table = model.__table__
+    dialect = db.engine.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        statement = dialect_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(keys), set_={counter: table.c[counter] + statement.excluded[counter]})
+        db.session.execute(statement, rows)
+        return
+    if dialect in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        statement = dialect_insert(table)
+        statement = statement.on_duplicate_key_update({counter: table.c[counter] + statement.inserted[counter]})
+        db.session.execute(statement, rows)
+        return
+    
+    # 其他数据库逐条先更新，没有更新到记录时再插入
+    for row in rows:
+        result = db.session.execute(
+            update(table).where(*(table.c[key] == row[key] for key in keys))
+            .values({counter: table.c[counter] + row[counter]})
+        )
+        if result.rowcount == 0:
+            db.session.execute(insert(table).values(row))
+
+def record_news(keyword, sources, day=None):
+    """
+    累加新保存的新闻数量，在写入新闻的事务中调用，由调用方提交
+    
+    Args:
+        keyword (str): 采集任务的关键词
+        sources (iterable): 每条新保存新闻的来源
+        day (date): 统计日期，默认为当天（UTC）
+    """
+    day = day or _utc_today()
+    counts = Counter((source or '')[:100] for source in sources)
+    _increment(NewsDailyStat, ('day', 'keyword', 'source'), 'item_count', [
+        {'day': day, 'keyword': keyword or '', 'source': source, 'item_count': count}
+        for source, count in counts.items()
+    ])
+
+def record_task_outcome(keyword, status, day=None):
+    """
+    累加结束的采集任务数，在更新任务状态的事务中调用，由调用方提交
+    
+    Args:
+        keyword (str): 采集任务的关键词
+        status (str): completed 或 failed
+        day (date): 统计日期，默认为当天（UTC）
+    """
+    if status not in TASK_OUTCOMES:
+        raise ValueError(f'不支持的任务状态: {status}')
+    _increment(TaskDailyStat, ('day', 'keyword', 'status'), 'task_count', [
+        {'day': day or _utc_today(), 'keyword': keyword or '', 'status': status, 'task_count': 1}
+    ])
+
+def rebuild_rollups():
+    """
+    清空并按明细数据重新计算全部汇总表
+    
+    汇总表与明细不一致时（如引入汇总表之前的数据、手工修改过明细）使用，
+    需要扫描全部明细，数据量大时耗时较长
+    
+    Returns:
+        dict: news 为新闻汇总行数，tasks 为任务汇总行数
+    """
+    news_day = db.func.date(DataCollection.collected_at)
+    task_day = db.func.date(db.func.coalesce(ScrapingTask.completed_at, ScrapingTask.created_at))
+    try:
+        db.session.execute(delete(NewsDailyStat))
+        db.session.execute(delete(TaskDailyStat))
+        db.session.execute(insert(NewsDailyStat).from_select(
+            ['day', 'keyword', 'source', 'item_count'],
+            select(news_day, db.func.coalesce(ScrapingTask.keyword, ''), db.func.coalesce(DataCollection.source, ''),
+                   db.func.count())
+            .join(ScrapingTask, ScrapingTask.id == DataCollection.task_id)
+            .where(DataCollection.collected_at.isnot(None))
+            .group_by(news_day, ScrapingTask.keyword, db.func.coalesce(DataCollection.source, ''))
+        ))
+        db.session.execute(insert(TaskDailyStat).from_select(
+            ['day', 'keyword', 'status', 'task_count'],
+            select(task_day, db.func.coalesce(ScrapingTask.keyword, ''), ScrapingTask.status, db.func.count())
+            .where(ScrapingTask.status.in_(TASK_OUTCOMES))
+            .group_by(task_day, ScrapingTask.keyword, ScrapingTask.status)
+        ))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    stats = {
+        'news': db.session.query(db.func.count(NewsDailyStat.id)).scalar(),
+        'tasks': db.session.query(db.func.count(TaskDailyStat.id)).scalar()
+    }
+    logger.info('汇总表重建完成，新闻%s行，任务%s行', stats['news'], stats['tasks'])
+    return stats
+
+def news_counts(days=30, dimension='day', limit=20):
+    """
+    最近若干天的新闻数量，按指定维度分组
+    
+    Args:
+        days (int): 统计最近的天数（含今天）
+        dimension (str): day、keyword 或 source
+        limit (int): keyword、source 维度最多返回的分组数，按数量从多到少
+    
+    Returns:
+        list: (分组值, 条数) 元组列表，day 维度按日期升序
+    """
+    if dimension not in NEWS_DIMENSIONS:
+        raise ValueError(f"不支持的统计维度: {dimension}，可选值: {', '.join(NEWS_DIMENSIONS)}")
+    column = getattr(NewsDailyStat, dimension)
+    total = db.func.sum(NewsDailyStat.item_count)
+    query = db.session.query(column, total).filter(
+        NewsDailyStat.day >= _utc_today() - timedelta(days=days - 1)).group_by(column)
+    if dimension == 'day':
+        return [(day.isoformat(), int(count)) for day, count in query.order_by(column)]
+    return [(value, int(count)) for value, count in query.order_by(total.desc(), column).limit(limit)]
+
+def task_success_rates(days=30):
+    """
+    最近若干天每天的采集任务成功率
+    
+    Args:
+        days (int): 统计最近的天数（含今天）
+    
+    Returns:
+        list: 字典列表，day、completed、failed、success_rate（无任务的日期不返回）
+    """
+    rows = db.session.query(TaskDailyStat.day, TaskDailyStat.status, db.func.sum(TaskDailyStat.task_count)).filter(
+        TaskDailyStat.day >= _utc_today() - timedelta(days=days - 1)
+    ).group_by(TaskDailyStat.day, TaskDailyStat.status).all()
+    
+    by_day = {}
+    for day, status, count in rows:
+        by_day.setdefault(day, dict.fromkeys(TASK_OUTCOMES, 0))[status] = int(count)
+    return [
+        {
+            'day': day.isoformat(),
+            'completed': counts['completed'],
+            'failed': counts['failed'],
+            'success_rate': round(counts['completed'] / (counts['completed'] + counts['failed']), 4)
+        }
+        for day, counts in sorted(by_day.items())
+    ]
+
+def dashboard_summary(days=7):
+    """
+    仪表盘的新闻和任务概况，只读取汇总表
+    
+    Returns:
+        dict: news_today、news_recent（最近 days 天）、news_total、tasks_recent、success_rate（无任务时为None）
+    """
+    today = _utc_today()
+    since = today - timedelta(days=days - 1)
+    news_today, news_recent, news_total = db.session.query(
+        db.func.sum(db.case((NewsDailyStat.day == today, NewsDailyStat.item_count), else_=literal(0))),
+        db.func.sum(db.case((NewsDailyStat.day >= since, NewsDailyStat.item_count), else_=literal(0))),
+        db.func.sum(NewsDailyStat.item_count)
+    ).one()
+    
+    completed = failed = 0
+    for status, count in db.session.query(TaskDailyStat.status, db.func.sum(TaskDailyStat.task_count)).filter(
+            TaskDailyStat.day >= since).group_by(TaskDailyStat.status):
+        if status == 'completed':
+            completed = int(count)
+        else:
+            failed = int(count)
+    
+    return {
+        'news_today': int(news_today or 0),
+        'news_recent': int(news_recent or 0),
+        'news_total': int(news_total or 0),
+        'tasks_recent': completed + failed,
+        'success_rate': round(completed / (completed + failed), 4) if completed + failed else None
+    }
@@ -1,8 +1,9 @@
-from flask import Blueprint, render_template, abort, request, Response
+from flask import Blueprint, render_template, abort, request, Response, jsonify, current_app
 from flask_login import login_required, current_user
 import functools
 import json
-from app.scraper import BaiduNewsScraper
+from app.scraper import parse_pages
+from app.services import checkout_scraper, use_cache_requested, cache_status_header
 
 # 创建蓝图
 main_bp = Blueprint('main', __name__)
@@ -41,8 +42,10 @@ def get_news():
     参数:
         keyword: 搜索关键词
         page: 页码（可选，默认1）
+        pages: 页码范围（可选，如 1-5 或 1,3,5），指定后并发抓取多页
+        nocache: 为1时绕过搜索缓存重新抓取（可选）
     返回:
-        JSON格式的新闻列表
+        JSON格式的新闻列表，X-Cache 响应头标明缓存命中情况
     """
     try:
         # 获取请求参数
@@ -56,9 +59,25 @@ def get_news():
         if page < 1:
             page = 1
         
-        # 使用抓取模块获取新闻
-        scraper = BaiduNewsScraper()
-        raw_news_list = scraper.fetch_news(keyword, page)
+        # 指定页码范围时并发抓取多页
+        page_list = None
+        page_results = None
+        pages = request.args.get('pages')
+        if pages:
+            try:
+                page_list = parse_pages(pages, current_app.config['SCRAPER_MAX_PAGES'])
+            except ValueError as e:
+                return jsonify({'status': 'error', 'message': f'页码范围无效: {e}'}), 400
+        
+        # 使用抓取器池中的抓取器获取新闻
+        with checkout_scraper() as scraper:
+            if page_list:
+                result = scraper.fetch_pages(keyword, page_list, use_cache=use_cache_requested())
+                raw_news_list = result['news']
+                page_results = result['pages']
+                cache_status = cache_status_header([r['cache'] for r in page_results])
+            else:
+                raw_news_list, cache_status = scraper.fetch_news_cached(keyword, page, use_cache_requested())
         
         # 重新构建新闻列表，确保字段顺序正确
         news_list = []
@@ -79,12 +98,14 @@ def get_news():
             'count': len(news_list),
             'news_list': news_list
         }
+        if page_results is not None:
+            response_data['pages'] = page_results
         
         # 使用json.dumps手动序列化，确保字段顺序不变
         json_str = json.dumps(response_data, ensure_ascii=False)
         
         # 返回响应
-        return Response(json_str, mimetype='application/json')
+        return Response(json_str, mimetype='application/json', headers={'X-Cache': cache_status})
         
     except Exception as e:
         # 处理异常
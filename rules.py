@@ -0,0 +1,147 @@
+import logging
+import threading
+from app import db
+from app.models import ExtractionRule
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+class ExtractionRuleStore:
+    """
+    深度采集站点提取规则库
+    
+    规则全部缓存在内存中，查找不访问数据库；新学到规则、规则失效或被删除时
+    写入 ExtractionRule 表，命中次数在内存中累计，调用 flush() 时批量写回。
+    深度采集在工作线程中执行，数据库操作在独立的应用上下文中完成。
+    """
+    
+    def __init__(self, app, max_failures=3):
+        self.app = app
+        self.max_failures = max_failures  # 连续失效达到该次数后删除规则
+        self._rules = None  # host -> [strategy, 连续失效次数]
+        self._pending_hits = {}  # host -> 尚未写回的命中次数
+        self._lock = threading.Lock()
+    
+    def _load(self):
+        """首次使用时加载全部规则"""
+        if self._rules is not None:
+            return
+        with self.app.app_context():
+            rows = db.session.query(ExtractionRule.host, ExtractionRule.strategy,
+                                    ExtractionRule.failure_count).all()
+        self._rules = {host: [strategy, failure_count or 0] for host, strategy, failure_count in rows}
+    
+    def get(self, host):
+        """
+        获取站点的提取策略
+        
+        Args:
+            host (str): 站点主机名
+        
+        Returns:
+            str: 提取策略名称，没有规则时返回None
+        """
+        with self._lock:
+            self._load()
+            rule = self._rules.get(host)
+            return rule[0] if rule else None
+    
+    def record_success(self, host, strategy):
+        """
+        记录一次有效提取，新策略或与现有规则不同的策略会写入数据库
+        
+        Args:
+            host (str): 站点主机名
+            strategy (str): 提取到有效正文的策略
+        """
+        with self._lock:
+            self._load()
+            rule = self._rules.get(host)
+            if rule and rule[0] == strategy:
+                self._pending_hits[host] = self._pending_hits.get(host, 0) + 1
+                if rule[1] == 0:
+                    return
+                # 规则重新生效，清零连续失效次数
+                rule[1] = 0
+                changed = False
+            else:
+                self._rules[host] = [strategy, 0]
+                self._pending_hits.pop(host, None)
+                changed = True
+        
+        if changed:
+            self._save(host, strategy=strategy, hit_count=1, failure_count=0)
+            logger.info('站点提取规则更新: %s -> %s', host, strategy)
+        else:
+            self._save(host, failure_count=0)
+    
+    def record_failure(self, host, strategy):
+        """
+        记录一次规则失效（提取内容为空或过短），连续失效达到上限时删除规则
+        
+        Args:
+            host (str): 站点主机名
+            strategy (str): 失效的策略
+        """
+        with self._lock:
+            self._load()
+            rule = self._rules.get(host)
+            if not rule or rule[0] != strategy:
+                return
+            rule[1] += 1
+            failures = rule[1]
+            if failures >= self.max_failures:
+                del self._rules[host]
+                self._pending_hits.pop(host, None)
+        
+        if failures >= self.max_failures:
+            self._delete(host)
+            logger.info('站点提取规则连续%s次失效，已删除: %s -> %s', failures, host, strategy)
+        else:
+            self._save(host, failure_count=failures)
+    
+    def flush(self):
+        """将内存中累计的命中次数写回数据库"""
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, {}
+        if not pending:
+            return
+        
+        with self.app.app_context():
+            try:
+                for host, hits in pending.items():
+                    ExtractionRule.query.filter_by(host=host).update(
+                        {ExtractionRule.hit_count: ExtractionRule.hit_count + hits},
+                        synchronize_session=False
+                    )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error('写回站点规则命中次数失败: %s', e)
+    
+    def _save(self, host, **values):
+        """新增或更新站点规则"""
+        with self.app.app_context():
+            try:
+                rule = ExtractionRule.query.filter_by(host=host).first()
+                if rule is None:
+                    if 'strategy' not in values:
+                        return
+                    rule = ExtractionRule(host=host)
+                    db.session.add(rule)
+                for key, value in values.items():
+                    setattr(rule, key, value)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error('保存站点规则失败: %s %s', host, e)
+    
+    def _delete(self, host):
+        """删除站点规则"""
+        with self.app.app_context():
+            try:
+                ExtractionRule.query.filter_by(host=host).delete()
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error('删除站点规则失败: %s %s', host, e)
@@ -1,13 +1,21 @@
+import os
 from app import create_app, db
+from app.migrations import upgrade
 
 # 创建应用实例
 app = create_app()
 
 with app.app_context():
-    # 创建所有表
-    db.create_all()
+    # 执行数据库迁移，创建或更新表结构
+    upgrade(db.engine)
     print('数据库初始化完成！')
 
 if __name__ == '__main__':
+    # 启动进程内的采集任务执行器。debug 模式使用重载器，父进程只监视文件变化，
+    # 只在实际提供服务的子进程中启动，避免两个进程同时认领任务
+    executor = app.extensions['task_executor']
+    if executor is not None and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        executor.start()
+    
     # 启动开发服务器
     app.run(debug=True)
\ No newline at end of file
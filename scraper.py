@@ -1,27 +1,142 @@
 import requests
+from requests.adapters import HTTPAdapter
+import asyncio
 import logging
 import sys
 import urllib.parse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+from app.extractor import extract_article
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scraper.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# 配置日志（处理器由 create_app 中的 init_logging 统一配置）
 logger = logging.getLogger(__name__)
 
+# 搜索结果解析后端：bs4 为参考实现，lxml 使用预编译XPath，速度更快
+PARSER_BACKENDS = ('bs4', 'lxml')
+
+# 深度采集正文提取方式：selectors 为固定选择器链（参考实现），density 为单次遍历的文本密度提取
+EXTRACTORS = ('selectors', 'density')
+
+# 深度采集的正文容器选择器，按顺序尝试：(策略名称, BeautifulSoup查找参数)
+CONTENT_SELECTORS = [
+    ('div.article-content', ('div', {'class': 'article-content'})),
+    ('div.content', ('div', {'class': 'content'})),
+    ('div#content', ('div', {'id': 'content'})),
+    ('article', ('article', {})),
+    ('div.main-content', ('div', {'class': 'main-content'})),
+    ('div.news-content', ('div', {'class': 'news-content'})),
+    ('div.article-body', ('div', {'class': 'article-body'})),
+    ('div.content-body', ('div', {'class': 'content-body'})),
+    ('div.content_detail', ('div', {'class': 'content_detail'})),
+    ('div.article-text', ('div', {'class': 'article-text'})),
+]
+
+# lxml 解析后端使用的预编译XPath，与 bs4 实现的查找规则一一对应
+_RESULT_DIVS_XPATH = etree.XPath("//div[contains(@class, 'result')]")
+_CLASSED_DIVS_XPATH = etree.XPath('//div[@class]')
+_FIRST_LINK_XPATH = etree.XPath('(.//a)[1]')
+_SPANS_XPATH = etree.XPath('.//span')
+_FIRST_IMG_XPATH = etree.XPath('(.//img)[1]')
+_TEXT_XPATH = etree.XPath('.//text()[not(ancestor::script or ancestor::style)]')
+_PARAGRAPHS_XPATH = etree.XPath('.//p')
+
+def _selector_xpath(tag, attrs):
+    """将 BeautifulSoup 的 find 参数转换为等价的预编译XPath"""
+    conditions = []
+    if 'class' in attrs:
+        conditions.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {attrs['class']} ')")
+    if 'id' in attrs:
+        conditions.append(f"@id = '{attrs['id']}'")
+    predicate = f"[{' and '.join(conditions)}]" if conditions else ''
+    return etree.XPath(f'(//{tag}{predicate})[1]')
+
+# 站点规则定向查找使用的XPath
+_CONTENT_SELECTOR_XPATHS = {strategy: _selector_xpath(tag, attrs) for strategy, (tag, attrs) in CONTENT_SELECTORS}
+
+def parse_pages(value, max_pages=10):
+    """
+    解析页码范围参数
+    
+    支持单个页码（"3"）、区间（"1-5"）和逗号分隔的列表（"1,3,5"）
+    
+    Args:
+        value (str): 页码范围字符串
+        max_pages (int): 单次允许抓取的最大页数
+        
+    Returns:
+        list: 去重后按升序排列的页码列表
+    
+    Raises:
+        ValueError: 格式错误、区间起点大于终点或页数超过 max_pages
+    """
+    pages = set()
+    for part in str(value).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = (int(x) for x in part.split('-', 1))
+            if end < start:
+                raise ValueError(f'无效的页码区间: {part}')
+            # 先检查区间大小再展开，避免超大区间占用大量内存
+            start = max(start, 1)
+            if end - start + 1 > max_pages:
+                raise ValueError(f'单次最多抓取{max_pages}页')
+            pages.update(range(start, end + 1))
+        elif int(part) >= 1:
+            pages.add(int(part))
+        if len(pages) > max_pages:
+            raise ValueError(f'单次最多抓取{max_pages}页')
+    
+    if not pages:
+        raise ValueError('页码范围不能为空')
+    return sorted(pages)
+
+def _element_text(element):
+    """等价于 BeautifulSoup 的 get_text(strip=True)：逐段去除空白后拼接"""
+    return ''.join(text.strip() for text in _TEXT_XPATH(element))
+
 class BaiduNewsScraper:
     """百度新闻抓取器"""
     
     BASE_URL = 'https://www.baidu.com/s'
     
-    def __init__(self):
+    # 多页抓取的默认并发数
+    DEFAULT_MAX_CONCURRENCY = 4
+    
+    # 流式抓取时每次读取的字节数
+    STREAM_CHUNK_SIZE = 16 * 1024
+    
+    # 站点规则提取结果的最短有效长度，低于该长度视为规则失效
+    RULE_MIN_CONTENT_LENGTH = 50
+    
+    # 批量深度采集的默认全局并发数和单站点并发数
+    DEFAULT_DEEP_MAX_WORKERS = 8
+    DEFAULT_DEEP_PER_HOST = 2
+    
+    def __init__(self, max_concurrency=None, deep_max_workers=None, deep_per_host=None, parser='bs4',
+                 debug_capture=None, cache=None, singleflight=None, pool_connections=10, pool_maxsize=10,
+                 extractor='selectors', rule_store=None):
+        if parser not in PARSER_BACKENDS:
+            raise ValueError(f'不支持的解析后端: {parser}')
+        if extractor not in EXTRACTORS:
+            raise ValueError(f'不支持的正文提取方式: {extractor}')
+        self.parser = parser
+        self.extractor = extractor
+        self.rule_store = rule_store  # 站点提取规则（见 rules.py），为None时不学习站点规则
+        self.debug_capture = debug_capture  # 调试采样器（DebugCapture），为None时不保存响应
+        self.cache = cache  # 搜索结果缓存（见 cache.py），为None时不缓存
+        self.singleflight = singleflight  # 相同搜索的并发请求合并器（见 singleflight.py），为None时不合并
+        self.max_concurrency = max_concurrency or self.DEFAULT_MAX_CONCURRENCY
+        self.deep_max_workers = deep_max_workers or self.DEFAULT_DEEP_MAX_WORKERS
+        self.deep_per_host = deep_per_host or self.DEFAULT_DEEP_PER_HOST
         self.session = requests.Session()
+        # 挂载连接池适配器：pool_connections 为缓存的主机数，pool_maxsize 为单主机保持的长连接数
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         # 设置请求头
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -31,70 +146,356 @@ class BaiduNewsScraper:
             'Referer': 'https://news.baidu.com/'
         })
     
-    def fetch_news(self, keyword, page=1):
+    @classmethod
+    def from_config(cls, config, **kwargs):
         """
-        抓取百度新闻搜索结果
+        根据应用配置创建抓取器
+        
+        Args:
+            config (dict): Flask应用配置
+            **kwargs: 其他构造参数，如 debug_capture、cache、singleflight、rule_store
+            
+        Returns:
+            BaiduNewsScraper: 抓取器实例
+        """
+        return cls(
+            max_concurrency=config.get('SCRAPER_MAX_CONCURRENCY'),
+            deep_max_workers=config.get('DEEP_COLLECT_MAX_WORKERS'),
+            deep_per_host=config.get('DEEP_COLLECT_PER_HOST'),
+            parser=config.get('SCRAPER_PARSER', 'bs4'),
+            pool_connections=config.get('SCRAPER_POOL_CONNECTIONS', 10),
+            pool_maxsize=config.get('SCRAPER_POOL_MAXSIZE', 10),
+            extractor=config.get('DEEP_COLLECT_EXTRACTOR', 'selectors'),
+            **kwargs
+        )
+    
+    def fetch_news(self, keyword, page=1, use_cache=True):
+        """
+        抓取百度新闻搜索结果，配置了缓存时优先读取缓存
         
         Args:
             keyword (str): 搜索关键字
             page (int): 页码
+            use_cache (bool): 是否读取缓存，为False时强制重新抓取并刷新缓存
             
         Returns:
             list: 新闻列表，每个新闻包含标题、概要、封面、原始URL和来源
         """
+        news_list, _ = self.fetch_news_cached(keyword, page, use_cache)
+        return news_list
+    
+    def fetch_news_cached(self, keyword, page=1, use_cache=True):
+        """
+        抓取百度新闻搜索结果，并返回缓存命中情况
+        
+        Args:
+            keyword (str): 搜索关键字
+            page (int): 页码
+            use_cache (bool): 是否读取缓存，为False时强制重新抓取并刷新缓存
+            
+        Returns:
+            tuple: (新闻列表, 缓存状态)，缓存状态为 HIT、MISS 或 BYPASS
+        """
+        if self.cache is None:
+            return self._fetch_news_coalesced(keyword, page), 'BYPASS'
+        
+        key = f'news:{page}:{keyword}'
+        if use_cache:
+            news_list = self.cache.get(key)
+            if news_list is not None:
+                logger.info('缓存命中: 关键词"%s"的第%s页新闻', keyword, page)
+                return news_list, 'HIT'
+        
+        news_list = self._fetch_news_coalesced(keyword, page)
+        
+        # 空结果可能是临时被拦截，不写入缓存
+        if news_list:
+            self.cache.set(key, news_list)
+        return news_list, ('MISS' if use_cache else 'BYPASS')
+    
+    def fetch_first_news(self, keyword, page=1, limit=10, use_cache=True):
+        """
+        获取搜索结果的前 limit 条
+        
+        缓存命中时直接截取缓存结果，否则流式抓取并在取满后停止下载，
+        部分结果不写入缓存
+        
+        Args:
+            keyword (str): 搜索关键字
+            page (int): 页码
+            limit (int): 最多返回的条数
+            use_cache (bool): 是否读取缓存
+            
+        Returns:
+            tuple: (新闻列表, 缓存状态)，缓存状态为 HIT 或 BYPASS
+        """
+        if self.cache is not None and use_cache:
+            news_list = self.cache.get(f'news:{page}:{keyword}')
+            if news_list is not None:
+                return news_list[:limit], 'HIT'
+        
+        return list(self.iter_news(keyword, page, limit)), 'BYPASS'
+    
+    def _fetch_news_coalesced(self, keyword, page=1):
+        """
+        请求上游搜索结果，相同 (关键词, 页码) 的并发请求只发起一次上游抓取
+        
+        Args:
+            keyword (str): 搜索关键字
+            page (int): 页码
+            
+        Returns:
+            list: 新闻列表，合并的调用方共享同一结果
+        """
+        if self.singleflight is None:
+            return self._fetch_news(keyword, page)
+        
+        news_list, shared = self.singleflight.do((keyword, page), lambda: self._fetch_news(keyword, page))
+        if shared:
+            logger.info('合并相同请求: 关键词"%s"的第%s页新闻', keyword, page)
+        return news_list
+    
+    def _fetch_news(self, keyword, page=1):
+        """
+        请求百度新闻搜索并解析结果，不经过缓存
+        
+        Args:
+            keyword (str): 搜索关键字
+            page (int): 页码
+            
+        Returns:
+            list: 新闻列表
+        """
         try:
-            logger.info(f'开始抓取关键词"{keyword}"的第{page}页新闻')
-            
-            # 构造请求参数
-            params = {
-                'rtt': 1,  # 1代表按时间排序，2代表按焦点排序
-                'bsst': 1,
-                'cl': 2,  # 2代表新闻
-                'tn': 'news',
-                'rsv_dl': 'ns_pc',
-                'word': keyword,
-                'pn': (page - 1) * 10  # 每页10条新闻
-            }
+            logger.info('开始抓取关键词"%s"的第%s页新闻', keyword, page)
             
             # 发送请求
-            response = self.session.get(self.BASE_URL, params=params, timeout=10)
+            response = self.session.get(self.BASE_URL, params=self._search_params(keyword, page), timeout=10)
             response.raise_for_status()  # 检查请求是否成功
             
             # 打印响应信息
-            logger.info(f'响应状态码: {response.status_code}')
-            logger.info(f'响应URL: {response.url}')
-            logger.info(f'Content-Type: {response.headers.get("Content-Type")}')
-            logger.info(f'Content-Encoding: {response.headers.get("Content-Encoding")}')
-            logger.info(f'原始内容长度: {len(response.content)}')
+            logger.debug('响应状态码: %s, URL: %s, Content-Type: %s, Content-Encoding: %s, 原始内容长度: %s',
+                         response.status_code, response.url, response.headers.get('Content-Type'),
+                         response.headers.get('Content-Encoding'), len(response.content))
             
             # 处理响应内容
             html_content = self._handle_response_content(response)
             
-            logger.info(f'处理后内容长度: {len(html_content)}')
-            
-            # 保存响应内容用于调试
-            with open('baidu_response.html', 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            logger.debug('处理后内容长度: %s', len(html_content))
             
             # 提取新闻列表
             news_list = self._extract_news(html_content)
             
-            logger.info(f'成功抓取关键词"{keyword}"的第{page}页新闻，共{len(news_list)}条')
+            # 按配置采样保存响应内容用于调试，采样失败不影响抓取结果
+            if self.debug_capture:
+                try:
+                    self.debug_capture.capture(keyword, page, html_content, len(news_list))
+                except Exception as e:
+                    logger.warning('调试采样失败: %s', e)
+            
+            logger.info('成功抓取关键词"%s"的第%s页新闻，共%s条', keyword, page, len(news_list))
             return news_list
             
         except Exception as e:
-            logger.error(f'抓取新闻错误: {e}', exc_info=True)
+            logger.error('抓取新闻错误: %s', e, exc_info=True)
             raise
     
+    def _search_params(self, keyword, page):
+        """构造百度新闻搜索请求参数"""
+        return {
+            'rtt': 1,  # 1代表按时间排序，2代表按焦点排序
+            'bsst': 1,
+            'cl': 2,  # 2代表新闻
+            'tn': 'news',
+            'rsv_dl': 'ns_pc',
+            'word': keyword,
+            'pn': (page - 1) * 10  # 每页10条新闻
+        }
+    
+    def iter_news(self, keyword, page=1, limit=None):
+        """
+        流式抓取百度新闻搜索结果
+        
+        边下载边增量解析，每个新闻条目的结果块闭合后立即返回；取满 limit 条后
+        停止下载，缩短首条结果的等待时间并降低内存占用。不经过缓存。
+        
+        Args:
+            keyword (str): 搜索关键字
+            page (int): 页码
+            limit (int): 最多返回的条数，为None时解析整页
+            
+        Yields:
+            dict: 新闻信息，字段与 fetch_news 相同
+        """
+        if limit is not None and limit <= 0:
+            return
+        
+        logger.info('开始流式抓取关键词"%s"的第%s页新闻', keyword, page)
+        response = self.session.get(self.BASE_URL, params=self._search_params(keyword, page),
+                                    timeout=10, stream=True)
+        try:
+            response.raise_for_status()
+            
+            # 响应头没有声明编码时 requests 会退回 ISO-8859-1，此时不指定编码，
+            # 由 lxml 按页面中的 <meta charset> 识别，避免中文被解码为乱码
+            content_type = response.headers.get('Content-Type', '').lower()
+            encoding = response.encoding if 'charset=' in content_type else None
+            parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+            state = {'open_results': 0, 'found_results': 0}
+            count = 0
+            
+            for chunk in response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE):
+                parser.feed(chunk)
+                for news in self._drain_stream_events(parser, state):
+                    yield news
+                    count += 1
+                    if limit is not None and count >= limit:
+                        logger.debug('已取满%s条，提前结束下载', limit)
+                        return
+            
+            root = parser.close()
+            for news in self._drain_stream_events(parser, state):
+                yield news
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+            
+            # 页面中没有结果块时，与整页解析一致，退回到所有带class的div
+            if state['found_results'] == 0 and root is not None:
+                for item in _CLASSED_DIVS_XPATH(root):
+                    news = self._extract_news_item_lxml(item)
+                    if news:
+                        yield news
+                        count += 1
+                        if limit is not None and count >= limit:
+                            return
+            
+            logger.info('流式抓取关键词"%s"的第%s页新闻完成，共%s条', keyword, page, count)
+            
+        finally:
+            response.close()
+    
+    def _drain_stream_events(self, parser, state):
+        """处理增量解析器产生的事件，返回已闭合的新闻结果块中的新闻"""
+        for event, element in parser.read_events():
+            if element.tag != 'div' or 'result' not in (element.get('class') or ''):
+                continue
+            
+            if event == 'start':
+                state['open_results'] += 1
+                continue
+            
+            state['open_results'] -= 1
+            state['found_results'] += 1
+            news = self._extract_news_item_lxml(element)
+            
+            # 最外层结果块处理完后释放已解析的节点，保持内存占用平稳
+            if state['open_results'] == 0:
+                element.clear()
+                parent = element.getparent()
+                while parent is not None and element.getprevious() is not None:
+                    del parent[0]
+            
+            if news:
+                yield news
+    
+    def fetch_pages(self, keyword, pages=range(1, 2), max_concurrency=None, use_cache=True):
+        """
+        并发抓取多页百度新闻搜索结果
+        
+        单页失败不会影响其他页，错误信息记录在对应页的结果中
+        
+        Args:
+            keyword (str): 搜索关键字
+            pages (iterable): 页码集合，如 range(1, 6)
+            max_concurrency (int): 并发数，默认使用实例配置
+            use_cache (bool): 是否读取缓存
+            
+        Returns:
+            dict: news 为按页码顺序合并的新闻列表，pages 为每页的抓取情况
+        """
+        pages = sorted(set(pages))
+        if not pages:
+            return self._merge_pages([])
+        
+        workers = min(max_concurrency or self.max_concurrency, len(pages))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(lambda page: self._fetch_page_outcome(keyword, page, use_cache), pages))
+        
+        return self._merge_pages(outcomes)
+    
+    async def async_fetch_pages(self, keyword, pages=range(1, 2), max_concurrency=None, use_cache=True):
+        """
+        fetch_pages 的 asyncio 版本，抓取在线程中执行，不阻塞事件循环
+        
+        Args:
+            keyword (str): 搜索关键字
+            pages (iterable): 页码集合
+            max_concurrency (int): 并发数，默认使用实例配置
+            use_cache (bool): 是否读取缓存
+            
+        Returns:
+            dict: 与 fetch_pages 相同的结构
+        """
+        pages = sorted(set(pages))
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        
+        async def fetch(page):
+            async with semaphore:
+                return await asyncio.to_thread(self._fetch_page_outcome, keyword, page, use_cache)
+        
+        outcomes = await asyncio.gather(*(fetch(page) for page in pages))
+        return self._merge_pages(outcomes)
+    
+    def _fetch_page_outcome(self, keyword, page, use_cache=True):
+        """抓取单页并捕获异常，返回 (页码, 新闻列表, 错误信息, 缓存状态)"""
+        try:
+            news_list, cache_status = self.fetch_news_cached(keyword, page, use_cache)
+            return page, news_list, None, cache_status
+        except Exception as e:
+            return page, [], str(e), None
+    
+    def _merge_pages(self, outcomes):
+        """按页码顺序合并多页抓取结果"""
+        news_list = []
+        page_results = []
+        for page, page_news, error, cache_status in sorted(outcomes, key=lambda outcome: outcome[0]):
+            news_list.extend(page_news)
+            page_results.append({
+                'page': page,
+                'count': len(page_news),
+                'error': error,
+                'cache': cache_status
+            })
+        
+        return {
+            'news': news_list,
+            'pages': page_results
+        }
+    
     def _handle_response_content(self, response):
         """处理响应内容，利用requests内置功能处理压缩和编码"""
         # 利用requests内置功能获取解码后的内容
-        logger.info(f'requests自动检测的编码: {response.encoding}')
+        logger.debug('requests自动检测的编码: %s', response.encoding)
         return response.text
     
     def _extract_news(self, html_content):
         """
-        从HTML内容中提取新闻
+        从HTML内容中提取新闻，按配置选择解析后端
+        
+        Args:
+            html_content (str): HTML内容
+            
+        Returns:
+            list: 新闻列表
+        """
+        if self.parser == 'lxml':
+            return self._extract_news_lxml(html_content)
+        return self._extract_news_bs4(html_content)
+    
+    def _extract_news_bs4(self, html_content):
+        """
+        使用BeautifulSoup从HTML内容中提取新闻（参考实现）
         
         Args:
             html_content (str): HTML内容
@@ -105,25 +506,26 @@ class BaiduNewsScraper:
         news_list = []
         
         try:
-            logger.info('开始使用BeautifulSoup提取新闻')
+            logger.debug('开始使用BeautifulSoup提取新闻')
             
             # 创建BeautifulSoup对象
             soup = BeautifulSoup(html_content, 'html.parser')
             
             # 查找所有新闻条目 - 首先尝试查找class包含"result"的div
             news_items = soup.find_all('div', class_=lambda x: x and 'result' in x)
-            logger.info(f'找到包含"result"类的div: {len(news_items)}个')
+            logger.debug('找到包含"result"类的div: %s个', len(news_items))
             
             if not news_items:
                 # 尝试查找所有可能的新闻条目容器
                 news_items = soup.find_all('div', attrs={'class': True})
-                logger.info(f'找到所有带class的div: {len(news_items)}个')
+                logger.debug('找到所有带class的div: %s个', len(news_items))
                 
                 # 打印一些div的class信息，以便了解结构
-                class_names = []
-                for item in news_items[:20]:  # 只看前20个
-                    class_names.append(item['class'])
-                logger.info(f'前20个div的class名称: {class_names}')
+                if logger.isEnabledFor(logging.DEBUG):
+                    class_names = []
+                    for item in news_items[:20]:  # 只看前20个
+                        class_names.append(item['class'])
+                    logger.debug('前20个div的class名称: %s', class_names)
             
             # 提取每个新闻条目的信息
             for item in news_items:
@@ -131,13 +533,106 @@ class BaiduNewsScraper:
                 if news:
                     news_list.append(news)
             
-            logger.info(f'成功提取到 {len(news_list)} 条新闻')
+            logger.debug('成功提取到 %s 条新闻', len(news_list))
             
         except Exception as e:
-            logger.error(f'提取新闻错误: {e}', exc_info=True)
+            logger.error('提取新闻错误: %s', e, exc_info=True)
         
         return news_list
     
+    def _extract_news_lxml(self, html_content):
+        """
+        使用lxml和预编译XPath从HTML内容中提取新闻，结果与bs4实现一致
+        
+        Args:
+            html_content (str): HTML内容
+            
+        Returns:
+            list: 新闻列表
+        """
+        news_list = []
+        
+        try:
+            if not html_content.strip():
+                return news_list
+            
+            root = lxml_html.document_fromstring(html_content)
+            
+            # 查找所有新闻条目 - 首先尝试查找class包含"result"的div
+            news_items = _RESULT_DIVS_XPATH(root)
+            logger.debug('找到包含"result"类的div: %s个', len(news_items))
+            
+            if not news_items:
+                # 尝试查找所有可能的新闻条目容器
+                news_items = _CLASSED_DIVS_XPATH(root)
+                logger.debug('找到所有带class的div: %s个', len(news_items))
+            
+            # 提取每个新闻条目的信息
+            for item in news_items:
+                news = self._extract_news_item_lxml(item)
+                if news:
+                    news_list.append(news)
+            
+            logger.debug('成功提取到 %s 条新闻', len(news_list))
+            
+        except Exception as e:
+            logger.error('提取新闻错误: %s', e, exc_info=True)
+        
+        return news_list
+    
+    def _extract_news_item_lxml(self, item):
+        """
+        从lxml新闻条目元素中提取单个新闻信息
+        
+        Args:
+            item (lxml.html.HtmlElement): 新闻条目元素
+            
+        Returns:
+            dict: 新闻信息
+        """
+        try:
+            # 提取标题和URL
+            title_tags = _FIRST_LINK_XPATH(item)
+            if not title_tags:
+                return None
+            
+            title = _element_text(title_tags[0])
+            url = title_tags[0].get('href', '')
+            
+            if not title or not url:
+                return None
+            
+            # 提取来源：取第一个长度合适的span，含日期特征的视为时间
+            source = ''
+            for span in _SPANS_XPATH(item):
+                span_text = _element_text(span)
+                if span_text and len(span_text) < 50:
+                    if not ('年' in span_text or '月' in span_text or '日' in span_text or ':' in span_text):
+                        source = span_text
+                    break
+            
+            # 提取封面图片
+            image_url = ''
+            img_tags = _FIRST_IMG_XPATH(item)
+            if img_tags:
+                image_url = img_tags[0].get('src', '')
+            
+            news = {
+                'image_url': image_url,
+                'title': title,
+                'source': source,
+                'url': url
+            }
+            
+            logger.debug('解析到新闻: 标题="%.30s...", 来源="%s", URL="%.50s..."', title, source, url)
+            
+            return news
+            
+        except Exception as e:
+            logger.error('提取新闻条目错误: %s', e, exc_info=True)
+        
+        return None
+    
     def _extract_news_item(self, item):
         """
         从新闻条目HTML中提取单个新闻信息
@@ -189,12 +684,12 @@ class BaiduNewsScraper:
                 'url': url
             }
             
-            logger.info(f'解析到新闻: 标题="{title[:30]}...", 来源="{source}", URL="{url[:50]}..."')
+            logger.debug('解析到新闻: 标题="%.30s...", 来源="%s", URL="%.50s..."', title, source, url)
             
             return news
             
         except Exception as e:
-            logger.error(f'提取新闻条目错误: {e}', exc_info=True)
+            logger.error('提取新闻条目错误: %s', e, exc_info=True)
         
         return None
         
@@ -209,64 +704,178 @@ class BaiduNewsScraper:
             str: 提取的详细内容
         """
         try:
-            logger.info(f'开始深度采集URL: {url[:50]}...')
-            
-            # 发送请求
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            # 处理响应内容
-            html_content = self._handle_response_content(response)
+            return self._deep_collect(url)
+        except Exception as e:
+            logger.error('深度采集错误: %s', e, exc_info=True)
+            return f'深度采集失败: {str(e)}'
+    
+    def _deep_collect(self, url):
+        """深度采集单个URL，失败时抛出异常"""
+        logger.info('开始深度采集URL: %.50s...', url)
+        
+        # 发送请求
+        response = self.session.get(url, timeout=10)
+        response.raise_for_status()
+        
+        # 处理响应内容
+        html_content = self._handle_response_content(response)
+        
+        host = urllib.parse.urlsplit(url).hostname or ''
+        
+        # 优先使用该站点已学习到的提取规则，只做一次定向查找
+        strategy = self.rule_store.get(host) if self.rule_store else None
+        if strategy:
+            content = self._extract_content_with_strategy(html_content, strategy)
+            if len(content) >= self.RULE_MIN_CONTENT_LENGTH:
+                self.rule_store.record_success(host, strategy)
+                logger.info('深度采集完成（站点规则 %s），提取内容长度: %s', strategy, len(content))
+                return content
+            self.rule_store.record_failure(host, strategy)
+        
+        # 按配置选择正文提取方式
+        if self.extractor == 'density':
+            content, strategy = extract_article(html_content)['content'], 'density'
+        else:
+            content, strategy = self._extract_content_selectors(html_content)
+        
+        # 记录有效的提取方式，body 兜底结果质量不稳定，不作为站点规则
+        if self.rule_store and strategy not in (None, 'body') and len(content) >= self.RULE_MIN_CONTENT_LENGTH:
+            self.rule_store.record_success(host, strategy)
+        
+        logger.info('深度采集完成，提取内容长度: %s', len(content))
+        return content
+    
+    def _extract_content_with_strategy(self, html_content, strategy):
+        """
+        只用指定的提取策略提取正文
+        
+        Args:
+            html_content (str): 详情页HTML
+            strategy (str): 提取策略名称，见 CONTENT_SELECTORS、paragraphs 和 density
             
-            # 使用BeautifulSoup解析
-            soup = BeautifulSoup(html_content, 'html.parser')
+        Returns:
+            str: 提取的正文，策略不适用时为空字符串
+        """
+        if strategy == 'density':
+            return extract_article(html_content)['content']
+        
+        root = lxml_html.document_fromstring(html_content) if html_content.strip() else None
+        if root is None:
+            return ''
+        
+        if strategy == 'paragraphs':
+            texts = [_element_text(p) for p in _PARAGRAPHS_XPATH(root)]
+            return '\n'.join(text for text in texts if text and len(text) > 50)
+        
+        xpath = _CONTENT_SELECTOR_XPATHS.get(strategy)
+        if xpath is None:
+            return ''
+        containers = xpath(root)
+        if not containers:
+            return ''
+        texts = [_element_text(p) for p in _PARAGRAPHS_XPATH(containers[0])]
+        return '\n'.join(text for text in texts if text)
+    
+    def _extract_content_selectors(self, html_content):
+        """
+        按固定的选择器顺序提取正文（参考实现）
+        
+        Args:
+            html_content (str): 详情页HTML
             
-            # 尝试多种方式提取主要内容
-            content = ''
-            
-            # 尝试常见的新闻内容容器标签和类名
-            content_selectors = [
-                ('div', {'class': 'article-content'}),
-                ('div', {'class': 'content'}),
-                ('div', {'id': 'content'}),
-                ('article', {}),
-                ('div', {'class': 'main-content'}),
-                ('div', {'class': 'news-content'}),
-                ('div', {'class': 'article-body'}),
-                ('div', {'class': 'content-body'}),
-                ('div', {'class': 'content_detail'}),
-                ('div', {'class': 'article-text'}),
-            ]
-            
-            for tag, attrs in content_selectors:
-                content_div = soup.find(tag, attrs)
-                if content_div:
-                    # 提取所有段落文本
-                    paragraphs = content_div.find_all('p')
-                    content = '\n'.join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
-                    if content:
-                        break
-            
-            # 如果没有找到内容，尝试提取所有p标签的文本
-            if not content:
-                all_paragraphs = soup.find_all('p')
-                content = '\n'.join([p.get_text(strip=True) for p in all_paragraphs if p.get_text(strip=True) and len(p.get_text(strip=True)) > 50])
-            
-            # 如果还是没有找到内容，使用body标签的文本
-            if not content:
-                body_tag = soup.find('body')
-                if body_tag:
-                    content = body_tag.get_text(strip=True)[:1000]  # 限制长度
-            
-            logger.info(f'深度采集完成，提取内容长度: {len(content)}')
-            return content
+        Returns:
+            tuple: (提取的正文, 命中的提取策略名称)
+        """
+        # 使用BeautifulSoup解析
+        soup = BeautifulSoup(html_content, 'html.parser')
+        
+        # 尝试常见的新闻内容容器标签和类名
+        for strategy, (tag, attrs) in CONTENT_SELECTORS:
+            content_div = soup.find(tag, attrs)
+            if content_div:
+                # 提取所有段落文本
+                paragraphs = content_div.find_all('p')
+                content = '\n'.join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
+                if content:
+                    return content, strategy
+        
+        # 如果没有找到内容，尝试提取所有p标签的文本
+        all_paragraphs = soup.find_all('p')
+        content = '\n'.join([p.get_text(strip=True) for p in all_paragraphs if p.get_text(strip=True) and len(p.get_text(strip=True)) > 50])
+        if content:
+            return content, 'paragraphs'
+        
+        # 如果还是没有找到内容，使用body标签的文本
+        body_tag = soup.find('body')
+        if body_tag:
+            return body_tag.get_text(strip=True)[:1000], 'body'  # 限制长度
+        
+        return '', None
+    
+    def deep_collect_many(self, urls, max_workers=None, per_host=None):
+        """
+        批量并发深度采集，按完成顺序逐条返回结果
+        
+        全局并发数限制同时进行的请求总数，单站点并发数限制同一主机名
+        同时进行的请求数，避免对单个发布方集中请求
+        
+        Args:
+            urls (iterable): 新闻详情页URL列表
+            max_workers (int): 全局并发数，默认使用实例配置
+            per_host (int): 单站点并发数，默认使用实例配置
             
-        except Exception as e:
-            logger.error(f'深度采集错误: {e}', exc_info=True)
-            return f'深度采集失败: {str(e)}'
+        Yields:
+            dict: url 为详情页URL，content 为提取的内容，error 为失败原因（成功时为None）
+        """
+        max_workers = max_workers or self.deep_max_workers
+        per_host = per_host or self.deep_per_host
+        
+        # 按主机名分组排队，保持各主机内的提交顺序
+        queues = {}
+        for url in urls:
+            host = urllib.parse.urlsplit(url).hostname or ''
+            queues.setdefault(host, deque()).append(url)
+        
+        in_flight = {host: 0 for host in queues}
+        futures = {}
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            def submit_ready():
+                # 轮询各主机队列，在全局和单站点并发限制内提交任务
+                progressed = True
+                while progressed and len(futures) < max_workers:
+                    progressed = False
+                    for host, queue in queues.items():
+                        if len(futures) >= max_workers:
+                            break
+                        if queue and in_flight[host] < per_host:
+                            url = queue.popleft()
+                            futures[executor.submit(self._deep_collect, url)] = (host, url)
+                            in_flight[host] += 1
+                            progressed = True
+            
+            submit_ready()
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host, url = futures.pop(future)
+                    in_flight[host] -= 1
+                    try:
+                        result = {'url': url, 'content': future.result(), 'error': None}
+                    except Exception as e:
+                        logger.error('深度采集错误: %.50s... %s', url, e)
+                        result = {'url': url, 'content': '', 'error': str(e)}
+                    yield result
+                submit_ready()
 
 # 测试代码
 if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    
     try:
         scraper = BaiduNewsScraper()
         news_list = scraper.fetch_news('西昌', page=1)
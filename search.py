@@ -0,0 +1,301 @@
+import html
+import logging
+import re
+from sqlalchemy import text, bindparam
+from app import db
+from app.models import DataCollection, DeepCollection
+from app.pagination import encode_cursor, decode_cursor
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 全文索引表，rowid 为 DataCollection.id，由 migrations/v004_news_search.py 创建
+FTS_TABLE = 'news_fts'
+
+# 待同步到全文索引的 DataCollection ID，由触发器写入（见 migrations/v009_news_search_queue.py）
+PENDING_TABLE = 'news_fts_pending'
+
+# 标题的相关度权重高于正文
+TITLE_WEIGHT = 3.0
+CONTENT_WEIGHT = 1.0
+
+CJK_CHARS = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'  # 中日韩统一表意文字
+TOKEN_PATTERN = re.compile(rf'([{CJK_CHARS}]+)|([^\W_{CJK_CHARS}]+)', re.U)
+
+def cjk_bigrams(value, tail=True):
+    """
+    把文本切分为检索词，空格分隔
+    
+    中文按相邻两字切分（"西昌市" -> "西昌 昌市"），单独的一个汉字保留为一个词；
+    英文和数字按单词切分并转为小写。FTS5 的 unicode61 分词器按空格切分结果，
+    因此无需分词词典即可检索任意中文词语。
+    
+    建立索引时（tail=True）每段中文的最后一个字再单独作为一个词（"西昌市" ->
+    "西昌 昌市 市"），使每个汉字都是某个词的开头，单字检索可以用前缀匹配找到
+    任意位置的字。检索词语时不加这个词，否则短语要求该字后面没有其他汉字。
+    
+    Args:
+        value (str): 文本
+        tail (bool): 是否为每段中文的最后一个字单独生成一个词
+    
+    Returns:
+        str: 空格分隔的检索词
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer((value or '').lower()):
+        cjk, word = match.groups()
+        if word:
+            tokens.append(word)
+        elif len(cjk) == 1:
+            tokens.append(cjk)
+        else:
+            tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+            if tail:
+                tokens.append(cjk[-1])
+    return ' '.join(tokens)
+
+def register_sqlite_functions(dbapi_connection):
+    """
+    在SQLite连接上注册重建全文索引的迁移（v004、v008）使用的函数
+    
+    触发器不调用该函数，其他工具的连接不注册也可以写入采集结果
+    """
+    dbapi_connection.create_function('cjk_bigrams', 1, cjk_bigrams, deterministic=True)
+
+def _index_rows(ids):
+    """按当前的标题和最新的深度采集正文重写这些新闻的索引，已删除的新闻只删除索引"""
+    db.session.execute(text(f'DELETE FROM {FTS_TABLE} WHERE rowid IN :ids').bindparams(
+        bindparam('ids', expanding=True)), {'ids': ids})
+    titles = db.session.query(DataCollection.id, DataCollection.title).filter(DataCollection.id.in_(ids)).all()
+    if not titles:
+        return
+    contents = dict(
+        db.session.query(DeepCollection.data_collection_id, DeepCollection.content)
+        .filter(DeepCollection.data_collection_id.in_(ids)).order_by(DeepCollection.id)
+    )
+    db.session.execute(text(f'INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (:id, :title, :content)'), [
+        {'id': collection_id, 'title': cjk_bigrams(title), 'content': cjk_bigrams(contents.get(collection_id))}
+        for collection_id, title in titles
+    ])
+
+def sync_search_index(batch_size=500):
+    """
+    把触发器记录的新增、修改、删除的新闻写入全文索引
+    
+    应用写入采集结果后调用，检索前也会调用一次，因此其他工具写入的数据也会被索引
+    
+    Args:
+        batch_size (int): 每个事务处理的记录数
+    
+    Returns:
+        int: 处理的记录数
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return 0
+    total = 0
+    while True:
+        pending = db.session.execute(text(
+            f'SELECT id, data_collection_id FROM {PENDING_TABLE} ORDER BY id LIMIT :limit'), {'limit': batch_size}).all()
+        if not pending:
+            return total
+        try:
+            _index_rows(sorted({collection_id for _, collection_id in pending}))
+            # 只删除已处理的记录，处理期间新写入的记录留到下一轮
+            db.session.execute(text(f'DELETE FROM {PENDING_TABLE} WHERE id <= :last_id'), {'last_id': pending[-1][0]})
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        total += len(pending)
+
+def rebuild_search_index(batch_size=500):
+    """
+    清空并按采集结果重新建立全文索引
+    
+    索引与数据不一致时（如触发器引入之前其他工具写入的数据）使用
+    
+    Args:
+        batch_size (int): 每个事务处理的新闻条数
+    
+    Returns:
+        int: 索引的新闻条数
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return 0
+    try:
+        db.session.execute(text(f'DELETE FROM {FTS_TABLE}'))
+        db.session.execute(text(f'DELETE FROM {PENDING_TABLE}'))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    total = 0
+    last_id = 0
+    while True:
+        ids = [collection_id for (collection_id,) in db.session.query(DataCollection.id)
+               .filter(DataCollection.id > last_id).order_by(DataCollection.id).limit(batch_size)]
+        if not ids:
+            break
+        try:
+            _index_rows(ids)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        total += len(ids)
+        last_id = ids[-1]
+    logger.info('全文索引重建完成，共%s条', total)
+    return total
+
+def search_terms(query):
+    """拆分检索语句，按空格分隔的每一项都必须出现"""
+    return [term for term in (query or '').split() if TOKEN_PATTERN.search(term)]
+
+def match_expression(terms):
+    """
+    生成 FTS5 MATCH 表达式
+    
+    每项切分后作为短语（相邻两字必须连续出现）；只有一个汉字的项按前缀匹配，
+    匹配以该字开头的两字词和索引中每段末尾单独的字
+    
+    Args:
+        terms (list): search_terms 的结果
+    
+    Returns:
+        str: MATCH 表达式
+    """
+    phrases = []
+    for term in terms:
+        tokens = cjk_bigrams(term, tail=False)
+        if len(tokens) == 1 and re.match(f'[{CJK_CHARS}]', tokens):
+            phrases.append(f'"{tokens}"*')
+        else:
+            phrases.append(f'"{tokens}"')
+    return ' AND '.join(phrases)
+
+def make_snippet(value, terms, width=80):
+    """
+    截取包含检索词的片段并用 <mark> 标出检索词
+    
+    Args:
+        value (str): 原文
+        terms (list): 检索词
+        width (int): 片段的最大字数
+    
+    Returns:
+        str: HTML转义后的片段，不含检索词时为开头的 width 个字
+    """
+    value = ' '.join((value or '').split())
+    if not value:
+        return ''
+    pattern = re.compile('|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.I)
+    match = pattern.search(value)
+    start = max(0, match.start() - width // 4) if match and len(value) > width else 0
+    end = min(len(value), start + width)
+    fragment = value[start:end]
+    
+    parts = []
+    position = 0
+    for found in pattern.finditer(fragment):
+        parts.append(html.escape(fragment[position:found.start()]))
+        parts.append(f'<mark>{html.escape(found.group())}</mark>')
+        position = found.end()
+    parts.append(html.escape(fragment[position:]))
+    return ('…' if start > 0 else '') + ''.join(parts) + ('…' if end < len(value) else '')
+
+def _ranked_ids(expression, after, limit):
+    """按相关度排序的匹配记录，after 为上一页最后一条的 (得分, ID)"""
+    score = f'bm25({FTS_TABLE}, {TITLE_WEIGHT}, {CONTENT_WEIGHT})'
+    sql = f'SELECT rowid, {score} AS score FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :expression'
+    params = {'expression': expression, 'limit': limit}
+    if after is not None:
+        # bm25 越小越相关，得分相同时按ID排序，保证翻页不重复不遗漏
+        sql += f' AND ({score} > :score OR ({score} = :score AND rowid > :last_id))'
+        params.update(score=after[0], last_id=after[1])
+    sql += ' ORDER BY score, rowid LIMIT :limit'
+    return db.session.execute(text(sql), params).all()
+
+def _like_ids(terms, after, limit):
+    """非SQLite数据库没有全文索引，按标题模糊匹配并按ID倒序"""
+    query = db.session.query(DataCollection.id, db.literal(0.0))
+    for term in terms:
+        query = query.filter(DataCollection.title.contains(term))
+    if after is not None:
+        query = query.filter(DataCollection.id < after[1])
+    return query.order_by(DataCollection.id.desc()).limit(limit).all()
+
+def search_news(query, cursor=None, limit=20, snippet_chars=80):
+    """
+    检索已采集的新闻
+    
+    SQLite 使用 FTS5 全文索引按 bm25 相关度排序，标题权重高于正文；按 (得分, ID)
+    键集分页，翻到任意一页的代价相同。
+    
+    Args:
+        query (str): 检索语句，空格分隔的各项都必须出现
+        cursor (str): 上一页返回的 next_cursor，为None时返回第一页
+        limit (int): 每页条数
+        snippet_chars (int): 摘要片段的最大字数
+    
+    Returns:
+        dict: items 为结果列表，next_cursor 为下一页游标（没有下一页时为None）
+    
+    Raises:
+        ValueError: 检索语句为空或游标无效
+    """
+    terms = search_terms(query)
+    if not terms:
+        raise ValueError('检索词不能为空')
+    after = None
+    if cursor:
+        score, last_id = decode_cursor(cursor, 2)
+        try:
+            after = (float(score), int(last_id))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f'无效的分页游标: {cursor}') from e
+    
+    if db.engine.dialect.name == 'sqlite':
+        # 先索引尚未同步的新闻，失败时仍按已有索引检索
+        try:
+            sync_search_index()
+        except Exception as e:
+            logger.warning('同步全文索引失败: %s', e)
+        rows = _ranked_ids(match_expression(terms), after, limit + 1)
+    else:
+        rows = _like_ids(terms, after, limit + 1)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return {'items': [], 'next_cursor': None}
+    
+    ids = [row[0] for row in rows]
+    records = {
+        collection.id: (collection, content)
+        for collection, content in db.session.query(DataCollection, DeepCollection.content)
+        .outerjoin(DeepCollection, DeepCollection.data_collection_id == DataCollection.id)
+        .filter(DataCollection.id.in_(ids))
+    }
+    
+    items = []
+    for collection_id, score in rows:
+        if collection_id not in records:
+            continue
+        collection, content = records[collection_id]
+        items.append({
+            'id': collection.id,
+            'task_id': collection.task_id,
+            'title': collection.title,
+            'title_highlight': make_snippet(collection.title, terms, width=len(collection.title or '')),
+            'snippet': make_snippet(content, terms, snippet_chars) if content else '',
+            'url': collection.url,
+            'source': collection.source,
+            'collected_at': collection.collected_at.isoformat() if collection.collected_at else None,
+            'score': round(-score, 6)
+        })
+    
+    last_id, last_score = rows[-1]
+    return {
+        'items': items,
+        'next_cursor': encode_cursor([last_score, last_id]) if has_more else None
+    }
@@ -0,0 +1,39 @@
+from flask import current_app, request
+
+def checkout_scraper():
+    """
+    从进程级抓取器池借出一个抓取器，用法：
+    
+        with checkout_scraper() as scraper:
+            scraper.fetch_news(keyword, page)
+    
+    Returns:
+        上下文管理器，进入时得到 BaiduNewsScraper 实例
+    """
+    return current_app.extensions['scraper_pool'].checkout()
+
+def use_cache_requested():
+    """
+    判断当前请求是否允许读取搜索缓存，nocache=1 时绕过缓存
+    
+    Returns:
+        bool: 是否读取缓存
+    """
+    return request.args.get('nocache', '').lower() not in ('1', 'true', 'yes')
+
+def cache_status_header(statuses):
+    """
+    汇总一个或多个页面的缓存状态，用于 X-Cache 响应头
+    
+    Args:
+        statuses (list): 各页缓存状态（HIT、MISS、BYPASS，失败页为None）
+        
+    Returns:
+        str: 全部命中为 HIT，存在绕过为 BYPASS，否则为 MISS
+    """
+    statuses = [status for status in statuses if status]
+    if statuses and all(status == 'HIT' for status in statuses):
+        return 'HIT'
+    if 'BYPASS' in statuses:
+        return 'BYPASS'
+    return 'MISS'
@@ -0,0 +1,97 @@
+import logging
+import threading
+from flask import current_app, g, has_request_context
+from sqlalchemy import update, insert
+from app import db
+from app.models import SystemSetting, SettingsVersion
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 未设置时使用的默认值
+SETTING_DEFAULTS = {
+    'app_name': '政企智能舆情分析平台',
+    'logo_url': '',
+    'description': ''
+}
+
+# SettingsVersion 只有一行，ID固定
+VERSION_ROW_ID = 1
+
+class SettingsCache:
+    """
+    进程内的系统设置快照
+    
+    快照包含全部设置，按数据库中的版本号失效：每个请求最多查询一次版本号，
+    与快照的版本号不同时重新加载全部设置。SystemSetting.set 在修改设置的事务中
+    递增版本号，因此所有进程在下一个请求就能读到新设置，读取单项设置不查询数据库。
+    """
+    
+    def __init__(self):
+        self._version = None
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def snapshot(self):
+        """
+        当前的设置快照
+        
+        Returns:
+            dict: 设置键到值的映射，不要修改
+        """
+        if has_request_context() and 'settings_snapshot' in g:
+            return g.settings_snapshot
+        
+        version = _read_version()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._values = dict(db.session.query(SystemSetting.key, SystemSetting.value))
+                    self._version = version
+                    logger.debug('系统设置已重新加载，版本%s', version)
+        values = self._values
+        if has_request_context():
+            g.settings_snapshot = values
+        return values
+    
+    def invalidate(self):
+        """丢弃本进程的快照，下次读取时重新加载"""
+        with self._lock:
+            self._version = None
+        if has_request_context():
+            g.pop('settings_snapshot', None)
+
+def _read_version():
+    return db.session.query(SettingsVersion.version).filter_by(id=VERSION_ROW_ID).scalar() or 0
+
+def current_settings():
+    """
+    当前应用的设置快照
+    
+    Returns:
+        dict: 设置键到值的映射
+    """
+    cache = current_app.extensions.get('settings_cache')
+    if cache is None:
+        return dict(db.session.query(SystemSetting.key, SystemSetting.value))
+    return cache.snapshot()
+
+def bump_settings_version():
+    """
+    递增设置版本号，在修改设置的事务中调用，由调用方提交
+    """
+    result = db.session.execute(
+        update(SettingsVersion).where(SettingsVersion.id == VERSION_ROW_ID)
+        .values(version=SettingsVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        db.session.execute(insert(SettingsVersion).values(id=VERSION_ROW_ID, version=1))
+    cache = current_app.extensions.get('settings_cache')
+    if cache is not None:
+        cache.invalidate()
+
+def template_settings():
+    """
+    模板上下文处理器：向所有模板提供 system_settings（含默认值）
+    """
+    return {'system_settings': dict(SETTING_DEFAULTS, **current_settings())}
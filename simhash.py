@@ -0,0 +1,171 @@
+import hashlib
+import re
+import threading
+from collections import Counter, OrderedDict
+
+# 计算指纹前去掉的字符：空白、标点和符号
+NOISE_PATTERN = re.compile(r'[\s\W_]+', re.U)
+
+# 标题中常见的来源后缀和栏目前缀，如 "标题_网易新闻"、"【快讯】标题"
+TITLE_SUFFIX_PATTERN = re.compile(r'\s*[-_|－—｜]\s*[^-_|－—｜]{1,12}$')
+TITLE_PREFIX_PATTERN = re.compile(r'^\s*[【\[][^】\]]{1,10}[】\]]\s*')
+
+FINGERPRINT_BITS = 64
+
+# 计算指纹时每个比特的计数器位宽，计数器打包在一个大整数中，一次加法更新全部64个比特
+_LANE_BITS = 32
+_LANE_MASK = (1 << _LANE_BITS) - 1
+
+# 单字节到8个计数器的展开表：第 i 位为1时第 i 个计数器为1
+_BYTE_LANES = [
+    sum(1 << (bit * _LANE_BITS) for bit in range(8) if byte >> bit & 1)
+    for byte in range(256)
+]
+
+try:
+    _popcount = int.bit_count
+except AttributeError:  # Python 3.10 以下
+    def _popcount(value):
+        return bin(value).count('1')
+
+def normalize_title(title):
+    """去掉标题中的来源后缀和栏目前缀"""
+    title = (title or '').strip()
+    title = TITLE_PREFIX_PATTERN.sub('', title)
+    stripped = TITLE_SUFFIX_PATTERN.sub('', title)
+    # 只有后缀之前仍有足够长的标题时才去掉后缀
+    return stripped if len(stripped) >= 8 else title
+
+def _token_hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def simhash(text, ngram=3):
+    """
+    计算文本的64位SimHash指纹
+    
+    以去掉空白和标点后的字符 n-gram 为特征、出现次数为权重，中文无需分词
+    
+    Args:
+        text (str): 文本
+        ngram (int): 特征的字符数，短文本（标题）用2，正文用3
+    
+    Returns:
+        int: 64位无符号指纹，文本为空时返回None
+    """
+    text = NOISE_PATTERN.sub('', (text or '').lower())
+    if not text:
+        return None
+    if len(text) <= ngram:
+        features = Counter([text])
+    else:
+        features = Counter(text[i:i + ngram] for i in range(len(text) - ngram + 1))
+    
+    # 每个特征哈希展开为64个计数器后按权重累加，等价于逐比特 +count/-count
+    lanes = 0
+    total = 0
+    for token, count in features.items():
+        value = _token_hash(token)
+        spread = 0
+        for byte_index in range(8):
+            spread |= _BYTE_LANES[value >> (byte_index * 8) & 0xFF] << (byte_index * 8 * _LANE_BITS)
+        lanes += spread * count
+        total += count
+    
+    fingerprint = 0
+    for bit in range(FINGERPRINT_BITS):
+        # 该比特为1的特征权重之和超过一半时指纹该位为1
+        if (lanes >> (bit * _LANE_BITS) & _LANE_MASK) * 2 > total:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def hamming_distance(a, b):
+    """两个指纹不同的比特数"""
+    return _popcount(a ^ b)
+
+def to_signed(fingerprint):
+    """无符号64位指纹转为有符号整数，用于存入数据库的 BIGINT 列"""
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+def to_unsigned(value):
+    """数据库中的有符号整数还原为无符号64位指纹"""
+    return value + (1 << 64) if value < 0 else value
+
+class SimHashIndex:
+    """
+    SimHash 近似重复索引（分段LSH）
+    
+    指纹按 bands 段切分，每段作为哈希桶的键。汉明距离不超过 bands - 1 的两个指纹
+    至少有一段完全相同（抽屉原理），因此查询只需比较同桶的候选，不必遍历全部指纹。
+    超过 maxsize 后淘汰最早加入的指纹。
+    """
+    
+    def __init__(self, max_distance=3, maxsize=200000):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.maxsize = maxsize
+        self._band_bits = FINGERPRINT_BITS // self.bands
+        self._band_mask = (1 << self._band_bits) - 1
+        self._buckets = [{} for _ in range(self.bands)]  # 每段：段值 -> {key: 指纹}
+        self._fingerprints = OrderedDict()  # key -> (指纹, 附加值)，按加入顺序
+        self._lock = threading.Lock()
+    
+    def _band_keys(self, fingerprint):
+        return [fingerprint >> (band * self._band_bits) & self._band_mask for band in range(self.bands)]
+    
+    def add(self, key, fingerprint, value=None):
+        """
+        加入指纹
+        
+        Args:
+            key (hashable): 指纹所属记录的键
+            fingerprint (int): 64位指纹
+            value: 随指纹保存的附加值（如所属聚类ID）
+        """
+        with self._lock:
+            if key in self._fingerprints:
+                self._remove(key)
+            self._fingerprints[key] = (fingerprint, value)
+            for band, band_key in enumerate(self._band_keys(fingerprint)):
+                self._buckets[band].setdefault(band_key, {})[key] = fingerprint
+            while len(self._fingerprints) > self.maxsize:
+                self._remove(next(iter(self._fingerprints)))
+    
+    def _remove(self, key):
+        fingerprint, _ = self._fingerprints.pop(key)
+        for band, band_key in enumerate(self._band_keys(fingerprint)):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del self._buckets[band][band_key]
+    
+    def nearest(self, fingerprint):
+        """
+        查找汉明距离不超过 max_distance 的最相似指纹
+        
+        Args:
+            fingerprint (int): 64位指纹
+        
+        Returns:
+            tuple: (键, 汉明距离, 附加值)，没有相似指纹时返回None
+        """
+        best_key = None
+        best_distance = self.max_distance + 1
+        with self._lock:
+            for band, band_key in enumerate(self._band_keys(fingerprint)):
+                bucket = self._buckets[band].get(band_key)
+                if not bucket:
+                    continue
+                # 同一候选可能出现在多个段的桶中，重复比较的代价低于先合并去重
+                for key, other in bucket.items():
+                    distance = _popcount(fingerprint ^ other)
+                    if distance < best_distance:
+                        best_key, best_distance = key, distance
+                if best_distance == 0:
+                    break
+            if best_key is None:
+                return None
+            return best_key, best_distance, self._fingerprints[best_key][1]
+    
+    def __len__(self):
+        return len(self._fingerprints)
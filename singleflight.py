@@ -0,0 +1,77 @@
+import threading
+
+class _Call:
+    """一次正在进行的上游调用"""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    相同键的并发调用合并器
+    
+    同一时刻相同键只会执行一次上游调用，其余调用方等待并共享该次调用的
+    结果（或异常）。调用结束后立即移除，不做缓存。
+    """
+    
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._total = 0  # 总调用次数
+        self._upstream = 0  # 实际执行的上游调用次数
+    
+    def do(self, key, fn):
+        """
+        执行或加入相同键的调用
+        
+        Args:
+            key (hashable): 调用键
+            fn (callable): 无参上游调用
+        
+        Returns:
+            tuple: (调用结果, 是否共享了其他调用方的结果)
+        """
+        with self._lock:
+            self._total += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._upstream += 1
+        
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        
+        return call.result, False
+    
+    def metrics(self):
+        """
+        合并效果统计
+        
+        Returns:
+            dict: calls 为总调用次数，upstream_calls 为实际上游调用次数，
+                  saved_calls 为合并节省的上游调用次数，in_flight 为进行中的调用数
+        """
+        with self._lock:
+            return {
+                'calls': self._total,
+                'upstream_calls': self._upstream,
+                'saved_calls': self._total - self._upstream,
+                'in_flight': len(self._calls)
+            }
@@ -0,0 +1,127 @@
+import logging
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from app.search import register_sqlite_functions
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+SQLITE_JOURNAL_MODES = ('WAL', 'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'OFF')
+SQLITE_SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+def normalize_database_uri(uri):
+    """兼容部分托管平台提供的 postgres:// 连接串（SQLAlchemy 只识别 postgresql://）"""
+    if uri.startswith('postgres://'):
+        return 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+def is_memory_sqlite(url):
+    """判断是否为SQLite内存数据库"""
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+def engine_options(config):
+    """
+    根据配置生成数据库引擎参数
+    
+    SQLite 由 Flask-SQLAlchemy 处理连接池（内存数据库使用单连接），这里只设置锁等待时间；
+    其他数据库设置连接池大小、回收时间和取用前检测。
+    
+    Args:
+        config (dict): 应用配置
+    
+    Returns:
+        dict: create_engine 的参数
+    """
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite':
+        # sqlite3 模块的 timeout 参数与 busy_timeout 作用相同，单位为秒
+        return {'connect_args': {'timeout': config['SQLITE_BUSY_TIMEOUT'] / 1000}}
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING']
+    }
+
+def configure_storage(config):
+    """
+    在初始化 Flask-SQLAlchemy 之前整理数据库配置
+    
+    规范化连接串，并把 engine_options 的结果合并到 SQLALCHEMY_ENGINE_OPTIONS，
+    配置中显式给出的引擎参数优先
+    
+    Args:
+        config (dict): 应用配置
+    """
+    config['SQLALCHEMY_DATABASE_URI'] = normalize_database_uri(config['SQLALCHEMY_DATABASE_URI'])
+    
+    journal_mode = (config['SQLITE_JOURNAL_MODE'] or '').upper()
+    if journal_mode and journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"不支持的SQLite日志模式: {config['SQLITE_JOURNAL_MODE']}，可选值: {', '.join(SQLITE_JOURNAL_MODES)}")
+    synchronous = (config['SQLITE_SYNCHRONOUS'] or '').upper()
+    if synchronous and synchronous not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f"不支持的SQLite同步模式: {config['SQLITE_SYNCHRONOUS']}，可选值: {', '.join(SQLITE_SYNCHRONOUS_MODES)}")
+    
+    options = engine_options(config)
+    custom = config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    if 'connect_args' in custom:
+        options['connect_args'] = dict(options.get('connect_args', {}), **custom['connect_args'])
+    options.update((key, value) for key, value in custom.items() if key != 'connect_args')
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+def sqlite_pragmas(config, memory=False):
+    """
+    每个SQLite连接建立时执行的 PRAGMA 语句
+    
+    Args:
+        config (dict): 应用配置
+        memory (bool): 是否为内存数据库，内存数据库没有日志文件和文件映射，只设置缓存大小
+    
+    Returns:
+        list: PRAGMA 语句，配置为空的项不设置
+    """
+    pragmas = []
+    if not memory:
+        if config['SQLITE_JOURNAL_MODE']:
+            pragmas.append(f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE'].upper()}")
+        if config['SQLITE_SYNCHRONOUS']:
+            pragmas.append(f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS'].upper()}")
+        pragmas.append(f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT'])}")
+        if config['SQLITE_MMAP_SIZE'] is not None:
+            pragmas.append(f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}")
+    if config['SQLITE_CACHE_SIZE']:
+        pragmas.append(f"PRAGMA cache_size={int(config['SQLITE_CACHE_SIZE'])}")
+    return pragmas
+
+def init_storage(app, db):
+    """
+    为应用的数据库引擎注册连接初始化
+    
+    SQLite 连接建立时执行 sqlite_pragmas 中的语句：WAL 模式下读写互不阻塞，
+    synchronous=NORMAL 在 WAL 模式下只在检查点时同步磁盘，busy_timeout 让并发写入
+    排队等待而不是立即报 "database is locked"；并注册全文索引触发器使用的函数。
+    需在 db.init_app(app) 之后调用。
+    
+    Args:
+        app (Flask): 应用实例
+        db (SQLAlchemy): Flask-SQLAlchemy 实例
+    """
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+    
+    pragmas = sqlite_pragmas(app.config, memory=is_memory_sqlite(engine.url))
+    
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+        register_sqlite_functions(dbapi_connection)
+    
+    logger.debug('SQLite连接参数: %s', '; '.join(pragmas))
@@ -0,0 +1,313 @@
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from sqlalchemy import update, or_
+from app import db
+from app.models import ScrapingTask
+from app.services import checkout_scraper
+from app.ingest import ingest_news
+from app.monitor import claim_due_monitors, run_monitor
+from app.rollups import record_task_outcome
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 任务执行方式：thread 为 Web 进程内的线程池，worker 为独立的 worker 进程（python -m app.worker），off 为不执行
+TASK_EXECUTORS = ('thread', 'worker', 'off')
+
+def executor_identity():
+    """当前进程的执行器标识（主机名:进程号），记录在认领的任务上"""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+def claim_pending_tasks(limit, claimed_by=None):
+    """
+    认领待执行的采集任务
+    
+    通过 UPDATE ... WHERE status='pending' 原子地将任务置为 running 并记录租约，
+    多个执行器（线程池、worker 进程）同时认领时每个任务只会被认领一次
+    
+    Args:
+        limit (int): 最多认领的任务数
+        claimed_by (str): 执行器标识
+    
+    Returns:
+        list: 认领成功的任务ID
+    """
+    if limit <= 0:
+        return []
+    
+    candidates = db.session.query(ScrapingTask.id).filter_by(status='pending').order_by(
+        ScrapingTask.id).limit(limit).all()
+    claimed = []
+    for (task_id,) in candidates:
+        result = db.session.execute(
+            update(ScrapingTask)
+            .where(ScrapingTask.id == task_id, ScrapingTask.status == 'pending')
+            .values(status='running', claimed_by=claimed_by, heartbeat_at=datetime.utcnow(),
+                    attempts=db.func.coalesce(ScrapingTask.attempts, 0) + 1)
+        )
+        if result.rowcount == 1:
+            claimed.append(task_id)
+    db.session.commit()
+    return claimed
+
+def heartbeat_tasks(claimed_by):
+    """
+    为执行器正在执行的任务续约
+    
+    Args:
+        claimed_by (str): 执行器标识
+    
+    Returns:
+        int: 续约的任务数
+    """
+    result = db.session.execute(
+        update(ScrapingTask)
+        .where(ScrapingTask.claimed_by == claimed_by, ScrapingTask.status == 'running')
+        .values(heartbeat_at=datetime.utcnow())
+    )
+    db.session.commit()
+    return result.rowcount
+
+def reclaim_stale_tasks(lease_seconds, max_attempts):
+    """
+    回收租约过期的执行中任务
+    
+    执行器进程退出（脚本结束、进程被杀死、重载）时，其认领的任务停留在 running，
+    也不再续约。超过租约时间未续约的任务重新置为 pending，由任意执行器再次认领；
+    已执行 max_attempts 次的任务置为 failed。
+    
+    Args:
+        lease_seconds (int): 租约时间（秒）
+        max_attempts (int): 最多执行的次数
+    
+    Returns:
+        dict: requeued 为重新排队的任务数，failed 为置为失败的任务数
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=lease_seconds)
+    expired = (ScrapingTask.status == 'running',
+               or_(ScrapingTask.heartbeat_at.is_(None), ScrapingTask.heartbeat_at < cutoff))
+    stale = db.session.query(ScrapingTask.id, ScrapingTask.keyword, ScrapingTask.attempts).filter(*expired).all()
+    
+    stats = {'requeued': 0, 'failed': 0}
+    for task_id, keyword, attempts in stale:
+        statement = update(ScrapingTask).where(ScrapingTask.id == task_id, *expired)
+        if (attempts or 0) < max_attempts:
+            result = db.session.execute(statement.values(status='pending', claimed_by=None, heartbeat_at=None))
+            if result.rowcount == 1:
+                stats['requeued'] += 1
+                logger.warning('采集任务%s的执行器已超时未续约，重新排队（已执行%s次）', task_id, attempts or 0)
+        else:
+            result = db.session.execute(statement.values(status='failed', completed_at=db.func.now()))
+            if result.rowcount == 1:
+                record_task_outcome(keyword, 'failed')
+                stats['failed'] += 1
+                logger.warning('采集任务%s已执行%s次仍未完成，置为失败', task_id, attempts)
+    db.session.commit()
+    return stats
+
+def run_task(task_id):
+    """
+    执行一个已认领的采集任务：抓取、保存结果并更新任务状态
+    
+    Args:
+        task_id (int): 采集任务ID
+    
+    Returns:
+        bool: 是否执行成功
+    """
+    task = db.session.get(ScrapingTask, task_id)
+    if task is None:
+        return False
+    keyword = task.keyword
+    
+    try:
+        with checkout_scraper() as scraper:
+            news_list = scraper.fetch_news(task.keyword, task.page or 1)
+            ingest_news(task_id, news_list, session=scraper.session)
+        
+        task.status = 'completed'
+        task.completed_at = db.func.now()
+        record_task_outcome(keyword, 'completed')
+        db.session.commit()
+        logger.info('采集任务%s完成，关键词"%s"，共%s条', task_id, task.keyword, task.total_count)
+        return True
+    except Exception as e:
+        db.session.rollback()
+        logger.error('采集任务%s执行失败: %s', task_id, e, exc_info=True)
+        db.session.execute(
+            update(ScrapingTask).where(ScrapingTask.id == task_id).values(status='failed', completed_at=db.func.now())
+        )
+        record_task_outcome(keyword, 'failed')
+        db.session.commit()
+        return False
+
+def claim_deep_collect_tasks(limit):
+    """
+    认领待执行的批量深度采集，与 claim_pending_tasks 一样原子地置为 running
+    
+    Args:
+        limit (int): 最多认领的任务数
+    
+    Returns:
+        list: 认领成功的采集任务ID
+    """
+    if limit <= 0:
+        return []
+    
+    candidates = db.session.query(ScrapingTask.id).filter_by(deep_collect_status='pending').order_by(
+        ScrapingTask.id).limit(limit).all()
+    claimed = []
+    for (task_id,) in candidates:
+        result = db.session.execute(
+            update(ScrapingTask)
+            .where(ScrapingTask.id == task_id, ScrapingTask.deep_collect_status == 'pending')
+            .values(deep_collect_status='running')
+        )
+        if result.rowcount == 1:
+            claimed.append(task_id)
+    db.session.commit()
+    return claimed
+
+def run_deep_collect(task_id):
+    """
+    执行一个已认领的批量深度采集：采集任务下尚未深度采集的新闻
+    
+    Args:
+        task_id (int): 采集任务ID
+    
+    Returns:
+        bool: 是否执行成功
+    """
+    from app import collector
+    
+    try:
+        stats = collector.deep_collect_task(task_id)
+        status = 'completed'
+        logger.info('采集任务%s批量深度采集完成: %s', task_id, stats)
+    except Exception as e:
+        db.session.rollback()
+        status = 'failed'
+        logger.error('采集任务%s批量深度采集失败: %s', task_id, e, exc_info=True)
+    
+    # 执行期间再次请求的任务已重新置为 pending，保留该状态等待再次执行
+    db.session.execute(
+        update(ScrapingTask)
+        .where(ScrapingTask.id == task_id, ScrapingTask.deep_collect_status == 'running')
+        .values(deep_collect_status=status)
+    )
+    db.session.commit()
+    return status == 'completed'
+
+class TaskExecutor:
+    """
+    采集任务执行器
+    
+    调度线程轮询（或在 submit 时被唤醒）认领待执行任务、到期的关键词监控和批量深度采集，
+    交给线程池执行；只认领空闲线程数量的任务，其余任务留给其他执行器。
+    调度线程同时为执行中的任务续约，并回收其他已退出的执行器遗留的任务。
+    """
+    
+    def __init__(self, app, max_workers=2, poll_interval=5, lease_seconds=300, max_attempts=3):
+        self.app = app
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval  # 无新任务通知时的轮询间隔（秒）
+        self.lease_seconds = lease_seconds  # 任务租约时间（秒），每四分之一租约续约一次
+        self.max_attempts = max_attempts
+        self.executor_id = executor_identity()
+        self._last_renewal = None
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scraping-task')
+        self._active = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+    
+    @classmethod
+    def from_config(cls, app):
+        """根据应用配置创建执行器"""
+        return cls(
+            app,
+            max_workers=app.config['TASK_EXECUTOR_WORKERS'],
+            poll_interval=app.config['TASK_POLL_INTERVAL'],
+            lease_seconds=app.config['TASK_LEASE_SECONDS'],
+            max_attempts=app.config['TASK_MAX_ATTEMPTS']
+        )
+    
+    def start(self):
+        """启动调度线程"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._dispatch_loop, name='scraping-task-dispatcher', daemon=True)
+            self._thread.start()
+        return self
+    
+    def submit(self, task_id=None):
+        """通知调度线程有新任务或到期监控，立即认领而不等待下一次轮询"""
+        self._wakeup.set()
+    
+    def stop(self, wait=True):
+        """停止认领新任务，wait 为 True 时等待执行中的任务完成"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._pool.shutdown(wait=wait)
+    
+    def run_forever(self):
+        """在当前线程阻塞运行，供 worker 进程使用"""
+        self.start()
+        try:
+            while self._thread.is_alive():
+                self._thread.join(1)
+        except KeyboardInterrupt:
+            logger.info('收到中断信号，等待执行中的采集任务完成')
+        finally:
+            self.stop()
+    
+    def _dispatch_loop(self):
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            with self._lock:
+                free = self.max_workers - self._active
+            
+            jobs = []
+            try:
+                with self.app.app_context():
+                    self._renew_leases()
+                    jobs.extend((run_task, task_id) for task_id in claim_pending_tasks(free, self.executor_id))
+                    jobs.extend((partial(run_monitor, claimed_by=self.executor_id), monitor_id)
+                                for monitor_id in claim_due_monitors(free - len(jobs)))
+                    jobs.extend((run_deep_collect, task_id) for task_id in claim_deep_collect_tasks(free - len(jobs)))
+            except Exception as e:
+                logger.error('认领采集任务失败: %s', e, exc_info=True)
+            
+            for fn, job_id in jobs:
+                with self._lock:
+                    self._active += 1
+                self._pool.submit(self._run, fn, job_id)
+            
+            self._wakeup.wait(self.poll_interval)
+    
+    def _renew_leases(self):
+        """每四分之一租约时间为执行中的任务续约一次，并回收过期的任务"""
+        now = time.monotonic()
+        if self._last_renewal is not None and now - self._last_renewal < self.lease_seconds / 4:
+            return
+        self._last_renewal = now
+        heartbeat_tasks(self.executor_id)
+        reclaim_stale_tasks(self.lease_seconds, self.max_attempts)
+    
+    def _run(self, fn, job_id):
+        try:
+            with self.app.app_context():
+                fn(job_id)
+        finally:
+            with self._lock:
+                self._active -= 1
+            # 有空闲线程后立即认领下一批任务
+            self._wakeup.set()
@@ -0,0 +1,105 @@
+import hashlib
+import logging
+import urllib.parse
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 所有站点通用的跟踪参数
+TRACKING_PARAMS = {
+    'spm', 'from', 'fr', 'wfr', 'share_from', 'share_token', 'sharer', 'shareid', 'isappinstalled',
+    'scene', 'srcid', 'src_type', 'ref', 'ref_src', '_wv', 'fbclid', 'gclid'
+}
+TRACKING_PREFIXES = ('utm_', 'hmsr', 'hmpl', 'hmcu', 'hmkw', 'hmci')
+
+# 特定站点的跟踪参数
+HOST_TRACKING_PARAMS = {
+    'baijiahao.baidu.com': {'for'},
+    'mbd.baidu.com': {'for', 'context'},
+    'top.baidu.com': {'sa'}
+}
+
+# 百度搜索结果中的跳转链接，真实地址只能通过请求获得
+REDIRECT_HOSTS = {'www.baidu.com', 'baidu.com', 'm.baidu.com'}
+REDIRECT_PATHS = ('/link', '/baidu.php')
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def is_redirect_link(url):
+    """判断是否为百度跳转链接"""
+    parts = urllib.parse.urlsplit(url)
+    return (parts.hostname or '') in REDIRECT_HOSTS and parts.path.startswith(REDIRECT_PATHS)
+
+def resolve_redirect(url, session, timeout=3):
+    """
+    解析百度跳转链接的真实地址
+    
+    Args:
+        url (str): 跳转链接
+        session (requests.Session): 发送请求的会话
+        timeout (float): 超时时间（秒）
+    
+    Returns:
+        str: 真实地址，解析失败时返回原链接
+    """
+    try:
+        response = session.head(url, allow_redirects=False, timeout=timeout)
+        location = response.headers.get('Location')
+        if response.is_redirect and location:
+            return urllib.parse.urljoin(url, location)
+    except Exception as e:
+        logger.debug('解析跳转链接失败: %.80s %s', url, e)
+    return url
+
+def canonicalize_url(url, session=None, timeout=3):
+    """
+    规范化新闻URL：解析百度跳转链接（提供 session 时），协议和主机名转小写，
+    去掉默认端口、片段和跟踪参数，其余查询参数按名称排序
+    
+    Args:
+        url (str): 原始URL
+        session (requests.Session): 用于解析跳转链接的会话，为None时不解析
+        timeout (float): 解析跳转链接的超时时间（秒）
+    
+    Returns:
+        str: 规范化后的URL，无法解析的URL原样返回
+    """
+    url = (url or '').strip()
+    if session is not None and is_redirect_link(url):
+        url = resolve_redirect(url, session, timeout)
+    
+    try:
+        parts = urllib.parse.urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.hostname:
+        return url
+    
+    scheme = parts.scheme.lower()
+    host = parts.hostname.lower().rstrip('.')
+    netloc = host if port is None or port == DEFAULT_PORTS.get(scheme) else f'{host}:{port}'
+    
+    host_params = HOST_TRACKING_PARAMS.get(host, ())
+    query = sorted(
+        (key, value) for key, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and key.lower() not in host_params
+        and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    
+    return urllib.parse.urlunsplit((scheme, netloc, parts.path or '/', urllib.parse.urlencode(query), ''))
+
+def url_hash(canonical_url):
+    """
+    计算规范化URL的去重哈希，同时忽略 http/https 和 www. 前缀的差异
+    
+    Args:
+        canonical_url (str): canonicalize_url 的返回值
+    
+    Returns:
+        str: 40位十六进制SHA-1
+    """
+    parts = urllib.parse.urlsplit(canonical_url)
+    host = parts.netloc[4:] if parts.netloc.startswith('www.') else parts.netloc
+    key = urllib.parse.urlunsplit(('', host, parts.path, parts.query, ''))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
@@ -0,0 +1,10 @@
+from app import create_app
+from app.tasks import TaskExecutor
+
+# 独立的采集任务执行进程：python -m app.worker
+# 配合 TASK_EXECUTOR=worker 使用，Web 进程只创建任务，不在进程内执行
+app = create_app()
+
+if __name__ == '__main__':
+    executor = app.extensions['task_executor'] or TaskExecutor.from_config(app)
+    executor.run_forever()